@@ -0,0 +1,429 @@
+"""
+Modelo de chat falso para testes de carga das etapas de LLM.
+
+`FakeLLM` tem a mesma assinatura de `init_chat_model` e é passado ao
+`DebateProcesser` em `chat_model_factory`. Os modelos criados reconhecem
+cada template de `src/prompts.py` pela mensagem de sistema e respondem no
+formato que o pipeline espera (texto livre, `content[0]["text"]` nos
+modelos gpt-5 ou a estrutura Pydantic de `with_structured_output`), usando
+os índices e textos do próprio prompt.
+
+Latência (log-normal), rate limit (429 aleatório ou por requisições por
+minuto), erros de servidor e respostas malformadas são configuráveis e
+sorteados com semente fixa. Como o cliente da OpenAI, 429 e 5xx são
+retentados internamente `max_retries` vezes antes de a exceção chegar ao
+pipeline.
+"""
+
+# Utils
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+
+# Processamento de dados
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, ConfigDict
+
+# AI
+import httpx
+from openai import InternalServerError, RateLimitError
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable, RunnableLambda
+
+from src.prompts import (
+    identifier_system,
+    sample_checker_system,
+    debate_info_template,
+    proposal_system,
+    speech_analysis_system,
+    coherence_system,
+    relevance_system,
+    relevance_batch_system,
+    qa_system,
+    s_summary_system,
+    s_summary_batch_system,
+    q_summary_system,
+)
+
+# ================================
+# Constants
+# ================================
+FAKE_ENDPOINT = "https://fake-llm.local/v1/chat/completions"
+DEFAULT_LATENCY = 0.8  # segundos, mediana
+DEFAULT_LATENCY_SIGMA = 0.5  # desvio do log da latência
+RATE_LIMIT_LATENCY_FRACTION = 0.1  # um 429 volta bem mais rápido que uma resposta
+DEFAULT_MAX_RETRIES = 2  # mesmo padrão do cliente da OpenAI
+DEFAULT_RETRY_BACKOFF = 0.5  # segundos, dobra a cada tentativa
+PROPOSAL_RATE = 0.4  # fração das falas com propostas
+ANSWER_RATE = 0.5  # chance de uma fala da discussão responder à pergunta
+SNIPPET_LENGTH = 120
+TOPICS = ("Saúde", "Educação", "Segurança Pública", "Economia", "Mobilidade Urbana", "Habitação")
+DEFAULT_CANDIDATES = ("CANDIDATO 1", "CANDIDATO 2", "CANDIDATO 3", "CANDIDATO 4")
+DEFAULT_DEBATE_INFO = {"cargo": "Prefeito", "estado": "SP", "municipio": "São Paulo", "ano": "2024"}
+
+_ITEM = re.compile(r"^\[(\d+)\]", re.M)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+# ================================
+# Leitura do prompt
+# ================================
+def _items(text: str) -> List[Tuple[int, str]]:
+    """Pares (índice, texto) das entradas no formato `[índice] ...`."""
+    parts = _ITEM.split(text)
+    return [(int(parts[i]), parts[i + 1].strip()) for i in range(1, len(parts), 2)]
+
+
+def _snippet(text: str) -> str:
+    """Primeira frase do texto, truncada."""
+    text = text.strip().strip('"').strip()
+    sentence = _SENTENCE_END.split(text, maxsplit=1)[0] if text else "Fala sem conteúdo."
+    return sentence[:SNIPPET_LENGTH]
+
+
+def _labels(system: str) -> List[str]:
+    """Rótulos listados na seção `### Rótulos` do prompt de análise."""
+    section = system.split("### Rótulos", 1)[-1].split("###", 1)[0]
+    return [line[2:].strip() for line in section.splitlines() if line.startswith("- ")]
+
+
+# ================================
+# Respostas por template
+# ================================
+def _identifier(system: str, human: str, rng: random.Random, fake: "FakeLLM") -> str:
+    segment = human.split("\n\n", 1)[-1]
+    sentences = [s for s in _SENTENCE_END.split(segment) if len(s.strip()) > 20]
+    rng.shuffle(sentences)
+    lines = []
+    for i, sentence in enumerate(sentences[: 2 * len(fake.candidates)]):
+        trecho = sentence.strip().replace('"', "'")
+        lines.append(f'Palestrante: {fake.candidates[i % len(fake.candidates)]}\nTexto: "{trecho}"')
+    return "\n\n".join(lines)
+
+
+def _sample_checker(system: str, human: str, rng: random.Random, fake: "FakeLLM") -> str:
+    return "Sim" if rng.random() < 0.5 else "Não"
+
+
+def _debate_info(system: str, human: str, rng: random.Random, fake: "FakeLLM") -> str:
+    return json.dumps(fake.debate_info, ensure_ascii=False)
+
+
+def _proposal(system: str, human: str, rng: random.Random, fake: "FakeLLM") -> str:
+    if rng.random() >= PROPOSAL_RATE:
+        return "Sem propostas"
+    text = human.split("\n\n", 1)[-1]
+    return json.dumps([_snippet(text)], ensure_ascii=False)
+
+
+def _speech_analysis(system: str, human: str, rng: random.Random, fake: "FakeLLM") -> Dict[str, Any]:
+    labels = _labels(system)
+    return {
+        "analyses": [
+            {
+                "index": idx,
+                "propostas": [_snippet(text)] if rng.random() < PROPOSAL_RATE else [],
+                "resumo": _snippet(text),
+                "rotulos": [{"label": label, "score": round(rng.random(), 2)} for label in labels],
+            }
+            for idx, text in _items(human)
+        ]
+    }
+
+
+def _coherence(system: str, human: str, rng: random.Random, fake: "FakeLLM") -> Dict[str, Any]:
+    indices = [idx for idx, _ in _items(human.split("### Fala Âncora", 1)[0])]
+    # Até três blocos contíguos de falas relacionadas
+    cuts = sorted(rng.sample(range(1, len(indices)), min(2, max(len(indices) - 1, 0))))
+    blocks = [indices[a:b] for a, b in zip([0] + cuts, cuts + [len(indices)])]
+    return {"related_indices": [block for block in blocks if len(block) > 1]}
+
+
+def _qa(system: str, human: str, rng: random.Random, fake: "FakeLLM") -> str:
+    indices = [idx for idx, _ in _items(human)]
+    lines = [f"Tópico: {rng.choice(TOPICS)}"]
+    if indices:
+        question = indices[0]
+        lines.extend(f"({idx}) -> ({question})" for idx in indices[1:] if rng.random() < ANSWER_RATE)
+    return "\n".join(lines)
+
+
+def _s_summary(system: str, human: str, rng: random.Random, fake: "FakeLLM") -> str:
+    return _snippet(human)
+
+
+def _s_summary_batch(system: str, human: str, rng: random.Random, fake: "FakeLLM") -> Dict[str, Any]:
+    return {"summaries": [{"index": idx, "summary": _snippet(text)} for idx, text in _items(human)]}
+
+
+def _q_summary(system: str, human: str, rng: random.Random, fake: "FakeLLM") -> str:
+    return _snippet(human.split("### Pergunta", 1)[-1])
+
+
+def _assessment(idx: int, rng: random.Random) -> Dict[str, Any]:
+    return {
+        "response_index": idx,
+        "relevance_score": float(rng.randint(1, 5)),
+        "justification": "Avaliação gerada pelo modelo falso.",
+    }
+
+
+def _relevance(system: str, human: str, rng: random.Random, fake: "FakeLLM") -> Dict[str, Any]:
+    idx = re.search(r"Índice da Resposta[^\n]*\n\s*(\d+)", human)
+    return _assessment(int(idx.group(1)) if idx else 0, rng)
+
+
+def _relevance_batch(system: str, human: str, rng: random.Random, fake: "FakeLLM") -> Dict[str, Any]:
+    return {"assessments": [_assessment(idx, rng) for idx, _ in _items(human)]}
+
+
+# Mensagem de sistema -> resposta. As versões em lote estendem o sistema da
+# versão simples, então vêm antes. O template de informações do debate não
+# tem mensagem de sistema e é reconhecido pelo início da mensagem do usuário.
+_RESPONDERS: List[Tuple[str, str, Callable[..., Any]]] = [
+    ("identifier", identifier_system, _identifier),
+    ("sample_checker", sample_checker_system, _sample_checker),
+    ("proposal", proposal_system, _proposal),
+    ("speech_analysis", speech_analysis_system.split("{", 1)[0], _speech_analysis),
+    ("coherence", coherence_system, _coherence),
+    ("relevance_batch", relevance_batch_system, _relevance_batch),
+    ("relevance", relevance_system, _relevance),
+    ("qa", qa_system, _qa),
+    ("s_summary_batch", s_summary_batch_system, _s_summary_batch),
+    ("s_summary", s_summary_system, _s_summary),
+    ("q_summary", q_summary_system, _q_summary),
+]
+_DEBATE_INFO_PREFIX = debate_info_template.template.split("{", 1)[0]
+
+
+def _responder(messages: List[BaseMessage]) -> Tuple[str, Callable[..., Any], str, str]:
+    system = "\n".join(m.content for m in messages if isinstance(m, SystemMessage))
+    human = "\n".join(m.content for m in messages if not isinstance(m, SystemMessage))
+    if not system and human.startswith(_DEBATE_INFO_PREFIX):
+        return "debate_info", _debate_info, system, human
+    for name, prefix, respond in _RESPONDERS:
+        if system.startswith(prefix):
+            return name, respond, system, human
+    raise ValueError(f"Prompt não reconhecido pelo modelo falso: {system[:80]!r}")
+
+
+# ================================
+# Backend
+# ================================
+class FakeLLM:
+    """
+    Substituto de `init_chat_model`. Todos os modelos criados por uma
+    instância dividem o gerador aleatório, o limite de requisições por
+    minuto e os contadores em `stats`.
+
+    Args:
+        latency: Mediana da latência de uma resposta, em segundos.
+        latency_sigma: Desvio do log da latência (0 = latência fixa).
+        rate_limit_rate: Chance de uma tentativa receber 429.
+        error_rate: Chance de uma tentativa receber 500.
+        malformed_rate: Chance de uma resposta vir fora do formato (texto
+                        truncado ou estrutura inválida para o Pydantic).
+        requests_per_minute: Limite de tentativas por minuto; acima dele
+                             as tentativas recebem 429.
+        max_retries: Retentativas internas em 429 e 500, como no cliente
+                     da OpenAI.
+        retry_backoff: Espera antes da primeira retentativa interna.
+        candidates: Nomes usados nas respostas de identificação.
+        debate_info: Resposta de `debate_info_template`.
+        seed: Semente dos sorteios.
+    """
+
+    def __init__(
+        self,
+        latency: float = DEFAULT_LATENCY,
+        latency_sigma: float = DEFAULT_LATENCY_SIGMA,
+        rate_limit_rate: float = 0.0,
+        error_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        requests_per_minute: Optional[int] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        candidates: Optional[List[str]] = None,
+        debate_info: Optional[Dict[str, str]] = None,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.requests_per_minute = requests_per_minute
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.candidates = list(candidates or DEFAULT_CANDIDATES)
+        self.debate_info = dict(debate_info or DEFAULT_DEBATE_INFO)
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window: deque = deque()  # instantes das tentativas no último minuto
+        self.stats: Dict[str, Any] = {
+            "responses": 0,
+            "attempts": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "errors": 0,
+            "malformed": 0,
+            "failed": 0,
+            "by_template": {},
+        }
+
+    def __call__(self, model: str, model_provider: Optional[str] = None, **kwargs: Any) -> "FakeChatModel":
+        return FakeChatModel(model_name=model, fake=self)
+
+    def _count(self, key: str, template: Optional[str] = None) -> None:
+        with self._lock:
+            self.stats[key] += 1
+            if template is not None:
+                self.stats["by_template"][template] = self.stats["by_template"].get(template, 0) + 1
+
+    def _attempt(self) -> Tuple[float, Optional[str]]:
+        """Sorteia a latência e a falha (None, "rate_limit" ou "error") de uma tentativa."""
+        with self._lock:
+            self.stats["attempts"] += 1
+            latency = (
+                self._rng.lognormvariate(math.log(self.latency), self.latency_sigma)
+                if self.latency > 0
+                else 0.0
+            )
+
+            if self.requests_per_minute:
+                now = time.monotonic()
+                while self._window and now - self._window[0] > 60:
+                    self._window.popleft()
+                if len(self._window) >= self.requests_per_minute:
+                    self.stats["rate_limited"] += 1
+                    return latency * RATE_LIMIT_LATENCY_FRACTION, "rate_limit"
+                self._window.append(now)
+
+            draw = self._rng.random()
+            if draw < self.rate_limit_rate:
+                self.stats["rate_limited"] += 1
+                return latency * RATE_LIMIT_LATENCY_FRACTION, "rate_limit"
+            if draw < self.rate_limit_rate + self.error_rate:
+                self.stats["errors"] += 1
+                return latency, "error"
+            return latency, None
+
+    def _backoff(self, attempt: int) -> float:
+        return self.retry_backoff * 2**attempt
+
+    @staticmethod
+    def _exception(failure: str) -> Exception:
+        request = httpx.Request("POST", FAKE_ENDPOINT)
+        if failure == "rate_limit":
+            return RateLimitError(
+                "Rate limit reached (fake)", response=httpx.Response(429, request=request), body=None
+            )
+        return InternalServerError(
+            "Internal server error (fake)", response=httpx.Response(500, request=request), body=None
+        )
+
+    def _respond(
+        self, model_name: str, messages: List[BaseMessage], schema: Optional[Type[BaseModel]]
+    ) -> AIMessage:
+        """Monta a resposta do template reconhecido no formato do modelo."""
+        template, respond, system, human = _responder(messages)
+        self._count("responses", template)
+        with self._lock:
+            payload = respond(system, human, self._rng, self)
+            malformed = self._rng.random() < self.malformed_rate
+
+        if isinstance(payload, dict):
+            if malformed:
+                # Estrutura sem os campos obrigatórios: o Pydantic rejeita
+                payload = {"unexpected": list(payload)}
+            text = json.dumps(payload, ensure_ascii=False)
+        else:
+            text = payload[: len(payload) // 3] if malformed else payload
+        if malformed:
+            self._count("malformed")
+
+        prompt_chars = sum(len(str(m.content)) for m in messages)
+        usage = {
+            "input_tokens": prompt_chars // 4,
+            "output_tokens": len(text) // 4,
+            "total_tokens": prompt_chars // 4 + len(text) // 4,
+        }
+        # Modelos gpt-5 respondem em blocos; os demais, em texto. Saídas
+        # estruturadas sempre vêm em texto, para o parser.
+        content: Any = text
+        if model_name.startswith("gpt-5") and schema is None:
+            content = [{"type": "text", "text": text}]
+        return AIMessage(
+            content=content,
+            usage_metadata=usage,
+            response_metadata={"model_name": model_name},
+        )
+
+    def complete(
+        self, model_name: str, messages: List[BaseMessage], schema: Optional[Type[BaseModel]] = None
+    ) -> AIMessage:
+        failure = None
+        for attempt in range(self.max_retries + 1):
+            latency, failure = self._attempt()
+            time.sleep(latency)
+            if failure is None:
+                return self._respond(model_name, messages, schema)
+            if attempt < self.max_retries:
+                self._count("retries")
+                time.sleep(self._backoff(attempt))
+        self._count("failed")
+        raise self._exception(failure)
+
+    async def acomplete(
+        self, model_name: str, messages: List[BaseMessage], schema: Optional[Type[BaseModel]] = None
+    ) -> AIMessage:
+        failure = None
+        for attempt in range(self.max_retries + 1):
+            latency, failure = self._attempt()
+            await asyncio.sleep(latency)
+            if failure is None:
+                return self._respond(model_name, messages, schema)
+            if attempt < self.max_retries:
+                self._count("retries")
+                await asyncio.sleep(self._backoff(attempt))
+        self._count("failed")
+        raise self._exception(failure)
+
+
+class FakeChatModel(BaseChatModel):
+    """Modelo de chat servido por um `FakeLLM`."""
+
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_name: str
+    fake: Any
+    structured_schema: Optional[Any] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-openai"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        message = self.fake.complete(self.model_name, messages, self.structured_schema)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        message = await self.fake.acomplete(self.model_name, messages, self.structured_schema)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def with_structured_output(self, schema: Type[BaseModel], **kwargs: Any) -> Runnable:
+        """Responde com o JSON da estrutura, validado por `schema`."""
+        model = self.model_copy(update={"structured_schema": schema})
+        return model | RunnableLambda(lambda message: schema.model_validate_json(message.content))
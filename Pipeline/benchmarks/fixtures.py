@@ -0,0 +1,132 @@
+"""
+Preparação dos debates de exemplo (`data/downloads/<video_id>`) para os
+benchmarks: cópia para uma pasta temporária, resposta de identificação
+sintética e um `DebateProcesser` ligado aos backends falsos.
+"""
+
+# Utils
+import os
+import pickle
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+# Processamento de dados
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+import pandas as pd
+
+from src.debate_processer import (
+    DebateProcesser,
+    TRANSCRIPT_FILENAME,
+    DIARIZATION_FILENAME,
+    DESCRIPTION_FILENAME,
+    MIN_TEXT_LENGTH,
+)
+from benchmarks.stubs import StubDatabase, StubSentenceModel, StubLLMResponse
+
+# ================================
+# Constants
+# ================================
+FIXTURE_IDS = ("8v6ruFkdKHU", "lBDK9k7WYa8")
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "downloads")
+DEFAULT_NUM_CANDIDATES = 4
+FIRST_TITULO = 100000  # títulos eleitorais fictícios
+
+
+@contextmanager
+def fixture_workdir(video_ids: Sequence[str] = FIXTURE_IDS) -> Iterator[str]:
+    """
+    Copia os debates para `<tmp>/data/downloads` e muda o diretório de
+    trabalho para `<tmp>`, já que `DebateProcesser` usa caminhos relativos.
+    Nada é gravado nas pastas originais.
+    """
+    previous = os.getcwd()
+    root = tempfile.mkdtemp(prefix="debate_bench_")
+    try:
+        for video_id in video_ids:
+            shutil.copytree(
+                os.path.join(FIXTURES_DIR, video_id),
+                os.path.join(root, "data", "downloads", video_id),
+            )
+        os.chdir(root)
+        yield root
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def load_fixture(video_id: str) -> Dict[str, Any]:
+    """Segmentos da transcrição, diarização e descrição de um debate de exemplo."""
+    folder = os.path.join(FIXTURES_DIR, video_id)
+    fixture = {}
+    for key, filename in [
+        ("segments", TRANSCRIPT_FILENAME),
+        ("df_dia", DIARIZATION_FILENAME),
+        ("description", DESCRIPTION_FILENAME),
+    ]:
+        with open(os.path.join(folder, filename), "rb") as f:
+            fixture[key] = pickle.load(f)
+    return fixture
+
+
+def identification_response(
+    segments: List[Dict[str, Any]],
+    df_dia: pd.DataFrame,
+    num_candidates: int = DEFAULT_NUM_CANDIDATES,
+) -> Tuple[StubLLMResponse, List[str], Dict[str, int]]:
+    """
+    Resposta de `identifier_template` montada a partir da própria fixture.
+
+    Os `num_candidates` falantes com mais tempo de fala viram "CANDIDATO k";
+    o trecho de cada um é o segmento mais longo da transcrição dentro do seu
+    turno mais longo.
+
+    Returns:
+        Resposta falsa da LLM, candidatos válidos e títulos eleitorais.
+    """
+    df_dia = df_dia.assign(Duration=df_dia["Diarizacao_End"] - df_dia["Diarizacao_Start"])
+    talkers = df_dia.groupby("Speaker_ID")["Duration"].sum().nlargest(num_candidates).index
+
+    lines = []
+    candidatos: List[str] = []
+    for k, speaker in enumerate(talkers, start=1):
+        turn = df_dia.loc[df_dia.loc[df_dia["Speaker_ID"] == speaker, "Duration"].idxmax()]
+        inside = [
+            s["text"].strip()
+            for s in segments
+            if s["start"] >= turn["Diarizacao_Start"]
+            and s["end"] <= turn["Diarizacao_End"]
+            and len(s["text"].strip()) > MIN_TEXT_LENGTH
+        ]
+        if not inside:
+            continue
+        name = f"CANDIDATO {k}"
+        candidatos.append(name)
+        trecho = max(inside, key=len).replace('"', "'")
+        lines.append(f'Palestrante: {name}\nTexto: "{trecho}"')
+
+    documentos = {name: FIRST_TITULO + i for i, name in enumerate(candidatos)}
+    return StubLLMResponse("\n\n".join(lines)), candidatos, documentos
+
+
+def make_processer(video_id: str, fixture: Dict[str, Any], **kwargs: Any) -> DebateProcesser:
+    """
+    `DebateProcesser` com a transcrição carregada e os backends falsos.
+    `kwargs` vão para o construtor (por exemplo, `chat_model_factory`).
+    """
+    pc = DebateProcesser(video_id=video_id, database=StubDatabase(), interactive=False, **kwargs)
+    pc._sentence_model = StubSentenceModel()
+    pc.description = fixture["description"]
+    pc.debate = {"cargo": "PREFEITO", "municipio": "", "estado": "SP", "ano": "2024"}
+    pc._set_transcript(fixture["segments"])
+    return pc
+
+
+def identified_processer(video_id: str, fixture: Dict[str, Any], **kwargs: Any) -> DebateProcesser:
+    """Como `make_processer`, com os participantes já identificados."""
+    pc = make_processer(video_id, fixture, **kwargs)
+    response, pc.result_candidatos, pc.result_documentos = identification_response(
+        fixture["segments"], fixture["df_dia"]
+    )
+    pc._set_identified_speakers(response)
+    return pc
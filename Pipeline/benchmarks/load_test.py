@@ -0,0 +1,166 @@
+"""
+Teste de carga das etapas de LLM com o modelo falso (`benchmarks/fake_llm.py`).
+
+Roda as etapas assíncronas (análise das falas e discussões no modo "llm" ou
+"hybrid") e, opcionalmente, as propostas sobre um debate de exemplo ou um
+debate sintético, sem rede nem custo de API. O relatório traz o tempo por
+etapa, a vazão, os percentis de latência por modelo, as retentativas, as
+falhas injetadas e o que ficou no ledger de falhas.
+
+Uso (a partir de `Pipeline/`):
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --latency 2 --rate-limit-rate 0.1 --error-rate 0.02
+    python -m benchmarks.load_test --rpm 500 --hours 4 --candidates 8
+"""
+
+# Utils
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+# Processamento de dados
+from typing import Any, Dict, Sequence
+
+from benchmarks.fake_llm import (
+    FakeLLM,
+    DEFAULT_LATENCY,
+    DEFAULT_LATENCY_SIGMA,
+    DEFAULT_MAX_RETRIES,
+)
+from benchmarks.fixtures import FIXTURE_IDS, fixture_workdir, identified_processer, load_fixture
+from benchmarks.run import RESULTS_DIR
+from benchmarks.synthetic import fit_profile, generate_debate, synthetic_processer
+
+# Ambiente
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ================================
+# Constants
+# ================================
+STAGES = ("proposals", "speech_analysis", "discussions")
+DEFAULT_STAGES = ("speech_analysis", "discussions")
+
+
+def run_load_test(pc, stages: Sequence[str], discussion_mode: str = "llm") -> Dict[str, float]:
+    """
+    Roda as etapas de LLM escolhidas em `pc`, na ordem do pipeline.
+
+    Returns:
+        Tempo de parede de cada etapa.
+    """
+    timings: Dict[str, float] = {}
+    for stage in STAGES:
+        if stage not in stages:
+            continue
+        started = time.perf_counter()
+        if stage == "proposals":
+            pc.get_proposals()
+        elif stage == "speech_analysis":
+            asyncio.run(pc.analyze_speeches())
+        else:
+            asyncio.run(pc.calculate_discussions(discussion_mode=discussion_mode))
+        timings[stage] = time.perf_counter() - started
+        print(f"{stage:<16} {timings[stage]:8.2f}s")
+    return timings
+
+
+def summarize(pc, fake: FakeLLM, timings: Dict[str, float]) -> Dict[str, Any]:
+    """Relatório do teste: etapas, vazão, latência por modelo, falhas."""
+    llm = {
+        model: {
+            key: entry[key]
+            for key in ("requests", "errors", "rate_limited", "retries", "latency_s")
+        }
+        for model, entry in pc.metrics.report()["llm"].items()
+    }
+    total = sum(timings.values())
+    return {
+        "speeches": len(pc.speeches),
+        "stages_s": timings,
+        "throughput_rps": fake.stats["responses"] / total if total else None,
+        "llm": llm,
+        "fake": fake.stats,
+        "failures": pc.ledger.summary(),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Teste de carga das etapas de LLM.")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(DEFAULT_STAGES))
+    parser.add_argument("--discussion-mode", choices=["llm", "hybrid"], default="llm")
+    parser.add_argument("--fixture", choices=list(FIXTURE_IDS), default=FIXTURE_IDS[0])
+    parser.add_argument(
+        "--hours", type=float, default=None, help="Usa um debate sintético com esta duração"
+    )
+    parser.add_argument("--candidates", type=int, default=4, help="Candidatos do debate sintético")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="Mediana, em segundos")
+    parser.add_argument("--latency-sigma", type=float, default=DEFAULT_LATENCY_SIGMA)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=None, help="Limite de requisições por minuto")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES)
+    parser.add_argument("--batch-size", type=int, default=None, help="`llm_batch_size` do processador")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=RESULTS_DIR, help="Pasta dos resultados")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    fake = FakeLLM(
+        latency=args.latency,
+        latency_sigma=args.latency_sigma,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate,
+        requests_per_minute=args.rpm,
+        max_retries=args.max_retries,
+        seed=args.seed,
+    )
+    kwargs: Dict[str, Any] = {"chat_model_factory": fake}
+    if args.batch_size is not None:
+        kwargs["llm_batch_size"] = args.batch_size
+
+    output = os.path.abspath(args.output)
+    if args.hours is not None:
+        debate = generate_debate(fit_profile(), args.hours, args.candidates, seed=args.seed)
+        with fixture_workdir([]):
+            pc = synthetic_processer(debate, "synthetic_load", labeled=True, **kwargs)
+            timings = run_load_test(pc, args.stages, args.discussion_mode)
+    else:
+        with fixture_workdir([args.fixture]):
+            fixture = load_fixture(args.fixture)
+            pc = identified_processer(args.fixture, fixture, **kwargs)
+            pc.df_dia = fixture["df_dia"].copy()
+            pc.diarize_speakers()
+            timings = run_load_test(pc, args.stages, args.discussion_mode)
+
+    report = {"config": vars(args), **summarize(pc, fake, timings)}
+    for model, entry in report["llm"].items():
+        latency = entry["latency_s"]
+        print(
+            f"{model:<14} {entry['requests']:>6} req  {entry['errors']:>4} erros  "
+            f"{entry['retries']:>4} retentativas  "
+            + "  ".join(f"{p} {v:.2f}s" for p, v in latency.items() if v is not None)
+        )
+    print(
+        f"vazão {report['throughput_rps'] or 0:.1f} resp/s  "
+        f"429 {fake.stats['rate_limited']}  500 {fake.stats['errors']}  "
+        f"malformadas {fake.stats['malformed']}  falhas no ledger {report['failures']}"
+    )
+
+    os.makedirs(output, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(output, f"load_{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Resultados em {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,273 @@
+"""
+Benchmarks offline das etapas de CPU do pipeline sobre os debates de exemplo.
+
+Cada caso monta um `DebateProcesser` com backends falsos (Neo4j, LLM e
+modelo de embeddings; ver `benchmarks/stubs.py`) e mede só a chamada de
+interesse. Os resultados são anexados a `benchmarks/results/history.jsonl`
+e comparados com a mediana das execuções anteriores.
+
+Uso (a partir de `Pipeline/`):
+    python -m benchmarks.run
+    python -m benchmarks.run --repeat 10 --cases diarize_speakers ingest_discussion_data
+    python -m benchmarks.run --fail-on-regression
+"""
+
+# Utils
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+
+# Processamento de dados
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from src.segmentation import discussion_labels
+from benchmarks.fixtures import (
+    FIXTURE_IDS,
+    fixture_workdir,
+    load_fixture,
+    make_processer,
+    identified_processer,
+    identification_response,
+)
+
+# Ambiente
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ================================
+# Constants
+# ================================
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+HISTORY_FILENAME = "history.jsonl"
+DEFAULT_REPEAT = 5
+DEFAULT_BASELINE_RUNS = 5  # execuções anteriores usadas como referência
+DEFAULT_REGRESSION_THRESHOLD = 0.25  # 25% mais lento que a referência
+
+
+# ================================
+# Preparação (não medida)
+# ================================
+def _speeches_processer(video_id: str, fixture: Dict[str, Any]):
+    pc = identified_processer(video_id, fixture)
+    pc.df_dia = fixture["df_dia"].copy()
+    pc.diarize_speakers()
+    return pc
+
+
+def _discussions_processer(video_id: str, fixture: Dict[str, Any]):
+    pc = _speeches_processer(video_id, fixture)
+    asyncio.run(pc.calculate_discussions(discussion_mode="local"))
+    return pc
+
+
+def _llm_shaped_groups(n: int, window: int = 10, seed: int = 0) -> List[List[int]]:
+    """
+    Grupos no formato do modo "llm": uma âncora a cada 3 falas, janela de
+    `window` falas, dividida em até três blocos contíguos relacionados.
+    """
+    rng = np.random.default_rng(seed)
+    groups: List[List[int]] = []
+    for anchor in range(0, n, 3):
+        positions = np.arange(anchor, min(n, anchor + window + 1))
+        if len(positions) < 2:
+            continue
+        cuts = np.sort(
+            rng.choice(np.arange(1, len(positions)), size=min(2, len(positions) - 1), replace=False)
+        )
+        groups.extend(chunk.tolist() for chunk in np.split(positions, cuts) if len(chunk) > 1)
+    return groups
+
+
+# ================================
+# Casos
+# ================================
+def _case_identify_speakers(video_id, fixture):
+    pc = make_processer(video_id, fixture)
+    response, pc.result_candidatos, pc.result_documentos = identification_response(
+        fixture["segments"], fixture["df_dia"]
+    )
+    return lambda: pc._set_identified_speakers(response)
+
+
+def _case_diarize_speakers(video_id, fixture):
+    pc = identified_processer(video_id, fixture)
+    pc.df_dia = fixture["df_dia"].copy()
+    return pc.diarize_speakers
+
+
+def _case_calculate_discussions_local(video_id, fixture):
+    pc = _speeches_processer(video_id, fixture)
+    return lambda: asyncio.run(pc.calculate_discussions(discussion_mode="local"))
+
+
+def _case_discussion_labels(video_id, fixture):
+    n = len(_speeches_processer(video_id, fixture).speeches)
+    groups = _llm_shaped_groups(n)
+    return lambda: discussion_labels(n, groups)
+
+
+def _case_ingest_into_database(video_id, fixture):
+    return _discussions_processer(video_id, fixture).ingest_into_database
+
+
+def _case_ingest_discussion_data(video_id, fixture):
+    return _discussions_processer(video_id, fixture).ingest_discussion_data
+
+
+# Nome -> função que prepara o caso e devolve a chamada a medir
+CASES: Dict[str, Callable[[str, Dict[str, Any]], Callable[[], Any]]] = {
+    "identify_speakers": _case_identify_speakers,
+    "diarize_speakers": _case_diarize_speakers,
+    "calculate_discussions_local": _case_calculate_discussions_local,
+    "discussion_labels": _case_discussion_labels,
+    "ingest_into_database": _case_ingest_into_database,
+    "ingest_discussion_data": _case_ingest_discussion_data,
+}
+
+
+def run_case(
+    name: str, video_id: str, fixture: Dict[str, Any], repeat: int = DEFAULT_REPEAT
+) -> Dict[str, float]:
+    """Prepara e mede um caso `repeat` vezes (cada medição com um processador novo)."""
+    timings = []
+    for _ in range(repeat):
+        call = CASES[name](video_id, fixture)
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+
+    return {
+        "median_s": float(np.median(timings)),
+        "min_s": float(np.min(timings)),
+        "max_s": float(np.max(timings)),
+        "repeat": repeat,
+    }
+
+
+# ================================
+# Histórico
+# ================================
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(path: str, entry: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def find_regressions(
+    results: Dict[str, Dict[str, Dict[str, float]]],
+    history: List[Dict[str, Any]],
+    threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+    baseline_runs: int = DEFAULT_BASELINE_RUNS,
+) -> List[Tuple[str, str, float, float]]:
+    """
+    Compara a mediana de cada caso com a mediana das `baseline_runs`
+    execuções anteriores.
+
+    Returns:
+        Lista de (debate, caso, referência, atual) mais lentos que
+        `referência * (1 + threshold)`.
+    """
+    regressions = []
+    for video_id, cases in results.items():
+        for case, result in cases.items():
+            previous = [
+                entry["results"][video_id][case]["median_s"]
+                for entry in history[-baseline_runs:]
+                if case in entry.get("results", {}).get(video_id, {})
+            ]
+            if not previous:
+                continue
+            baseline = float(np.median(previous))
+            if result["median_s"] > baseline * (1 + threshold):
+                regressions.append((video_id, case, baseline, result["median_s"]))
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks offline do pipeline.")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--fixtures", nargs="+", default=list(FIXTURE_IDS))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument(
+        "--history",
+        default=os.path.join(RESULTS_DIR, HISTORY_FILENAME),
+        help="Arquivo JSONL com o histórico de resultados",
+    )
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    parser.add_argument("--no-record", action="store_true", help="Não grava no histórico")
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Sai com código 1 se algum caso regredir",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    history_path = os.path.abspath(args.history)
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    with fixture_workdir(args.fixtures):
+        for video_id in args.fixtures:
+            fixture = load_fixture(video_id)
+            results[video_id] = {}
+            for case in args.cases:
+                results[video_id][case] = run_case(case, video_id, fixture, args.repeat)
+                print(
+                    f"{video_id}  {case:<30} "
+                    f"mediana {results[video_id][case]['median_s'] * 1000:9.1f} ms  "
+                    f"mín {results[video_id][case]['min_s'] * 1000:9.1f} ms"
+                )
+
+    regressions = find_regressions(results, load_history(history_path), args.threshold)
+    for video_id, case, baseline, current in regressions:
+        print(
+            f"REGRESSÃO {video_id} {case}: {baseline * 1000:.1f} ms -> {current * 1000:.1f} ms "
+            f"(+{current / baseline - 1:.0%})"
+        )
+
+    if not args.no_record:
+        append_history(
+            history_path,
+            {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+                "numpy": np.__version__,
+                "results": results,
+            },
+        )
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
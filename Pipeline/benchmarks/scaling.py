@@ -0,0 +1,317 @@
+"""
+Testes de escala das etapas de CPU com debates sintéticos
+(`benchmarks/synthetic.py`).
+
+Para cada combinação de duração e número de candidatos, gera um debate,
+roda identificação (resposta falsa), alinhamento, discussões no modo
+"local" e as duas ingestões com os backends falsos, e registra tempo e
+pico de memória (`tracemalloc`) de cada etapa. A inclinação do log-log
+tempo x segmentos indica caminhos superlineares (inclinação ~1 é linear,
+~2 é quadrática).
+
+Uso (a partir de `Pipeline/`):
+    python -m benchmarks.scaling
+    python -m benchmarks.scaling --hours 1 2 4 6 --candidates 4 8 12
+    python -m benchmarks.scaling --skip-alignment --hours 6 12
+    python -m benchmarks.scaling --season 30 --season-hours 1.5
+"""
+
+# Utils
+import argparse
+import asyncio
+import json
+import os
+import resource
+import time
+from datetime import datetime, timezone
+
+# Processamento de dados
+from typing import Any, Dict, List, Sequence
+import numpy as np
+
+from benchmarks.fixtures import fixture_workdir
+from benchmarks.run import RESULTS_DIR
+from benchmarks.stubs import StubLLMResponse
+from benchmarks.synthetic import fit_profile, generate_debate, synthetic_processer
+
+# Ambiente
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ================================
+# Constants
+# ================================
+STAGES = (
+    "identify_speakers",
+    "diarize_speakers",
+    "calculate_discussions",
+    "ingest_into_database",
+    "ingest_discussion_data",
+)
+DEFAULT_HOURS = (1, 2, 4, 6)
+DEFAULT_CANDIDATES = (4, 8, 12)
+DEFAULT_SEASON_HOURS = 1.5
+SUPERLINEAR_SLOPE = 1.2  # inclinação log-log acima da qual a etapa é sinalizada
+
+
+# ================================
+# Execução
+# ================================
+def _identification_response(debate: Dict[str, Any]) -> StubLLMResponse:
+    """Resposta de `identifier_template` com os trechos marcados pelo gerador."""
+    lines = []
+    for idx, name in debate["identified"].items():
+        trecho = debate["segments"][idx]["text"].strip().replace('"', "'")
+        lines.append(f'Palestrante: {name}\nTexto: "{trecho}"')
+    return StubLLMResponse("\n\n".join(lines))
+
+
+def run_debate(
+    debate: Dict[str, Any],
+    video_id: str,
+    skip_alignment: bool = False,
+    trace_memory: bool = True,
+) -> Dict[str, Any]:
+    """
+    Roda as etapas de CPU sobre um debate sintético.
+
+    Deve ser chamado dentro de `fixture_workdir`, já que o processador grava
+    a diarização rotulada em `data/downloads/<video_id>`.
+
+    Args:
+        debate: Saída de `generate_debate`.
+        video_id: Identificador usado para a pasta do debate.
+        skip_alignment: Usa as falas já rotuladas pelo gerador em vez de
+                        rodar identificação e diarização.
+        trace_memory: Mede o pico de memória de cada etapa com `tracemalloc`.
+
+    Returns:
+        Tamanho do debate ('segments', 'turns', 'speeches') e, em 'stages',
+        o tempo e o pico de memória de cada etapa.
+    """
+    pc = synthetic_processer(debate, video_id, labeled=skip_alignment, trace_memory=trace_memory)
+    if not skip_alignment:
+        with pc.metrics.stage("identify_speakers"):
+            pc._set_identified_speakers(_identification_response(debate))
+        pc.df_dia = debate["df_dia"].copy()
+        pc.diarize_speakers()
+
+    asyncio.run(pc.calculate_discussions(discussion_mode="local"))
+    pc.ingest_into_database()
+    pc.ingest_discussion_data()
+
+    stages = pc.metrics.report()["stages"]
+    return {
+        "segments": len(debate["segments"]),
+        "turns": len(debate["df_dia"]),
+        "speeches": len(pc.speeches),
+        "stages": {
+            name: {
+                "wall_s": stages[name]["wall_s"],
+                "tracemalloc_peak_mb": stages[name]["tracemalloc_peak_mb"],
+            }
+            for name in STAGES
+            if name in stages
+        },
+    }
+
+
+def run_grid(
+    hours: Sequence[float],
+    candidates: Sequence[int],
+    skip_alignment: bool = False,
+    trace_memory: bool = True,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """Roda `run_debate` para cada combinação de duração e número de candidatos."""
+    profile = fit_profile()
+    runs = []
+    with fixture_workdir([]):
+        for num_candidates in candidates:
+            for h in hours:
+                debate = generate_debate(profile, h, num_candidates, seed=seed)
+                result = run_debate(
+                    debate, f"synthetic_{h}h_{num_candidates}c", skip_alignment, trace_memory
+                )
+                runs.append({"hours": h, "candidates": num_candidates, **result})
+                print(
+                    f"{h:>5}h {num_candidates:>3} candidatos  "
+                    f"{result['segments']:>6} segmentos  {result['speeches']:>5} falas  "
+                    + "  ".join(
+                        f"{name} {stage['wall_s']:.2f}s" for name, stage in result["stages"].items()
+                    )
+                )
+    return runs
+
+
+def run_season(
+    num_debates: int,
+    hours: float = DEFAULT_SEASON_HOURS,
+    candidates: Sequence[int] = DEFAULT_CANDIDATES,
+    skip_alignment: bool = False,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Roda `num_debates` debates em sequência no mesmo processo, como um lote
+    de temporada, e acompanha o tempo acumulado e o pico de RSS. RSS que
+    cresce de debate a debate indica estado retido entre processadores.
+    """
+    profile = fit_profile()
+    rng = np.random.default_rng(seed)
+    season = []
+    started = time.perf_counter()
+    with fixture_workdir([]):
+        for i in range(num_debates):
+            num_candidates = int(rng.choice(candidates))
+            debate = generate_debate(profile, hours, num_candidates, seed=seed + i)
+            result = run_debate(debate, f"season_{i:03d}", skip_alignment, trace_memory=False)
+            season.append(
+                {
+                    "debate": i,
+                    "candidates": num_candidates,
+                    "segments": result["segments"],
+                    "elapsed_s": time.perf_counter() - started,
+                    # ru_maxrss é em kB no Linux
+                    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                }
+            )
+            print(
+                f"debate {i + 1:>3}/{num_debates}  "
+                f"acumulado {season[-1]['elapsed_s']:8.1f}s  "
+                f"pico RSS {season[-1]['peak_rss_mb']:8.1f} MB"
+            )
+    return season
+
+
+# ================================
+# Análise
+# ================================
+def scaling_slopes(runs: List[Dict[str, Any]], metric: str = "wall_s") -> Dict[str, float]:
+    """
+    Inclinação do ajuste log-log de `metric` x número de segmentos, por etapa,
+    com todas as execuções juntas. Etapas com menos de dois tamanhos ficam de fora.
+    """
+    slopes: Dict[str, float] = {}
+    for name in STAGES:
+        points = [
+            (run["segments"], run["stages"][name][metric])
+            for run in runs
+            if name in run["stages"] and run["stages"][name][metric]
+        ]
+        sizes = {size for size, _ in points}
+        if len(sizes) < 2:
+            continue
+        x, y = np.log([p[0] for p in points]), np.log([p[1] for p in points])
+        slopes[name] = float(np.polyfit(x, y, 1)[0])
+    return slopes
+
+
+def plot_runs(runs: List[Dict[str, Any]], path: str) -> bool:
+    """
+    Gráficos log-log de tempo e memória x segmentos, um painel por etapa e
+    uma linha por número de candidatos.
+
+    Returns:
+        False se o matplotlib não estiver instalado.
+    """
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        logger.warning("matplotlib não instalado; gráficos não gerados.")
+        return False
+
+    stages = [name for name in STAGES if any(name in run["stages"] for run in runs)]
+    metrics = [("wall_s", "tempo (s)"), ("tracemalloc_peak_mb", "pico de memória (MB)")]
+    fig, axes = plt.subplots(
+        len(metrics), len(stages), figsize=(4 * len(stages), 7), squeeze=False
+    )
+    for col, name in enumerate(stages):
+        for row, (metric, label) in enumerate(metrics):
+            ax = axes[row][col]
+            for num_candidates in sorted({run["candidates"] for run in runs}):
+                points = sorted(
+                    (run["segments"], run["stages"][name][metric])
+                    for run in runs
+                    if run["candidates"] == num_candidates
+                    and name in run["stages"]
+                    and run["stages"][name][metric]
+                )
+                if points:
+                    ax.plot(*zip(*points), marker="o", label=f"{num_candidates} candidatos")
+            ax.set_xscale("log")
+            ax.set_yscale("log")
+            ax.set_xlabel("segmentos")
+            ax.set_ylabel(label)
+            if row == 0:
+                ax.set_title(name)
+    axes[0][0].legend()
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Testes de escala com debates sintéticos.")
+    parser.add_argument("--hours", nargs="+", type=float, default=list(DEFAULT_HOURS))
+    parser.add_argument("--candidates", nargs="+", type=int, default=list(DEFAULT_CANDIDATES))
+    parser.add_argument(
+        "--skip-alignment",
+        action="store_true",
+        help="Usa as falas rotuladas pelo gerador (sem identificação e diarização)",
+    )
+    parser.add_argument(
+        "--no-trace-memory",
+        action="store_true",
+        help="Não usa tracemalloc (tempos mais fiéis, sem memória por etapa)",
+    )
+    parser.add_argument(
+        "--season", type=int, default=0, help="Roda N debates em sequência em vez da grade"
+    )
+    parser.add_argument("--season-hours", type=float, default=DEFAULT_SEASON_HOURS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=RESULTS_DIR, help="Pasta dos resultados")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    output = os.path.abspath(args.output)
+    os.makedirs(output, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    if args.season:
+        season = run_season(
+            args.season, args.season_hours, args.candidates, args.skip_alignment, args.seed
+        )
+        path = os.path.join(output, f"season_{stamp}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(season, f, ensure_ascii=False, indent=2)
+        print(f"Resultados em {path}")
+        return 0
+
+    runs = run_grid(
+        args.hours, args.candidates, args.skip_alignment, not args.no_trace_memory, args.seed
+    )
+    slopes = {"wall_s": scaling_slopes(runs, "wall_s")}
+    if not args.no_trace_memory:
+        slopes["tracemalloc_peak_mb"] = scaling_slopes(runs, "tracemalloc_peak_mb")
+
+    for metric, by_stage in slopes.items():
+        for name, slope in by_stage.items():
+            flag = "  SUPERLINEAR" if slope > SUPERLINEAR_SLOPE else ""
+            print(f"{metric:<20} {name:<25} inclinação {slope:5.2f}{flag}")
+
+    path = os.path.join(output, f"scaling_{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"runs": runs, "slopes": slopes}, f, ensure_ascii=False, indent=2)
+    print(f"Resultados em {path}")
+    if plot_runs(runs, os.path.join(output, f"scaling_{stamp}.png")):
+        print(f"Gráficos em {os.path.join(output, f'scaling_{stamp}.png')}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
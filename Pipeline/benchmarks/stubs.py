@@ -0,0 +1,114 @@
+"""
+Backends falsos para rodar as etapas de CPU do pipeline sem rede.
+
+- `StubDatabase`: imita o driver do Neo4j, conta as consultas e não grava nada.
+- `StubSentenceModel`: embeddings determinísticos por hashing de palavras, com
+  a mesma interface de `SentenceTransformer.encode`.
+- `StubLLMResponse`: resposta de chat no formato dos modelos gpt-5
+  (`content[0]["text"]`).
+"""
+
+# Utils
+import re
+import zlib
+from types import SimpleNamespace
+
+# Processamento de dados
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+import torch
+
+from src.sample_selection import normalize_text
+
+# ================================
+# Constants
+# ================================
+EMBEDDING_DIM = 384  # mesma dimensão do all-MiniLM-L6-v2
+
+_WORD = re.compile(r"\w+")
+
+
+class StubCounters(SimpleNamespace):
+    def __init__(self) -> None:
+        super().__init__(nodes_created=0, relationships_created=0, properties_set=0)
+
+
+class StubResult:
+    """Resultado vazio de uma consulta (sem registros, contadores zerados)."""
+
+    def __init__(self, records: Optional[List[Dict[str, Any]]] = None) -> None:
+        self._records = records or []
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def consume(self) -> SimpleNamespace:
+        return SimpleNamespace(counters=StubCounters())
+
+
+class StubSession:
+    def __init__(self, database: "StubDatabase") -> None:
+        self._database = database
+
+    def __enter__(self) -> "StubSession":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    def run(self, query: str, parameters: Optional[Dict[str, Any]] = None, **kwargs: Any) -> StubResult:
+        self._database.queries += 1
+        self._database.query_chars += len(query)
+        return StubResult()
+
+
+class StubDatabase:
+    """Substituto de `Neo4jDatabase` que só conta as consultas montadas."""
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.query_chars = 0
+        self.driver = SimpleNamespace(session=lambda: StubSession(self))
+
+    def close(self) -> None:
+        pass
+
+
+class StubSentenceModel:
+    """
+    Embeddings por hashing das palavras normalizadas (bag of words).
+
+    Textos iguais têm similaridade 1 e textos sem palavras em comum têm
+    similaridade próxima de 0, o que basta para exercitar o casamento de
+    trechos e a segmentação sem carregar o modelo real.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM) -> None:
+        self.dim = dim
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in _WORD.findall(normalize_text(text or "")):
+            vector[zlib.crc32(word.encode("utf-8")) % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        convert_to_tensor: bool = False,
+        convert_to_numpy: bool = True,
+        **kwargs: Any,
+    ):
+        single = isinstance(sentences, str)
+        embeddings = np.stack([self._embed(s) for s in ([sentences] if single else sentences)])
+        if single:
+            embeddings = embeddings[0]
+        return torch.from_numpy(embeddings) if convert_to_tensor else embeddings
+
+
+class StubLLMResponse:
+    """Resposta de chat com o texto em `content[0]["text"]`."""
+
+    def __init__(self, text: str) -> None:
+        self.content = [{"type": "text", "text": text}]
@@ -0,0 +1,254 @@
+"""
+Gerador de debates sintéticos longos, a partir das estatísticas dos
+debates de exemplo.
+
+As durações dos turnos de fala, as pausas entre eles, a chance de o mesmo
+falante continuar, as durações dos segmentos da transcrição e os próprios
+textos são sorteados das distribuições empíricas das fixtures. Tamanho do
+debate e número de participantes são livres.
+"""
+
+# Utils
+import os
+
+# Processamento de dados
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from pyannote.core import Segment
+
+from src.debate_processer import DebateProcesser, DEFAULT_SPEECH_MAX_PAUSE, MIN_TEXT_LENGTH
+from benchmarks.fixtures import FIXTURE_IDS, FIRST_TITULO, load_fixture
+from benchmarks.stubs import StubDatabase, StubSentenceModel
+
+# ================================
+# Constants
+# ================================
+DEFAULT_NUM_MODERATORS = 2
+MODERATOR_SHARE = 0.3  # chance de a palavra voltar ao mediador após um candidato
+
+
+def fit_profile(video_ids: Sequence[str] = FIXTURE_IDS) -> Dict[str, Any]:
+    """
+    Distribuições empíricas dos debates de exemplo.
+
+    Returns:
+        Dicionário com 'turn_durations', 'turn_gaps', 'same_speaker',
+        'segment_durations', 'segment_gaps' e 'texts'.
+    """
+    turn_durations, turn_gaps, segment_durations, segment_gaps = [], [], [], []
+    texts: List[str] = []
+    same, transitions = 0, 0
+
+    for video_id in video_ids:
+        fixture = load_fixture(video_id)
+
+        df_dia = fixture["df_dia"].sort_values("Diarizacao_Start")
+        turn_durations.append((df_dia["Diarizacao_End"] - df_dia["Diarizacao_Start"]).to_numpy())
+        turn_gaps.append(
+            (df_dia["Diarizacao_Start"].shift(-1) - df_dia["Diarizacao_End"]).dropna().to_numpy()
+        )
+        speakers = df_dia["Speaker_ID"].to_numpy()
+        same += int((speakers[1:] == speakers[:-1]).sum())
+        transitions += len(speakers) - 1
+
+        transcript = pd.DataFrame(fixture["segments"]).sort_values("start")
+        segment_durations.append((transcript["end"] - transcript["start"]).to_numpy())
+        segment_gaps.append(
+            (transcript["start"].shift(-1) - transcript["end"]).dropna().clip(lower=0).to_numpy()
+        )
+        texts.extend(t for t in transcript["text"] if isinstance(t, str) and t.strip())
+
+    return {
+        "turn_durations": np.concatenate(turn_durations),
+        "turn_gaps": np.concatenate(turn_gaps),
+        "same_speaker": same / max(transitions, 1),
+        "segment_durations": np.concatenate(segment_durations),
+        "segment_gaps": np.concatenate(segment_gaps),
+        "texts": texts,
+    }
+
+
+def _turns(
+    profile: Dict[str, Any],
+    duration: float,
+    candidates: List[str],
+    moderators: List[str],
+    rng: np.random.Generator,
+) -> pd.DataFrame:
+    """Turnos de fala: mediador -> candidato -> réplica -> mediador..."""
+    rows = []
+    t = 0.0
+    speaker = moderators[0]
+    while t < duration:
+        length = float(rng.choice(profile["turn_durations"]))
+        rows.append((t, t + length, speaker))
+        # Pausas negativas (sobreposição) nunca fazem o tempo voltar
+        t += length + max(float(rng.choice(profile["turn_gaps"])), -0.5 * length)
+
+        if rng.random() < profile["same_speaker"]:
+            continue
+        if speaker in moderators or rng.random() >= MODERATOR_SHARE:
+            others = [c for c in candidates if c != speaker]
+            speaker = others[rng.integers(len(others))]
+        else:
+            speaker = moderators[rng.integers(len(moderators))]
+
+    return pd.DataFrame(rows, columns=["Diarizacao_Start", "Diarizacao_End", "Speaker_ID"])
+
+
+def _segments(
+    profile: Dict[str, Any], duration: float, rng: np.random.Generator
+) -> List[Dict[str, Any]]:
+    """Segmentos da transcrição, no formato do Whisper."""
+    segments = []
+    t = 0.0
+    while t < duration:
+        length = float(rng.choice(profile["segment_durations"]))
+        text = profile["texts"][rng.integers(len(profile["texts"]))]
+        segments.append({"start": round(t, 2), "end": round(t + length, 2), "text": text})
+        t += length + float(rng.choice(profile["segment_gaps"]))
+    return segments
+
+
+def generate_debate(
+    profile: Dict[str, Any],
+    hours: float,
+    num_candidates: int,
+    num_moderators: int = DEFAULT_NUM_MODERATORS,
+    identified_per_candidate: int = 2,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Gera um debate sintético.
+
+    Args:
+        profile: Distribuições de `fit_profile`.
+        hours: Duração do debate.
+        num_candidates: Quantidade de candidatos (pelo menos 2).
+        num_moderators: Quantidade de mediadores.
+        identified_per_candidate: Segmentos da transcrição marcados com o
+                                  candidato, como faria `identify_speakers`.
+        seed: Semente do gerador.
+
+    Returns:
+        Dicionário com 'segments' (transcrição), 'df_dia' (diarização),
+        'identified' (índice do segmento -> candidato), 'speaker_map'
+        (Speaker_ID -> candidato ou None), 'documentos' (candidato -> título),
+        'speeches' (falas já agrupadas e rotuladas) e 'description'.
+    """
+    rng = np.random.default_rng(seed)
+    duration = hours * 3600
+    candidate_ids = [f"SPEAKER_{i:02d}" for i in range(num_candidates)]
+    moderator_ids = [f"SPEAKER_{i:02d}" for i in range(num_candidates, num_candidates + num_moderators)]
+
+    df_dia = _turns(profile, duration, candidate_ids, moderator_ids, rng)
+    df_dia.insert(0, "Track", range(len(df_dia)))
+    df_dia.insert(
+        0,
+        "Segment",
+        [Segment(s, e) for s, e in zip(df_dia["Diarizacao_Start"], df_dia["Diarizacao_End"])],
+    )
+    segments = _segments(profile, duration, rng)
+
+    speaker_map: Dict[str, Optional[str]] = {
+        speaker: f"CANDIDATO {i + 1}" for i, speaker in enumerate(candidate_ids)
+    }
+    speaker_map.update({speaker: None for speaker in moderator_ids})
+    documentos = {
+        name: FIRST_TITULO + i for i, name in enumerate(n for n in speaker_map.values() if n)
+    }
+
+    # Segmentos que caem inteiros dentro de um turno de cada candidato
+    starts = np.array([s["start"] for s in segments])
+    ends = np.array([s["end"] for s in segments])
+    turn_of = np.searchsorted(df_dia["Diarizacao_Start"].to_numpy(), starts, side="right") - 1
+    inside = (turn_of >= 0) & (ends <= df_dia["Diarizacao_End"].to_numpy()[np.maximum(turn_of, 0)])
+    long_enough = np.array([len(s["text"].strip()) > MIN_TEXT_LENGTH for s in segments])
+    speaker_of = df_dia["Speaker_ID"].to_numpy()[np.maximum(turn_of, 0)]
+
+    identified: Dict[int, str] = {}
+    for speaker in candidate_ids:
+        options = np.flatnonzero(inside & long_enough & (speaker_of == speaker))
+        for idx in rng.permutation(options)[:identified_per_candidate]:
+            identified[int(idx)] = speaker_map[speaker]
+
+    return {
+        "segments": segments,
+        "df_dia": df_dia,
+        "identified": identified,
+        "speaker_map": speaker_map,
+        "documentos": documentos,
+        "speeches": _speeches(df_dia, segments, speaker_map),
+        "description": {
+            "title": f"Debate sintético ({hours}h, {num_candidates} candidatos)",
+            "description": "",
+            "upload_date": "01/10/2024",
+        },
+    }
+
+
+def _speeches(
+    df_dia: pd.DataFrame, segments: List[Dict[str, Any]], speaker_map: Dict[str, Optional[str]]
+) -> pd.DataFrame:
+    """
+    Falas rotuladas no formato de `diarize_speakers` ('Speech', 'Candidato',
+    'Start', 'End', 'Text'), sem passar pelo alinhamento.
+
+    Turnos consecutivos do mesmo falante separados por até
+    `DEFAULT_SPEECH_MAX_PAUSE` segundos formam uma fala; cada segmento da
+    transcrição vai para a fala que contém o seu ponto médio.
+    """
+    turns = df_dia.assign(
+        Candidato=df_dia["Speaker_ID"].map(lambda s: speaker_map[s] or s)
+    ).sort_values("Diarizacao_Start")
+    new_speech = (
+        (turns["Diarizacao_Start"] - turns["Diarizacao_End"].shift(1) > DEFAULT_SPEECH_MAX_PAUSE)
+        | (turns["Candidato"] != turns["Candidato"].shift(1))
+    )
+    turns["Speech"] = new_speech.cumsum()
+    speeches = turns.groupby("Speech", as_index=False).agg(
+        Candidato=("Candidato", "first"),
+        Start=("Diarizacao_Start", "min"),
+        End=("Diarizacao_End", "max"),
+    )
+
+    mids = np.array([(s["start"] + s["end"]) / 2 for s in segments])
+    speech_of = np.searchsorted(speeches["Start"].to_numpy(), mids, side="right") - 1
+    valid = (speech_of >= 0) & (mids <= speeches["End"].to_numpy()[np.maximum(speech_of, 0)])
+    texts = pd.Series([s["text"] for s in segments])[valid].groupby(speech_of[valid]).agg("".join)
+    speeches["Text"] = texts.reindex(range(len(speeches))).to_numpy()
+
+    return speeches.loc[speeches["Text"].notna()].reset_index(drop=True)
+
+
+def synthetic_processer(
+    debate: Dict[str, Any], video_id: str, labeled: bool = False, **kwargs: Any
+) -> DebateProcesser:
+    """
+    `DebateProcesser` com a transcrição do debate sintético e os backends
+    falsos. Deve ser usado dentro de `fixture_workdir`, já que o processador
+    grava em `data/downloads/<video_id>`.
+
+    Args:
+        debate: Saída de `generate_debate`.
+        video_id: Identificador usado para a pasta do debate.
+        labeled: Carrega as falas já rotuladas pelo gerador, dispensando
+                 identificação e diarização.
+        kwargs: Vão para o construtor (por exemplo, `chat_model_factory`).
+    """
+    pc = DebateProcesser(video_id=video_id, database=StubDatabase(), interactive=False, **kwargs)
+    os.makedirs(pc.folder_path, exist_ok=True)
+    pc._sentence_model = StubSentenceModel()
+    pc.description = debate["description"]
+    pc.debate = {"cargo": "PREFEITO", "municipio": "", "estado": "SP", "ano": "2024"}
+    pc.result_documentos = debate["documentos"]
+    pc.result_candidatos = list(debate["documentos"])
+    pc._set_transcript(debate["segments"])
+
+    if labeled:
+        pc.speeches = debate["speeches"].copy()
+        pc.df_identified = pd.DataFrame(
+            list(debate["documentos"].items()), columns=["Candidato", "Titulo_Eleitoral"]
+        )
+    return pc
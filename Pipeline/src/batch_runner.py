@@ -0,0 +1,242 @@
+"""
+Processamento em lote de debates, sem intervenção humana.
+
+Debates cuja identificação de participantes falha são estacionados (ver
+`PendingSpeakerAssignment`) e o lote segue com os demais; assim que o
+arquivo de mapeamento aparece na pasta do vídeo, o debate é retomado da
+etapa onde parou.
+
+Com `--retry-failed`, refaz apenas os itens de LLM registrados no ledger
+de falhas de cada debate (`failures.json`) e reingere os resultados.
+
+Uso:
+    python -m src.batch_runner VIDEO_ID [VIDEO_ID ...]
+    python -m src.batch_runner --retry-failed VIDEO_ID [VIDEO_ID ...]
+"""
+
+# Utils
+import argparse
+import asyncio
+import inspect
+import time
+from collections import deque
+
+from src.database import Neo4jDatabase
+from src.debate_processer import DebateProcesser, PendingSpeakerAssignment
+from src.metrics import aggregate_reports
+
+# Processamento de dados
+import json
+from typing import List, Dict, Any, Optional, Tuple
+
+# Ambiente
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ================================
+# Constants
+# ================================
+STAGES = [
+    "download_and_transcribe",
+    "identify",
+    "diarize_speakers",
+    "get_proposals",
+    "calculate_discussions",
+    "ingest_into_database",
+    "ingest_discussion_data",
+]
+DEFAULT_POLL_INTERVAL = 30  # seconds
+
+
+def run_stages(pc: DebateProcesser, first_stage: int = 0) -> None:
+    """
+    Executa as etapas do pipeline a partir de `first_stage`.
+
+    Raises:
+        PendingSpeakerAssignment: Com o índice da etapa em `stage_index`.
+    """
+    for stage_index in range(first_stage, len(STAGES)):
+        logger.info(f"[{pc.video_id}] {STAGES[stage_index]}")
+        try:
+            result = getattr(pc, STAGES[stage_index])()
+            if inspect.iscoroutine(result):
+                asyncio.run(result)
+        except PendingSpeakerAssignment as e:
+            e.stage_index = stage_index
+            raise
+
+
+def save_batch_metrics(reports: List[Dict[str, Any]], metrics_path: str) -> None:
+    """Grava a agregação dos relatórios de métricas dos debates do lote."""
+    with open(metrics_path, "w", encoding="utf-8") as f:
+        json.dump(aggregate_reports(reports), f, ensure_ascii=False, indent=2)
+    logger.info(f"Métricas do lote gravadas em {metrics_path}")
+
+
+def run_batch(
+    video_ids: List[str],
+    database: Neo4jDatabase,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    wait_for_parked: bool = True,
+    metrics_path: Optional[str] = None,
+    **processer_kwargs: Any,
+) -> Dict[str, str]:
+    """
+    Processa uma fila de debates sem bloquear em identificações manuais.
+
+    Args:
+        video_ids: IDs dos vídeos do YouTube.
+        database: Instância do banco de dados Neo4j.
+        poll_interval: Intervalo, em segundos, entre verificações dos arquivos
+                       de mapeamento quando só restam debates estacionados.
+        wait_for_parked: Se False, retorna ao fim da fila mesmo com debates
+                         estacionados (que poderão ser retomados numa próxima execução).
+        metrics_path: Se informado, grava neste arquivo as métricas agregadas
+                      dos debates concluídos ou com falha. As de cada debate
+                      ficam em `metrics.json`, na pasta do vídeo.
+        **processer_kwargs: Argumentos repassados ao `DebateProcesser`.
+
+    Returns:
+        Dicionário video_id -> status ("done", "parked" ou "failed").
+    """
+    processer_kwargs["interactive"] = False
+    queue: deque = deque(
+        (DebateProcesser(video_id=video_id, database=database, **processer_kwargs), 0)
+        for video_id in video_ids
+    )
+    parked: Dict[str, Tuple[DebateProcesser, int, str]] = {}
+    status: Dict[str, str] = {}
+    reports: List[Dict[str, Any]] = []
+
+    def release_parked() -> None:
+        for video_id, (pc, stage_index, mapping_path) in list(parked.items()):
+            if os.path.exists(mapping_path):
+                logger.info(f"[{video_id}] Mapping found, resuming at {STAGES[stage_index]}")
+                del parked[video_id]
+                queue.append((pc, stage_index))
+
+    while queue or parked:
+        if not queue:
+            if not wait_for_parked:
+                break
+            time.sleep(poll_interval)
+            release_parked()
+            continue
+
+        pc, first_stage = queue.popleft()
+        try:
+            run_stages(pc, first_stage)
+            status[pc.video_id] = "done"
+        except PendingSpeakerAssignment as e:
+            logger.warning(str(e))
+            parked[pc.video_id] = (pc, e.stage_index, e.mapping_path)
+            status[pc.video_id] = "parked"
+        except Exception as e:
+            logger.exception(f"[{pc.video_id}] Falha no processamento: {e}")
+            status[pc.video_id] = "failed"
+
+        if status[pc.video_id] != "parked":
+            reports.append(pc.save_metrics())
+        release_parked()
+
+    if metrics_path:
+        save_batch_metrics(reports, metrics_path)
+    return status
+
+
+def retry_batch(
+    video_ids: List[str],
+    database: Neo4jDatabase,
+    metrics_path: Optional[str] = None,
+    **processer_kwargs: Any,
+) -> Dict[str, str]:
+    """
+    Refaz os itens com falha de debates já processados e reingere os resultados.
+
+    Args:
+        video_ids: IDs dos vídeos do YouTube.
+        database: Instância do banco de dados Neo4j.
+        metrics_path: Se informado, grava neste arquivo as métricas agregadas.
+        **processer_kwargs: Argumentos repassados ao `DebateProcesser`.
+
+    Returns:
+        Dicionário video_id -> status ("done", "failed" se ainda restam falhas
+        ou houve erro, ou "missing" se não há estado salvo).
+    """
+    processer_kwargs["interactive"] = False
+    status: Dict[str, str] = {}
+    reports: List[Dict[str, Any]] = []
+
+    for video_id in video_ids:
+        pc = DebateProcesser(video_id=video_id, database=database, **processer_kwargs)
+        if not pc.load_state():
+            logger.warning(f"[{video_id}] Nenhum estado salvo para refazer falhas.")
+            status[video_id] = "missing"
+            continue
+
+        try:
+            remaining = asyncio.run(pc.retry_failed())
+            pc.ingest_into_database()
+            pc.ingest_discussion_data()
+            status[video_id] = "failed" if remaining else "done"
+        except Exception as e:
+            logger.exception(f"[{video_id}] Falha ao refazer itens: {e}")
+            status[video_id] = "failed"
+        reports.append(pc.save_metrics())
+
+    if metrics_path:
+        save_batch_metrics(reports, metrics_path)
+    return status
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Processa debates em lote.")
+    parser.add_argument("video_ids", nargs="+", help="IDs dos vídeos do YouTube")
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help="Segundos entre verificações de arquivos de mapeamento",
+    )
+    parser.add_argument(
+        "--no-wait",
+        action="store_true",
+        help="Não espera por debates estacionados ao fim da fila",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Refaz apenas os itens de LLM registrados no ledger de falhas",
+    )
+    parser.add_argument(
+        "--metrics",
+        default=None,
+        help="Arquivo JSON para as métricas agregadas do lote",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    database = Neo4jDatabase()
+    try:
+        if args.retry_failed:
+            status = retry_batch(args.video_ids, database, metrics_path=args.metrics)
+        else:
+            status = run_batch(
+                args.video_ids,
+                database,
+                poll_interval=args.poll_interval,
+                wait_for_parked=not args.no_wait,
+                metrics_path=args.metrics,
+            )
+    finally:
+        database.close()
+
+    for video_id, video_status in status.items():
+        print(f"{video_id}: {video_status}")
+    return 0 if all(v == "done" for v in status.values()) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+# Utils
+import json
+from functools import lru_cache
+
+# Processamento de dados
+from typing import List
+from nltk.tokenize import sent_tokenize
+import tiktoken
+
+# ================================
+# Constants
+# ================================
+DEFAULT_MAX_SPEECH_TOKENS = 2000
+TOKEN_ENCODING = "o200k_base"  # família gpt-4o / gpt-4.1
+NO_PROPOSALS = "Sem propostas"
+
+
+@lru_cache(maxsize=None)
+def _encoding(name: str = TOKEN_ENCODING) -> tiktoken.Encoding:
+    return tiktoken.get_encoding(name)
+
+
+def count_tokens(text: str) -> int:
+    """Quantidade de tokens de `text` no tokenizador dos modelos usados."""
+    return len(_encoding().encode(text or ""))
+
+
+def split_by_tokens(text: str, max_tokens: int = DEFAULT_MAX_SPEECH_TOKENS) -> List[str]:
+    """
+    Divide um texto em partes de até `max_tokens` tokens, em fronteiras de frase.
+
+    Frases são agrupadas gulosamente; uma frase maior que o orçamento é
+    cortada em pedaços de `max_tokens` tokens.
+
+    Args:
+        text: Texto a dividir.
+        max_tokens: Orçamento de tokens por parte.
+
+    Returns:
+        Lista de partes, em ordem. Textos dentro do orçamento voltam inteiros.
+    """
+    if count_tokens(text) <= max_tokens:
+        return [text]
+
+    encoding = _encoding()
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for sentence in sent_tokenize(text, language="portuguese"):
+        tokens = encoding.encode(sentence)
+        if len(tokens) > max_tokens:
+            if current:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            chunks.extend(
+                encoding.decode(tokens[i : i + max_tokens])
+                for i in range(0, len(tokens), max_tokens)
+            )
+            continue
+
+        if current_tokens + len(tokens) > max_tokens:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += len(tokens)
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def merge_proposals(responses: List[str]) -> str:
+    """
+    Junta as respostas de `proposal_template` de cada parte de uma fala.
+
+    Cada resposta é uma lista JSON de propostas ou "Sem propostas". O
+    resultado segue o mesmo formato de uma resposta única.
+    """
+    proposals: List[str] = []
+    for response in responses:
+        response = (response or "").strip()
+        if not response or response.startswith(NO_PROPOSALS):
+            continue
+        try:
+            items = json.loads(response)
+        except json.JSONDecodeError:
+            items = [response]
+        if isinstance(items, str):
+            items = [items]
+        for item in items:
+            if item not in proposals:
+                proposals.append(item)
+
+    return json.dumps(proposals, ensure_ascii=False) if proposals else NO_PROPOSALS
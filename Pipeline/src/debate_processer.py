@@ -1,28 +1,74 @@
 # Utils
 from src.my_utils import (
     download_audio,
+    download_audio_range,
+    window_audio_path,
+    prepare_window_audio,
+    pyannote_input,
+    load_pcm,
     create_path,
     transcribe_with_whisper,
+    iter_transcribe_with_whisper,
     normalize_scores,
     extract_video_info,
     find_best_match,
     best_match_with_splits,
 )
 from src.database import Neo4jDatabase
+from src.diarization import diarize_in_windows
+from src.voiceprints import (
+    VoiceprintIndex,
+    LABELED_DIARIZATION_FILENAME,
+    DEFAULT_MATCH_THRESHOLD,
+    DEFAULT_MATCH_MARGIN,
+    load_embedding_inference,
+    speaker_embeddings,
+)
+from src.segmentation import (
+    CONTINUATION,
+    BOUNDARY,
+    gap_similarities,
+    depth_scores,
+    classify_gaps,
+    segments_from_gaps,
+    ambiguous_regions,
+    discussion_labels,
+)
+from src.proposal_gate import proposal_gate, audit_sample
+from src.dedup import duplicate_groups
+from src.ledger import FailureLedger, FAILURES_FILENAME
+from src.metrics import PipelineMetrics, METRICS_FILENAME, stage_method
+from src.chunking import (
+    DEFAULT_MAX_SPEECH_TOKENS,
+    count_tokens,
+    split_by_tokens,
+    merge_proposals,
+)
+from src.sample_selection import (
+    DEFAULT_SAMPLE_CHUNK_LENGTH,
+    split_sample_chunks,
+    select_sample_chunks,
+    join_chunks,
+)
 
 # AI
 from src.prompts import (
     identifier_template,
+    sample_checker_template,
     debate_info_template,
     proposal_template,
+    speech_analysis_template,
     coherence_template,
     relevance_template,
+    relevance_batch_template,
     s_summary_template,
+    s_summary_batch_template,
     q_summary_template,
     qa_template,
 )
 from langchain.chat_models import init_chat_model
 from pyannote.audio import Pipeline as pya_Pipeline
+from pyannote.core import Segment
 from transformers import pipeline as hf_pipeline
 import torch
 
@@ -30,9 +76,10 @@ import torch
 from pydantic import BaseModel, Field, ValidationError
 from openai import RateLimitError  # funciona com SDK atual
 from langchain_core.exceptions import LangChainException
-from typing import List, Optional, Dict, Any, Union
-import networkx as nx
+from langchain_core.callbacks import get_usage_metadata_callback
+from typing import Callable, List, Optional, Dict, Any, Union
 import asyncio
+import contextlib
 from tqdm import tqdm
 from tqdm.asyncio import tqdm as tqdm_asyncio
 import numpy as np
@@ -48,7 +95,10 @@ import json
 # Ambiente
 import os
 import sys
+import time
 import logging
+import threading
+from contextlib import contextmanager
 import dotenv
 
 # Configure logging
@@ -70,9 +120,23 @@ DEFAULT_SPEECH_MAX_PAUSE = 20  # seconds
 MIN_OVERLAP_PROPORTION = 0.1
 MIN_TEXT_LENGTH = 20
 MAX_RETRY_ATTEMPTS = 3
+DEFAULT_NUM_MODERATORS = 2
+MIN_DEBATE_CANDIDATES = 2  # um debate tem pelo menos dois candidatos
+DEFAULT_DIARIZATION_OVERLAP = 30  # seconds
+SAMPLE_RATE = 16000  # Hz, ver `prepare_audio`
 TRANSCRIPT_FILENAME = "transcript.pkl"
+TRANSCRIPT_PARTIAL_FILENAME = "transcript.partial.jsonl"
 DIARIZATION_FILENAME = "df_dia.pkl"
 DESCRIPTION_FILENAME = "description.pkl"
+PENDING_ASSIGNMENT_FILENAME = "pending_assignment.json"
+SPEAKER_MAPPING_FILENAME = "speaker_mapping.json"
+STATE_FILENAME = "processing_state.pkl"  # falas e resultados para `retry_failed`
+SENTENCE_MODEL = "all-MiniLM-L6-v2"
+DISCUSSION_MODES = ("llm", "hybrid", "local")
+DEFAULT_LLM_BATCH_SIZE = 1  # itens por chamada estruturada (1 = uma chamada por item)
+DEFAULT_PROPOSAL_GATE_AUDIT = 0.05  # fração das falas puladas que ainda vai à LLM
+DEFAULT_COHERENCE_PREFIX_GROUP = 1  # âncoras que compartilham o início da janela de coerência
+DISCUSSION_STAGES = ("coherence", "qa", "question_summary", "speech_summary", "relevance")
 
 # ================================
 # Configurações para Embeddings
@@ -87,20 +151,33 @@ torch.backends.cuda.matmul.allow_tf32 = True
 torch.backends.cudnn.allow_tf32 = True
 
 # ================================
-# Configurações de APIs
+# Modelos (carregados no primeiro uso, para que importar o módulo não
+# dependa de rede nem de GPU)
 # ================================
-pipeline = pya_Pipeline.from_pretrained(
-    "pyannote/speaker-diarization-3.1",
-    use_auth_token=os.getenv("HF_API_KEY"),
-)
+_diarization_pipeline: Optional[pya_Pipeline] = None
+_classifier = None
 
-# ================================
-# Configurações do Classificador
-# ================================
-classifier = hf_pipeline(
-    "zero-shot-classification",
-    model="joeddav/xlm-roberta-large-xnli",  # suporta PT
-)
+
+def get_diarization_pipeline() -> pya_Pipeline:
+    """Pipeline de diarização do pyannote (carregado uma única vez)."""
+    global _diarization_pipeline
+    if _diarization_pipeline is None:
+        _diarization_pipeline = pya_Pipeline.from_pretrained(
+            "pyannote/speaker-diarization-3.1",
+            use_auth_token=os.getenv("HF_API_KEY"),
+        )
+    return _diarization_pipeline
+
+
+def get_classifier():
+    """Classificador zero-shot usado em `classify_phrases` (carregado uma única vez)."""
+    global _classifier
+    if _classifier is None:
+        _classifier = hf_pipeline(
+            "zero-shot-classification",
+            model="joeddav/xlm-roberta-large-xnli",  # suporta PT
+        )
+    return _classifier
 
 CLASSIFICATION_LABELS = [
     "Propositiva",
@@ -115,6 +192,24 @@ CLASSIFICATION_LABELS = [
 ]
 
 
+class PendingSpeakerAssignment(Exception):
+    """
+    Levantada quando a identificação automática falha em modo não interativo.
+
+    O processamento do debate fica parado até que o arquivo de mapeamento
+    (`SPEAKER_MAPPING_FILENAME`) seja criado na pasta do vídeo.
+    """
+
+    def __init__(self, video_id: str, pending_path: str, mapping_path: str) -> None:
+        self.video_id = video_id
+        self.pending_path = pending_path
+        self.mapping_path = mapping_path
+        super().__init__(
+            f"Debate {video_id} aguardando identificação manual: preencha {mapping_path} "
+            f"(ver {pending_path})"
+        )
+
+
 class DebateProcesser:
     """Processador de debates eleitorais para extração e análise de conteúdo."""
 
@@ -124,7 +219,31 @@ class DebateProcesser:
         database: Neo4jDatabase,
         sample_length: int = DEFAULT_SAMPLE_LENGTH,
         debate_start: int = DEFAULT_DEBATE_START,
+        debate_end: Optional[int] = None,
         manual_identification: bool = False,
+        range_download: bool = False,
+        transcription_workers: int = 1,
+        diarization_device: Optional[str] = None,
+        segmentation_batch_size: Optional[int] = None,
+        embedding_batch_size: Optional[int] = None,
+        diarization_threads: Optional[int] = None,
+        num_moderators: int = DEFAULT_NUM_MODERATORS,
+        diarization_window: Optional[int] = None,
+        diarization_overlap: int = DEFAULT_DIARIZATION_OVERLAP,
+        diarization_workers: int = 1,
+        voiceprints: Optional[VoiceprintIndex] = None,
+        interactive: bool = True,
+        sample_top_k: Optional[int] = None,
+        sample_chunk_length: int = DEFAULT_SAMPLE_CHUNK_LENGTH,
+        sample_checker: bool = False,
+        discussion_mode: str = "llm",
+        llm_batch_size: int = DEFAULT_LLM_BATCH_SIZE,
+        coherence_prefix_group: int = DEFAULT_COHERENCE_PREFIX_GROUP,
+        use_proposal_gate: bool = False,
+        proposal_gate_audit: float = DEFAULT_PROPOSAL_GATE_AUDIT,
+        max_speech_tokens: int = DEFAULT_MAX_SPEECH_TOKENS,
+        trace_memory: bool = False,
+        chat_model_factory: Optional[Callable[..., Any]] = None,
     ) -> None:
         """
         Inicializa o processador de debates.
@@ -134,33 +253,164 @@ class DebateProcesser:
             database: Instância do banco de dados Neo4j
             sample_length: Tempo em segundos do sample usado para identificação
                           dos participantes (padrão: 2100s)
+            debate_start: Início do debate em segundos (pula a pré-transmissão)
+            debate_end: Fim do debate em segundos (None vai até o fim do vídeo).
+                        Transcrição e diarização rodam apenas nesta janela.
+            range_download: Se True, baixa apenas a janela do debate, direto em
+                            WAV 16 kHz mono, em vez do áudio completo em m4a.
+            transcription_workers: Processos de transcrição no modo streaming.
+            diarization_device: Dispositivo do pyannote ("cuda", "cpu"...).
+                                None detecta automaticamente.
+            segmentation_batch_size: Batch size do modelo de segmentação do pyannote.
+            embedding_batch_size: Batch size do modelo de embeddings do pyannote.
+            diarization_threads: Threads do PyTorch usadas na diarização em CPU.
+            num_moderators: Quantidade de falantes que não são candidatos
+                            (mediadores, jornalistas), usada para limitar o
+                            número de falantes na diarização.
+            diarization_window: Se informado, diariza em janelas deste tamanho
+                                (segundos) e reconcilia os falantes num clustering
+                                global, limitando o pico de memória.
+            diarization_overlap: Sobreposição entre janelas de diarização (segundos).
+            diarization_workers: Processos paralelos na diarização em janelas.
+            voiceprints: Índice de impressões de voz dos candidatos. Se informado,
+                         `identify_speakers` tenta identificar os falantes por voz
+                         antes de chamar a LLM, e os debates rotulados por LLM ou
+                         manualmente alimentam o índice.
+            interactive: Se False, a identificação manual não usa `input()`: grava
+                         `pending_assignment.json` e levanta `PendingSpeakerAssignment`
+                         até que `speaker_mapping.json` exista na pasta do vídeo.
+            sample_top_k: Se informado, o sample é dividido em trechos de
+                          `sample_chunk_length` segundos e só os `sample_top_k`
+                          mais promissores (apresentações, nomes dos candidatos)
+                          são enviados às LLMs de identificação.
+            sample_chunk_length: Duração, em segundos, dos trechos do sample.
+            sample_checker: Se True, os trechos pré-selecionados pela heurística
+                            passam ainda pelo `sample_checker_template` num modelo
+                            barato antes da seleção final.
+            discussion_mode: Como agrupar as falas em discussões. "llm" envia
+                             janelas sobrepostas a partir de uma âncora a cada 3
+                             falas; "hybrid" detecta mudanças de assunto com
+                             embeddings e só consulta a LLM nas fronteiras ambíguas;
+                             "local" usa apenas os embeddings e não faz nenhuma
+                             chamada de LLM (sem Q&A, resumos nem relevância).
+            llm_batch_size: Falas (ou pares pergunta/resposta) enviadas por chamada
+                            nos resumos e na avaliação de relevância. O padrão, 1,
+                            faz uma chamada por item; valores maiores usam os
+                            prompts em lote, e itens ausentes ou inválidos na
+                            resposta são refeitos individualmente (contagens em
+                            `batch_stats`).
+            coherence_prefix_group: Âncoras de coerência consecutivas que
+                                    compartilham o início da janela (e o prefixo
+                                    do prompt). 1 mantém uma janela própria por
+                                    âncora; valores maiores alargam as janelas
+                                    das demais âncoras do grupo (mais tokens de
+                                    entrada e mais contexto anterior à âncora)
+                                    em troca de acertos no cache de prompt.
+            use_proposal_gate: Se True, `get_proposals` só envia à LLM as falas
+                               que a heurística de `src/proposal_gate.py` considera
+                               plausíveis; as demais ficam sem proposta. Troca
+                               cobertura (propostas em falas puladas se perdem)
+                               por menos chamadas, por isso é opcional.
+            proposal_gate_audit: Fração das falas puladas pelo filtro que ainda
+                                 assim é enviada à LLM, para medir quantas
+                                 propostas o filtro perde (ver
+                                 `proposal_gate_stats`).
+            max_speech_tokens: Falas acima deste número de tokens são divididas
+                               em frases e processadas por partes em paralelo
+                               (propostas e resumos), com os resultados
+                               parciais combinados ao final.
+            trace_memory: Se True, `self.metrics` também registra o pico de
+                          alocações Python (`tracemalloc`) de cada etapa. Tem
+                          custo de CPU relevante; use para diagnóstico.
+            chat_model_factory: Substitui `init_chat_model` na criação dos
+                                modelos de chat (mesma assinatura). Permite
+                                usar um modelo falso nos testes de carga.
         """
+        if discussion_mode not in DISCUSSION_MODES:
+            raise ValueError(
+                f"discussion_mode inválido: {discussion_mode!r} (use um de {DISCUSSION_MODES})"
+            )
+
         # Config
         self.debate_start = debate_start
+        self.debate_end = debate_end
         self.database: Neo4jDatabase = database
         self.sample_length: int = sample_length
         self.video_id: str = video_id
         self.folder_path: str = f"./data/downloads/{self.video_id}"
         self.speech_max_pause: int = DEFAULT_SPEECH_MAX_PAUSE
         self.manual_identification = manual_identification
+        self.range_download = range_download
+        self.transcription_workers = transcription_workers
+        self.diarization_device = diarization_device
+        self.segmentation_batch_size = segmentation_batch_size
+        self.embedding_batch_size = embedding_batch_size
+        self.diarization_threads = diarization_threads
+        self.num_moderators = num_moderators
+        self.diarization_window = diarization_window
+        self.diarization_overlap = diarization_overlap
+        self.diarization_workers = diarization_workers
+        self.voiceprints = voiceprints
+        self.interactive = interactive
+        self.sample_top_k = sample_top_k
+        self.sample_chunk_length = sample_chunk_length
+        self.sample_checker = sample_checker
+        self.discussion_mode = discussion_mode
+        self.llm_batch_size = llm_batch_size
+        self.coherence_prefix_group = coherence_prefix_group
+        self.use_proposal_gate = use_proposal_gate
+        self.proposal_gate_audit = proposal_gate_audit
+        self.max_speech_tokens = max_speech_tokens
+        self._init_chat_model = chat_model_factory or init_chat_model
 
         # Dados Intermediários
         self.transcript: Optional[pd.DataFrame] = None
         self.sample: Optional[str] = None
+        self.sample_chunks: List[str] = []
+        self._checker_votes: Optional[Dict[int, bool]] = None
         self.description: Optional[Dict[str, Any]] = None
         self.identification_failed: bool = False
+        self.result_candidatos: List[str] = []
+        self.result_documentos: Dict[str, str] = {}
+        self.diarization_rtf: Optional[float] = None
+        self.llm_usage: Dict[str, Dict[str, int]] = {}
+        self.proposal_gate_stats: Optional[Dict[str, Any]] = None
+        self.dedup_stats: Dict[str, Dict[str, int]] = {}
+        self.batch_stats: Dict[str, Dict[str, int]] = {}
+        self.ledger = FailureLedger(os.path.join(self.folder_path, FAILURES_FILENAME))
+        self.coherence_results: List[Dict[str, Any]] = []
+        self.metrics = PipelineMetrics(video_id, trace_memory=trace_memory)
+        self.speaker_centroids: Optional[Dict[str, np.ndarray]] = None
+        self.speaker_map: Optional[Dict[str, Optional[str]]] = None
+        self._embedding_inference = None
+        self._sentence_model: Optional[SentenceTransformer] = None
         self.df_dia: Optional[pd.DataFrame] = None
         self.df_identified: Optional[pd.DataFrame] = None
         self.debate: Optional[Dict[str, Any]] = None
 
+        # Transcrição incremental (ver `download_and_transcribe(stream=True)`)
+        self._segments: List[Dict[str, Any]] = []
+        self._segments_lock = threading.Lock()
+        self._sample_ready = threading.Event()
+        self._transcription_thread: Optional[threading.Thread] = None
+        self._transcription_error: Optional[BaseException] = None
+
         # Outputs
         self.phrases: Optional[pd.DataFrame] = None
         self.speeches: Optional[pd.DataFrame] = None
 
-    def download_and_transcribe(self) -> None:
+    @stage_method()
+    def download_and_transcribe(self, stream: bool = False) -> None:
         """
         Faz o download do áudio do debate e transcreve usando Whisper.
 
+        Args:
+            stream: Se True, a transcrição roda em segundo plano e o método
+                    retorna assim que o trecho usado como sample estiver
+                    transcrito. `identify_video_info` e `identify_speakers`
+                    podem rodar enquanto o restante é transcrito; as etapas que
+                    precisam da transcrição completa chamam `wait_for_transcript`.
+
         Raises:
             Exception: Se o arquivo baixado estiver vazio.
         """
@@ -197,10 +447,22 @@ class DebateProcesser:
                         logger.warning(f"Failed to remove empty file {candidate}: {e}")
 
         # Verifica se já existe transcrição salva
-        transcript_pkl = os.path.join(self.folder_path, TRANSCRIPT_FILENAME)
+        transcript_pkl = self._window_cache_path(TRANSCRIPT_FILENAME)
         transcript_exists = os.path.exists(transcript_pkl)
 
-        if not audio_path and not transcript_exists:
+        if self.range_download and not transcript_exists:
+            # O WAV da janela já é o artefato usado por Whisper e pyannote
+            download_audio_range(
+                f"https://www.youtube.com/watch?v={self.video_id}",
+                output_path=window_audio_path(
+                    os.path.join(self.folder_path, "audio.wav"),
+                    self.debate_start,
+                    self.debate_end,
+                ),
+                start=self.debate_start,
+                end=self.debate_end,
+            )
+        elif not audio_path and not transcript_exists:
             downloaded_file = download_audio(
                 f"https://www.youtube.com/watch?v={self.video_id}",
                 output_path=os.path.join(self.folder_path, "video.%(ext)s"),
@@ -215,71 +477,256 @@ class DebateProcesser:
             logger.info("Loading existing transcript")
             with open(transcript_pkl, "rb") as f:
                 segments = pickle.load(f)
+        elif stream:
+            logger.info("Transcribing audio with Whisper (streaming)")
+            self._start_streaming_transcription(transcript_pkl)
+
+            # Espera apenas o suficiente para montar o sample
+            self._sample_ready.wait()
+            if self._transcription_error is not None:
+                raise self._transcription_error
+
+            with self._segments_lock:
+                segments = list(self._segments)
         else:
             logger.info("Transcribing audio with Whisper")
-            segments = transcribe_with_whisper(self.folder_path)
+            segments = transcribe_with_whisper(
+                self.folder_path, start=self.debate_start, end=self.debate_end
+            )
             with open(transcript_pkl, "wb") as f:
                 pickle.dump(segments, f)
 
+        self._set_transcript(segments)
+
+    def _window_cache_path(self, filename: str) -> str:
+        """
+        Caminho de um artefato calculado só na janela do debate.
+
+        A janela entra no nome do arquivo, como em `window_audio_path`
+        (ex: 'transcript_1200_9000.pkl'), para que uma execução com outra
+        janela não reaproveite a transcrição ou a diarização de um recorte
+        diferente. Sem janela, o nome continua o original.
+        """
+        return window_audio_path(
+            os.path.join(self.folder_path, filename), self.debate_start, self.debate_end
+        )
+
+    def _set_transcript(self, segments: List[Dict[str, Any]]) -> None:
+        """Monta `self.transcript` e o sample de identificação a partir dos segmentos."""
         # Amostra que será usada para identificação dos participantes
         transcript = pd.DataFrame(segments)
         in_sample = (transcript["start"] >= self.debate_start) & (transcript["start"] <= (self.sample_length + self.debate_start))
 
         sample = transcript.loc[in_sample]
+        self.sample_chunks = split_sample_chunks(sample, self.sample_chunk_length)
+        self._checker_votes = None
         sample = " ".join([item["text"] for _, item in sample.iterrows()])
 
-        self.transcript = transcript.loc[transcript["start"] >= self.debate_start]
+        in_window = transcript["start"] >= self.debate_start
+        if self.debate_end is not None:
+            in_window &= transcript["start"] <= self.debate_end
+
+        self.transcript = transcript.loc[in_window]
         self.sample = sample
+
+    def _start_streaming_transcription(self, transcript_pkl: str) -> None:
+        """Inicia a thread que consome `iter_transcribe_with_whisper`."""
+        partial_path = self._window_cache_path(TRANSCRIPT_PARTIAL_FILENAME)
+        sample_end = self.debate_start + self.sample_length
+
+        def worker() -> None:
+            try:
+                for segment in iter_transcribe_with_whisper(
+                    self.folder_path,
+                    partial_path=partial_path,
+                    start=self.debate_start,
+                    end=self.debate_end,
+                    workers=self.transcription_workers,
+                ):
+                    with self._segments_lock:
+                        self._segments.append(segment)
+                    if segment["start"] > sample_end:
+                        self._sample_ready.set()
+
+                with open(transcript_pkl, "wb") as f:
+                    pickle.dump(self._segments, f)
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+                logger.info("Streaming transcription completed")
+            except BaseException as e:
+                logger.error(f"Erro na transcrição: {e}")
+                self._transcription_error = e
+            finally:
+                # Debates mais curtos que o sample também liberam a espera
+                self._sample_ready.set()
+
+        self._segments = []
+        self._sample_ready.clear()
+        self._transcription_error = None
+        self._transcription_thread = threading.Thread(
+            target=worker, name=f"transcription-{self.video_id}", daemon=True
+        )
+        self._transcription_thread.start()
+
+    def wait_for_transcript(self) -> None:
+        """
+        Aguarda o fim da transcrição em segundo plano e substitui o transcript
+        parcial pelo completo, preservando as colunas de identificação já
+        atribuídas por `identify_speakers`.
+        """
+        if self._transcription_thread is None:
+            return
+
+        logger.info("Waiting for streaming transcription to finish")
+        self._transcription_thread.join()
+        self._transcription_thread = None
+
+        if self._transcription_error is not None:
+            raise self._transcription_error
+
+        partial = self.transcript
+        self._set_transcript(self._segments)
+
+        # Os índices do transcript parcial são um prefixo dos índices do completo
+        identified_cols = [
+            col for col in ["Candidato", "Titulo_Eleitoral", "Trecho_ID"]
+            if partial is not None and col in partial.columns
+        ]
+        for col in identified_cols:
+            self.transcript[col] = partial[col].reindex(self.transcript.index)
     
+    @stage_method()
     def identify_video_info(self) -> None:
         """Identifica informações do debate usando LLM."""
         # OpenAI call para identificar candidatos em trechos
-        gpt_5_mini = init_chat_model(
+        with self._track_usage("identify_video_info"):
+            response = self._debate_info_chain().invoke(self._debate_info_inputs())
+        estado = self._parse_debate_info(response)["estado"]
+
+        self._set_debate_info(response, self._query_cargos(), self._query_cidades(estado))
+
+    def _sample_depends_on_names(self) -> bool:
+        """True se o sample de identificação é escolhido por trechos (e pode mudar com os nomes)."""
+        return self.sample_top_k is not None and len(self.sample_chunks) > self.sample_top_k
+
+    def _identification_sample(self, names: Optional[List[str]] = None) -> str:
+        """
+        Texto enviado às LLMs de identificação.
+
+        Sem `sample_top_k` é o sample completo. Caso contrário, apenas os
+        trechos mais promissores segundo `select_sample_chunks`.
+
+        Args:
+            names: Nomes dos candidatos válidos, quando já conhecidos
+                   (melhoram a pontuação dos trechos).
+        """
+        if not self._sample_depends_on_names():
+            return self.sample
+
+        if self.sample_checker and self._checker_votes is None:
+            self._checker_votes = self._check_sample_chunks(names)
+
+        indices = select_sample_chunks(
+            self.sample_chunks, self.sample_top_k, names, self._checker_votes
+        )
+        sample = join_chunks(self.sample_chunks, indices)
+        logger.info(
+            f"Sample de identificação: {len(indices)}/{len(self.sample_chunks)} trechos, "
+            f"{len(sample)}/{len(self.sample)} caracteres"
+        )
+        return sample
+
+    def _check_sample_chunks(self, names: Optional[List[str]] = None) -> Dict[int, bool]:
+        """
+        Consulta o `sample_checker_template` nos trechos pré-selecionados.
+
+        Só os `2 * sample_top_k` trechos de maior pontuação heurística são
+        enviados, em paralelo, a um modelo barato.
+
+        Returns:
+            Índice do trecho -> True se o modelo respondeu "Sim".
+        """
+        candidates = select_sample_chunks(self.sample_chunks, 2 * self.sample_top_k, names)
+
+        gpt_5_nano = self._init_chat_model(
+            model="gpt-5-nano",
+            model_provider="openai",
+            reasoning={"effort": "minimal"},
+        )
+        chain = sample_checker_template | gpt_5_nano
+
+        try:
+            responses = chain.batch(
+                [{"transcription_segment": self.sample_chunks[i]} for i in candidates]
+            )
+        except Exception as e:
+            logger.warning(f"Falha no verificador de sample, usando só a heurística: {e}")
+            return {}
+
+        return {
+            i: response.content[0]["text"].strip().lower().startswith("sim")
+            for i, response in zip(candidates, responses)
+        }
+
+    def _debate_info_chain(self):
+        gpt_5_mini = self._init_chat_model(
             model="gpt-5-mini",
             model_provider="openai",
             verbosity="medium",
             reasoning={"effort": "low"},
         )
-
-        chain = debate_info_template | gpt_5_mini
-        response = chain.invoke(
-            {
-                "video_title": self.description["title"],
-                "video_description": self.description["description"],
-                "transcription_segment": self.sample,
-                "video_publish_date": self.description["upload_date"],
-            }
+        return debate_info_template | gpt_5_mini
+
+    def _debate_info_inputs(self, sample: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "video_title": self.description["title"],
+            "video_description": self.description["description"],
+            "transcription_segment": sample or self._identification_sample(),
+            "video_publish_date": self.description["upload_date"],
+        }
+
+    def _identifier_chain(self):
+        gpt_5 = self._init_chat_model(
+            model="gpt-5",
+            model_provider="openai",
+            reasoning={"effort": "medium"},
         )
+        return identifier_template | gpt_5
 
-        self.debate = json.loads(response.content[0]["text"])
-
-        # Obter os valores de cargos e cidades do banco de dados
-        query_cargos = "MATCH (c:Cargo) RETURN DISTINCT c.ds_cargo AS cargo"
-        query_cidades = (
-            "MATCH (e:Eleicao) WHERE e.uf = $estado "
-            "RETURN DISTINCT e.nm_ue AS cidade"
-        )
+    @staticmethod
+    def _parse_debate_info(response) -> Dict[str, Any]:
+        return json.loads(response.content[0]["text"])
 
-        result_cargos: List[str] = []
-        result_cidades: List[str] = []
+    def _run_query(self, query: str, column: str, **params: Any) -> List[Any]:
+        """Executa uma consulta de leitura com retentativas e retorna uma coluna."""
         tentativas = MAX_RETRY_ATTEMPTS
-
         while tentativas > 0:
             try:
-                with self.database.driver.session() as session:
-                    result_cargos = [
-                        record["cargo"] for record in session.run(query_cargos)
-                    ]
-                    result_cidades = [
-                        record["cidade"]
-                        for record in session.run(
-                            query_cidades, estado=self.debate["estado"]
-                        )
-                    ]
-                    break
+                with self._session("identification", count_writes=False) as session:
+                    return [record[column] for record in session.run(query, **params)]
             except Exception as e:
                 logger.error(f"Erro ao consultar o banco de dados: {e}")
                 tentativas -= 1
+        return []
+
+    def _query_cargos(self) -> List[str]:
+        return self._run_query(
+            "MATCH (c:Cargo) RETURN DISTINCT c.ds_cargo AS cargo", "cargo"
+        )
+
+    def _query_cidades(self, estado: str) -> List[str]:
+        return self._run_query(
+            "MATCH (e:Eleicao) WHERE e.uf = $estado "
+            "RETURN DISTINCT e.nm_ue AS cidade",
+            "cidade",
+            estado=estado,
+        )
+
+    def _set_debate_info(
+        self, response, result_cargos: List[str], result_cidades: List[str]
+    ) -> None:
+        """Interpreta a resposta da LLM e corrige cargo e município com os valores do banco."""
+        self.debate = self._parse_debate_info(response)
 
         # Encontrar as melhores correspondências no banco para os valores que a LLM retornou
         cargo_corresp = find_best_match(self.debate["cargo"], result_cargos)
@@ -289,14 +736,8 @@ class DebateProcesser:
         self.debate["municipio"] = cidade_corresp
         self.debate["cargo"] = cargo_corresp
 
-
-    def identify_speakers(self) -> None:
-        """
-        Identifica os participantes do debate.
-        Pode falhar silenciosamente e delegar para human-in-the-loop.
-        """
-
-        # Sempre carregar candidatos válidos do banco
+    def _load_candidatos(self) -> None:
+        """Carrega os candidatos válidos para o cargo e município do debate."""
         query_candidatos = """
         MATCH (e:Eleicao) <-[:DISPUTA]- (c:Candidato) -[:CONCORRE_AO]-> (cg:Cargo)
             WHERE   e.uf = $estado
@@ -308,7 +749,7 @@ class DebateProcesser:
         tentativas = MAX_RETRY_ATTEMPTS
         while tentativas > 0:
             try:
-                with self.database.driver.session() as session:
+                with self._session("identification", count_writes=False) as session:
                     result = session.run(
                         query_candidatos,
                         estado=self.debate["estado"],
@@ -329,23 +770,115 @@ class DebateProcesser:
             except Exception as e:
                 logger.error(f"Erro ao consultar o banco de dados: {e}")
                 tentativas -= 1
-                
+
+    def _needs_llm_identification(self) -> bool:
+        """
+        Resolve os caminhos que dispensam a LLM de identificação.
+
+        Returns:
+            False se os falantes já foram identificados por voz ou se a
+            identificação manual é obrigatória.
+        """
+        # ===== VOICEPRINT IDENTIFICATION =====
+        if self.voiceprints is not None and len(self.voiceprints) > 0:
+            if self._identify_by_voiceprint():
+                return False
 
         if self.manual_identification:
             logger.info("Manual identification enforced. Skipping LLM speaker identification.")
             self.identification_failed = True
+            return False
+
+        return True
+
+    @stage_method()
+    def identify_speakers(self) -> None:
+        """
+        Identifica os participantes do debate.
+        Pode falhar silenciosamente e delegar para human-in-the-loop.
+        """
+
+        # Sempre carregar candidatos válidos do banco
+        self._load_candidatos()
+
+        if not self._needs_llm_identification():
             return
 
         # ===== LLM IDENTIFICATION =====
-        gpt_5 = init_chat_model(
-            model="gpt-5",
-            model_provider="openai",
-            reasoning={"effort": "medium"},
-        )
+        with self._track_usage("identify_speakers"):
+            response = self._identifier_chain().invoke(
+                {"transcription_segment": self._identification_sample(self.result_candidatos)}
+            )
+        self._set_identified_speakers(response)
+
+    @stage_method()
+    async def identify(self) -> None:
+        """
+        Equivalente a `identify_video_info` seguido de `identify_speakers`,
+        com as chamadas sobrepostas.
+
+        A chamada de identificação dos participantes só é disparada junto com
+        a de informações do debate quando certamente será feita e com o mesmo
+        sample de `identify_speakers`: sem identificação manual, sem índice
+        de impressões de voz e com um sample que não depende dos nomes dos
+        candidatos. Caso contrário, ela roda depois de carregar os candidatos
+        e de tentar a identificação por voz. As consultas ao Neo4j rodam em
+        threads enquanto as respostas não chegam.
+        """
+        with self._track_usage("identify"):
+            sample = await asyncio.to_thread(self._identification_sample)
+            identifier_task = None
+            if (
+                not self.manual_identification
+                and (self.voiceprints is None or len(self.voiceprints) == 0)
+                and not self._sample_depends_on_names()
+            ):
+                identifier_task = asyncio.create_task(
+                    self._identifier_chain().ainvoke({"transcription_segment": sample})
+                )
+
+            try:
+                response, result_cargos = await asyncio.gather(
+                    self._debate_info_chain().ainvoke(self._debate_info_inputs(sample)),
+                    asyncio.to_thread(self._query_cargos),
+                )
+                result_cidades = await asyncio.to_thread(
+                    self._query_cidades, self._parse_debate_info(response)["estado"]
+                )
+                self._set_debate_info(response, result_cargos, result_cidades)
+
+                await asyncio.to_thread(self._load_candidatos)
+                needs_llm = await asyncio.to_thread(self._needs_llm_identification)
+            except BaseException:
+                await self._cancel_task(identifier_task)
+                raise
 
-        chain = identifier_template | gpt_5
-        response = chain.invoke({"transcription_segment": self.sample})
+            if not needs_llm:
+                await self._cancel_task(identifier_task)
+                return
+
+            if identifier_task is None:
+                sample = await asyncio.to_thread(
+                    self._identification_sample, self.result_candidatos
+                )
+                response = await self._identifier_chain().ainvoke(
+                    {"transcription_segment": sample}
+                )
+            else:
+                response = await identifier_task
+            self._set_identified_speakers(response)
 
+    @staticmethod
+    async def _cancel_task(task: Optional[asyncio.Task]) -> None:
+        """Cancela `task` (se houver) e espera o cancelamento terminar."""
+        if task is None:
+            return
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    def _set_identified_speakers(self, response) -> None:
+        """Interpreta a resposta da LLM de identificação e marca os trechos no transcript."""
         pattern = r'Palestrante:\s([^\n]+)\s+Texto:\s"([^"]+)"'
         matches = re.findall(pattern, response.content[0]["text"])
 
@@ -408,7 +941,7 @@ class DebateProcesser:
         )
 
         # Embedding das frases para encontrar correspondências entre transcrições e trechos
-        embed_model = SentenceTransformer("all-MiniLM-L6-v2")
+        embed_model = self._get_sentence_model()
         self.transcript["embedding"] = self.transcript["text"].apply(
             lambda x: embed_model.encode(x, convert_to_tensor=True)
         )
@@ -441,6 +974,7 @@ class DebateProcesser:
         )
 
     
+    @stage_method()
     def diarize_speakers(self, force_dia: bool = False) -> None:
         """
         Faz a diarização dos participantes do debate usando Pyannote.
@@ -448,42 +982,18 @@ class DebateProcesser:
         Args:
             force_dia: Se True, força o recálculo mesmo se já existir arquivo salvo.
         """
-        if self.df_dia is None and not force_dia:
-            # Checar se a diarização já foi feita
-            diarization_pkl = os.path.join(self.folder_path, DIARIZATION_FILENAME)
-            if os.path.exists(diarization_pkl) and not force_dia:
-                logger.info("Loading existing diarization file")
-                with open(diarization_pkl, "rb") as f:
-                    self.df_dia = pickle.load(f)
-            else:
-                logger.info("Calculating diarization...")
+        # O alinhamento abaixo precisa da transcrição completa
+        with self.metrics.stage("wait_for_transcript"):
+            self.wait_for_transcript()
 
-                pipeline.to(torch.device("cuda"))
-                audio_path = os.path.join(self.folder_path, "audio.wav")
-                diarization = pipeline(audio_path)
+        with self.metrics.stage("diarization"):
+            self._load_diarization(force_dia)
 
-                logger.info("Diarization completed")
-
-                # Dataframe com segmentos e colunas de início e fim da diarização
-                self.df_dia = pd.DataFrame(
-                    data=list(diarization.itertracks(yield_label=True)),
-                    columns=["Segment", "Track", "Speaker_ID"],
-                )
-                self.df_dia["Diarizacao_Start"] = self.df_dia["Segment"].apply(
-                    lambda x: x.start
-                )
-                self.df_dia["Diarizacao_End"] = self.df_dia["Segment"].apply(
-                    lambda x: x.end
-                )
-
-                # Salvar diarização
-                with open(diarization_pkl, "wb") as f:
-                    pickle.dump(self.df_dia, f)
-
-        # Remove segmentos que terminam antes do debate_start (ou seja, que são totalmente anteriores).
-        self.df_dia = self.df_dia.loc[
-            self.df_dia["Diarizacao_End"] >= self.debate_start
-        ].reset_index(drop=True)
+        # Remove segmentos totalmente fora da janela [debate_start, debate_end].
+        in_window = self.df_dia["Diarizacao_End"] >= self.debate_start
+        if self.debate_end is not None:
+            in_window &= self.df_dia["Diarizacao_Start"] <= self.debate_end
+        self.df_dia = self.df_dia.loc[in_window].reset_index(drop=True)
 
         if "Candidato" in self.df_dia.columns:
             self.df_dia = self.df_dia.drop(columns=["Candidato"])
@@ -491,10 +1001,21 @@ class DebateProcesser:
         if "Titulo_Eleitoral" in self.df_dia.columns:
             self.df_dia = self.df_dia.drop(columns=["Titulo_Eleitoral"])
 
-        if self.identification_failed:
-            logger.warning("Speaker identification failed. Using manual assignment.")
-
-            self.df_dia = self._manual_assign_speakers(self.df_dia)
+        if self.speaker_map is not None or self.identification_failed:
+            if self.speaker_map is not None:
+                logger.info("Using speakers identified by voiceprint.")
+                self.df_dia = self._apply_speaker_map(self.df_dia, self.speaker_map)
+            else:
+                logger.warning("Speaker identification failed. Using manual assignment.")
+                mapping_path = os.path.join(self.folder_path, SPEAKER_MAPPING_FILENAME)
+                if os.path.exists(mapping_path):
+                    self.df_dia = self._apply_speaker_map(
+                        self.df_dia, self._load_speaker_mapping(mapping_path)
+                    )
+                elif self.interactive:
+                    self.df_dia = self._manual_assign_speakers(self.df_dia)
+                else:
+                    self._write_pending_assignment(mapping_path)
 
             self.transcript = self.transcript.rename(columns={"start": "Transcription_Start", "end": "Transcription_End", "text": "Transcription_Text"})
             self.transcript["key_tmp"] = 1
@@ -543,6 +1064,13 @@ class DebateProcesser:
             self.df_dia["Titulo_Eleitoral"] = self.df_dia["Candidato"].replace(documentos)
             del merge_tmp
 
+        # Guardar a diarização rotulada (base do índice de impressões de voz)
+        self.df_dia.drop(columns=["key_tmp"]).to_pickle(
+            os.path.join(self.folder_path, LABELED_DIARIZATION_FILENAME)
+        )
+        if self.voiceprints is not None and self.speaker_map is None:
+            self._update_voiceprints()
+
         # Tanto a diarização quando a transcrição foram feitas em segmentos.
         # Agora é necessário juntar os segmentos para ter os discursos completo de cada candidato.
         self.speeches = self.df_dia.sort_values(by=["Diarizacao_Start"])
@@ -635,27 +1163,482 @@ class DebateProcesser:
             drop=True
         )
     
-    def get_proposals(self) -> None:
-        """Obter propostas feitas nos discursos."""
+    @contextmanager
+    def _track_usage(self, stage: str):
+        """
+        Acumula em `self.llm_usage[stage]` os tokens das chamadas de LLM feitas
+        dentro do bloco, incluindo os servidos pelo cache de prompt do provedor.
+        O bloco também é medido como uma sub-etapa em `self.metrics`.
+        """
+        with self.metrics.stage(stage), self.metrics.track_llm():
+            with get_usage_metadata_callback() as cb:
+                try:
+                    yield cb
+                finally:
+                    usage = self.llm_usage.setdefault(
+                        stage, {"input_tokens": 0, "output_tokens": 0, "cached_tokens": 0}
+                    )
+                    for model_usage in cb.usage_metadata.values():
+                        usage["input_tokens"] += model_usage.get("input_tokens", 0)
+                        usage["output_tokens"] += model_usage.get("output_tokens", 0)
+                        usage["cached_tokens"] += model_usage.get(
+                            "input_token_details", {}
+                        ).get("cache_read", 0)
+
+                    if usage["input_tokens"]:
+                        logger.info(
+                            f"[{stage}] {usage['input_tokens']} tokens de entrada "
+                            f"({usage['cached_tokens']} em cache, "
+                            f"{usage['cached_tokens'] / usage['input_tokens']:.0%}), "
+                            f"{usage['output_tokens']} de saída"
+                        )
+
+    def _reset_batch_stats(self, stage: str) -> Dict[str, int]:
+        """
+        Zera e devolve `self.batch_stats[stage]`: chamadas em lote feitas pela
+        etapa e itens refeitos individualmente (ver `_log_batch_stats`).
+        """
+        self.batch_stats[stage] = {"batch_calls": 0, "fallbacks": 0}
+        return self.batch_stats[stage]
+
+    def _log_batch_stats(self, stage: str) -> None:
+        """Registra no log as contagens de `self.batch_stats[stage]`."""
+        stats = self.batch_stats.get(stage)
+        if stats:
+            logger.info(
+                f"[{stage}] {stats['batch_calls']} chamadas em lote, "
+                f"{stats['fallbacks']} itens refeitos individualmente."
+            )
+
+    def _dedup(self, stage: str, texts: pd.Series) -> Dict[Any, List[Any]]:
+        """
+        Agrupa as entradas idênticas (após normalização) de uma etapa de LLM.
+
+        Registra em `self.dedup_stats[stage]` quantas linhas, entradas únicas e
+        duplicatas a etapa teve.
+
+        Returns:
+            Índice representante -> índices das linhas com a mesma entrada.
+        """
+        groups = duplicate_groups(texts)
+        stats = {
+            "rows": len(texts),
+            "unique": len(groups),
+            "duplicates": len(texts) - len(groups),
+        }
+        self.dedup_stats[stage] = stats
+        if stats["duplicates"]:
+            logger.info(
+                f"[{stage}] {stats['duplicates']} entradas duplicadas de {stats['rows']} "
+                f"({stats['unique']} chamadas únicas)"
+            )
+        return groups
+
+    def _session(self, method: str, count_writes: bool = True):
+        """Sessão do Neo4j com as consultas medidas em `self.metrics` sob `method`."""
+        return self.metrics.neo4j_session(
+            self.database.driver.session(), method, count_writes=count_writes
+        )
+
+    def save_metrics(self) -> Dict[str, Any]:
+        """Grava o relatório de `self.metrics` em `metrics.json`, na pasta do vídeo."""
+        self.metrics.save(os.path.join(self.folder_path, METRICS_FILENAME))
+        return self.metrics.report()
+
+    def _retry_groups(
+        self, stage: str, groups: Dict[Any, List[Any]]
+    ) -> Dict[Any, List[Any]]:
+        """Mantém apenas os grupos com algum item registrado no ledger de falhas."""
+        failed = set(self.ledger.failed(stage))
+        return {
+            rep_idx: members
+            for rep_idx, members in groups.items()
+            if failed.intersection(str(member) for member in members)
+        }
+
+    def _save_progress(self) -> None:
+        """
+        Persiste o ledger de falhas e o estado que `retry_failed` precisa
+        para refazer só os itens com falha (falas, debate e coerência).
+        """
+        os.makedirs(self.folder_path, exist_ok=True)
+        self.ledger.save()
+        state = {
+            "speeches": self.speeches,
+            "debate": self.debate,
+            "df_identified": self.df_identified,
+            "coherence_results": self.coherence_results,
+        }
+        with open(os.path.join(self.folder_path, STATE_FILENAME), "wb") as f:
+            pickle.dump(state, f)
+
+        failures = self.ledger.summary()
+        if failures:
+            logger.warning(f"[{self.video_id}] Itens com falha por etapa: {failures}")
+
+    def load_state(self) -> bool:
+        """
+        Recarrega o estado salvo por uma execução anterior (ver `_save_progress`).
+
+        Returns:
+            True se o estado foi encontrado.
+        """
+        state_pkl = os.path.join(self.folder_path, STATE_FILENAME)
+        if not os.path.exists(state_pkl):
+            return False
+
+        with open(state_pkl, "rb") as f:
+            state = pickle.load(f)
+        self.speeches = state["speeches"]
+        self.debate = state["debate"]
+        self.df_identified = state["df_identified"]
+        self.coherence_results = state.get("coherence_results", [])
+
+        description_pkl = os.path.join(self.folder_path, DESCRIPTION_FILENAME)
+        if os.path.exists(description_pkl):
+            with open(description_pkl, "rb") as f:
+                self.description = pickle.load(f)
+        return True
+
+    @stage_method()
+    async def retry_failed(self) -> Dict[str, int]:
+        """
+        Refaz apenas os itens registrados no ledger de falhas e mescla os
+        resultados nas falas salvas. Requer `load_state`.
+
+        Returns:
+            Falhas restantes por etapa.
+        """
+        pending = self.ledger.summary()
+        if not pending:
+            logger.info(f"[{self.video_id}] Nenhuma falha registrada.")
+            return {}
+
+        logger.info(f"[{self.video_id}] Refazendo itens com falha: {pending}")
+        if "proposals" in pending:
+            self.get_proposals(only_failed=True)
+        if "speech_analysis" in pending:
+            await self.analyze_speeches(only_failed=True)
+        if any(stage in pending for stage in DISCUSSION_STAGES):
+            await self.calculate_discussions(only_failed=True)
+
+        return self.ledger.summary()
+
+    def _get_sentence_model(self) -> SentenceTransformer:
+        """Carrega (uma única vez) o modelo de embeddings de frases."""
+        if self._sentence_model is None:
+            self._sentence_model = SentenceTransformer(SENTENCE_MODEL)
+        return self._sentence_model
+
+    def _load_diarization(self, force_dia: bool = False, min_candidates: int = 0) -> None:
+        """
+        Carrega a diarização salva em disco ou calcula com o pyannote.
+
+        Args:
+            force_dia: Recalcula mesmo que haja diarização salva.
+            min_candidates: Mínimo de candidatos assumido quando nenhum foi
+                            identificado pela LLM (ver `_speaker_bounds`).
+        """
+        if self.df_dia is None or force_dia:
+            # Checar se a diarização já foi feita
+            diarization_pkl = self._window_cache_path(DIARIZATION_FILENAME)
+            if os.path.exists(diarization_pkl) and not force_dia:
+                logger.info("Loading existing diarization file")
+                with open(diarization_pkl, "rb") as f:
+                    self.df_dia = pickle.load(f)
+            else:
+                self.df_dia = self._run_diarization(min_candidates)
+
+                # Salvar diarização
+                with open(diarization_pkl, "wb") as f:
+                    pickle.dump(self.df_dia, f)
+
+    def _speaker_embeddings(self) -> Dict[str, np.ndarray]:
+        """
+        Embedding de voz de cada Speaker_ID do debate.
+
+        Reaproveita os centroides da diarização em janelas quando existem;
+        caso contrário calcula a partir dos segmentos mais longos.
+        """
+        if self.speaker_centroids:
+            return self.speaker_centroids
+
+        if self._embedding_inference is None:
+            self._embedding_inference = load_embedding_inference(self.diarization_device)
+
+        audio_path = prepare_window_audio(
+            self.folder_path, self.debate_start, self.debate_end
+        )
+        self.speaker_centroids = speaker_embeddings(
+            self.df_dia,
+            load_pcm(audio_path),
+            SAMPLE_RATE,
+            self._embedding_inference,
+            offset=self.debate_start,
+        )
+        return self.speaker_centroids
+
+    def _identify_by_voiceprint(self) -> bool:
+        """
+        Identifica os falantes comparando suas vozes com o índice de impressões de voz.
+
+        A identificação só é aceita quando pelo menos dois candidatos do debate
+        são reconhecidos com confiança e nenhum outro falante fica em uma zona
+        ambígua; falantes sem correspondência são tratados como não candidatos.
+
+        Returns:
+            True se os falantes foram identificados (LLM e etapa manual são puladas).
+        """
+        # Ainda não há identificação pela LLM: um debate tem ao menos dois candidatos
+        self._load_diarization(min_candidates=MIN_DEBATE_CANDIDATES)
+        matches = self.voiceprints.match(
+            self._speaker_embeddings(),
+            titulos=self.result_documentos.values(),
+        )
+
+        confident = matches.loc[matches["Confident"]]
+        ambiguous = matches.loc[
+            ~matches["Confident"]
+            & (matches["Score"] >= DEFAULT_MATCH_THRESHOLD - DEFAULT_MATCH_MARGIN)
+        ]
+
+        if confident["Titulo_Eleitoral"].nunique() < 2 or len(ambiguous) > 0:
+            logger.info(
+                f"Voiceprint identification inconclusive ({len(confident)} confident, "
+                f"{len(ambiguous)} ambiguous). Falling back to LLM identification."
+            )
+            return False
+
+        documentos_por_titulo = {doc: nome for nome, doc in self.result_documentos.items()}
+        self.speaker_map = {speaker: None for speaker in self.df_dia["Speaker_ID"].unique()}
+        for _, row in confident.iterrows():
+            self.speaker_map[row["Speaker_ID"]] = documentos_por_titulo[row["Titulo_Eleitoral"]]
+
+        logger.info(
+            f"Speakers identified by voiceprint: "
+            f"{ {k: v for k, v in self.speaker_map.items() if v is not None} }"
+        )
+        return True
+
+    def _update_voiceprints(self) -> None:
+        """Alimenta o índice de impressões de voz com os candidatos rotulados neste debate."""
+        valid = self.df_dia["Titulo_Eleitoral"].astype(str).isin(
+            set(self.result_documentos.values())
+        )
+        labeled = self.df_dia.loc[valid].assign(
+            Titulo_Eleitoral=lambda df: df["Titulo_Eleitoral"].astype(str)
+        )
+        if labeled.empty:
+            return
+
+        added = self.voiceprints.add_debate(
+            labeled, self._speaker_embeddings(), video_id=self.video_id
+        )
+        self.voiceprints.save()
+        logger.info(f"{added} voiceprints updated")
+
+    def _speaker_bounds(self, min_candidates: int = 0) -> Dict[str, int]:
+        """
+        Limites de número de falantes para o clustering do pyannote.
+
+        O máximo são os candidatos possíveis para o cargo mais os mediadores;
+        o mínimo são os candidatos já identificados pela LLM mais um mediador.
+
+        Args:
+            min_candidates: Candidatos assumidos quando nenhum foi identificado
+                            pela LLM (usado na busca por impressão de voz).
+                            0 não impõe mínimo.
+        """
+        bounds: Dict[str, int] = {}
+        if self.result_candidatos:
+            bounds["max_speakers"] = len(self.result_candidatos) + self.num_moderators
+
+        identified = 0
+        if self.df_identified is not None and "Candidato" in self.df_identified.columns:
+            identified = self.df_identified["Candidato"].dropna().nunique()
+        if identified == 0 and self.result_candidatos:
+            identified = min(len(self.result_candidatos), min_candidates)
+        if identified > 0:
+            bounds["min_speakers"] = identified + 1
+
+        if "min_speakers" in bounds and "max_speakers" in bounds:
+            bounds["min_speakers"] = min(bounds["min_speakers"], bounds["max_speakers"])
+        return bounds
+
+    def _run_diarization(self, min_candidates: int = 0) -> pd.DataFrame:
+        """
+        Roda o pyannote na janela do debate.
+
+        Args:
+            min_candidates: Repassado a `_speaker_bounds`.
+
+        Returns:
+            DataFrame com 'Segment', 'Track', 'Speaker_ID', 'Diarizacao_Start'
+            e 'Diarizacao_End', com tempos no referencial do vídeo.
+        """
+        device = torch.device(
+            self.diarization_device
+            or ("cuda" if torch.cuda.is_available() else "cpu")
+        )
+        pipeline = get_diarization_pipeline()
+        pipeline.to(device)
+        if self.segmentation_batch_size:
+            pipeline.segmentation_batch_size = self.segmentation_batch_size
+        if self.embedding_batch_size:
+            pipeline.embedding_batch_size = self.embedding_batch_size
+        if self.diarization_threads:
+            torch.set_num_threads(self.diarization_threads)
+
+        bounds = self._speaker_bounds(min_candidates)
+        logger.info(f"Calculating diarization on {device} ({bounds or 'sem limites de falantes'})...")
+
+        # Diarização apenas da janela do debate; os tempos são
+        # deslocados de volta para o referencial do vídeo
+        audio_path = prepare_window_audio(
+            self.folder_path, self.debate_start, self.debate_end
+        )
+        started = time.perf_counter()
+        if self.diarization_window:
+            audio = load_pcm(audio_path)
+            audio_duration = len(audio) / SAMPLE_RATE
+            pipeline_params = {
+                name: value
+                for name, value in [
+                    ("segmentation_batch_size", self.segmentation_batch_size),
+                    ("embedding_batch_size", self.embedding_batch_size),
+                ]
+                if value
+            }
+            df_dia, self.speaker_centroids = diarize_in_windows(
+                pipeline,
+                audio,
+                SAMPLE_RATE,
+                window_length=self.diarization_window,
+                overlap=self.diarization_overlap,
+                max_speakers=bounds.get("max_speakers"),
+                workers=self.diarization_workers,
+                npy_path=os.path.splitext(audio_path)[0] + ".npy",
+                device=str(device),
+                pipeline_params=pipeline_params,
+            )
+            tracks = [
+                (segment, track, speaker)
+                for segment, track, speaker in df_dia.itertuples(index=False)
+            ]
+        else:
+            audio = pyannote_input(audio_path)
+            audio_duration = audio["waveform"].shape[-1] / audio["sample_rate"]
+            diarization = pipeline(audio, **bounds)
+            tracks = list(diarization.itertracks(yield_label=True))
+        elapsed = time.perf_counter() - started
+        offset = self.debate_start
+
+        # Fator de tempo real: segundos de processamento por segundo de áudio
+        self.diarization_rtf = elapsed / max(audio_duration, 1e-9)
+        logger.info(
+            f"Diarization completed in {elapsed:.1f}s for {audio_duration:.0f}s of audio "
+            f"(RTF {self.diarization_rtf:.3f})"
+        )
+
+        # Dataframe com segmentos e colunas de início e fim da diarização
+        df_dia = pd.DataFrame(
+            data=[
+                (Segment(segment.start + offset, segment.end + offset), track, speaker)
+                for segment, track, speaker in tracks
+            ],
+            columns=["Segment", "Track", "Speaker_ID"],
+        )
+        df_dia["Diarizacao_Start"] = df_dia["Segment"].apply(lambda x: x.start)
+        df_dia["Diarizacao_End"] = df_dia["Segment"].apply(lambda x: x.end)
+
+        return df_dia
+
+    @stage_method()
+    def get_proposals(self, only_failed: bool = False) -> None:
+        """
+        Obter propostas feitas nos discursos.
+
+        Args:
+            only_failed: Refaz apenas as falas registradas no ledger de falhas,
+                         mantendo as demais propostas.
+        """
         # Inicialize o modelo GPT-4o-mini
-        gpt_4o_mini = init_chat_model(model="gpt-4o-mini", model_provider="openai")
+        gpt_4o_mini = self._init_chat_model(model="gpt-4o-mini", model_provider="openai")
 
         chain = proposal_template | gpt_4o_mini
 
-        self.speeches["Proposta"] = None
-        for idx, row in self.speeches.iterrows():
-            speech_text = row["Text"]
-            if speech_text and speech_text.strip():
-                response = chain.invoke(speech_text)
-                proposta = response.content
-                self.speeches.at[idx, "Proposta"] = proposta
+        if not only_failed:
+            self.speeches["Proposta"] = None
+            self.ledger.clear("proposals")
+
+        # Filtro local: falas sem chance de conter propostas não vão à LLM
+        if self.use_proposal_gate and not only_failed:
+            passes = proposal_gate(self.speeches)
+            skipped = self.speeches.index[~passes]
+            audited = audit_sample(skipped, self.proposal_gate_audit)
+            to_send = self.speeches.index[passes].union(audited)
+        else:
+            skipped = audited = self.speeches.index[:0]
+            to_send = self.speeches.index
+
+        # Falas repetidas (vinhetas, lembretes de regras) vão uma única vez
+        groups = self._dedup("proposals", self.speeches.loc[to_send, "Text"])
+        if only_failed:
+            groups = self._retry_groups("proposals", groups)
+
+        with self._track_usage("proposals"):
+            for idx, row in self.speeches.loc[list(groups)].iterrows():
+                speech_text = row["Text"]
+                if speech_text and speech_text.strip():
+                    # Falas longas: uma chamada por parte, em paralelo, e as
+                    # listas de propostas combinadas localmente
+                    chunks = split_by_tokens(speech_text, self.max_speech_tokens)
+                    try:
+                        if len(chunks) == 1:
+                            proposta = chain.invoke(speech_text).content
+                        else:
+                            responses = chain.batch(chunks)
+                            proposta = merge_proposals([r.content for r in responses])
+                    except Exception as e:
+                        logger.error(f"Erro ao extrair propostas da fala {idx}: {e}")
+                        self.ledger.record("proposals", idx, e)
+                        continue
+
+                    self.ledger.resolve("proposals", idx)
+                    for member in groups[idx]:
+                        self.speeches.at[member, "Proposta"] = proposta
 
         self.speeches["Proposta"] = self.speeches["Proposta"].replace(
             "Sem propostas", None
         )
+
+        self._save_progress()
+
+        if self.use_proposal_gate and not only_failed:
+            # Falas auditadas em que a LLM achou propostas: perdas do filtro
+            missed = self.speeches.loc[audited, "Proposta"].notna()
+            self.proposal_gate_stats = {
+                "total": len(self.speeches),
+                "skipped": len(skipped),
+                "skip_rate": len(skipped) / max(len(self.speeches), 1),
+                "audited": len(audited),
+                "audit_missed": int(missed.sum()),
+                "audit_missed_indices": missed[missed].index.tolist(),
+            }
+            logger.info(
+                f"Filtro de propostas: {len(skipped)}/{len(self.speeches)} falas puladas "
+                f"({self.proposal_gate_stats['skip_rate']:.0%})"
+            )
+            if len(audited):
+                logger.info(
+                    f"Auditoria do filtro: {int(missed.sum())}/{len(audited)} falas "
+                    f"puladas continham propostas"
+                )
     
+    @stage_method()
     def classify_phrases(self) -> None:
         """Classifica as frases em categorias usando HuggingFace Zero-Shot Classifier."""
+        classifier = get_classifier()
         total = len(self.speeches)
         for idx, row in self.speeches.iterrows():
             # Log progresso
@@ -681,7 +1664,131 @@ class DebateProcesser:
 
             self.speeches.loc[index, CLASSIFICATION_LABELS] = results
 
+    @stage_method()
+    async def analyze_speeches(self, only_failed: bool = False) -> None:
+        """
+        Alternativa a `get_proposals`, `classify_phrases` e ao resumo das falas
+        de `calculate_discussions` numa única leitura de cada fala.
+
+        Cada chamada estruturada recebe até `llm_batch_size` falas e devolve,
+        por fala, as propostas, o resumo e a pontuação de cada rótulo de
+        `CLASSIFICATION_LABELS`. Preenche as colunas 'Proposta' (lista ou
+        None), 'summary' e as colunas dos rótulos; `calculate_discussions`
+        não refaz os resumos já preenchidos.
+
+        Args:
+            only_failed: Refaz apenas as falas registradas no ledger de falhas.
+        """
+
+        class LabelScore(BaseModel):
+            label: str = Field(description="Nome do rótulo, exatamente como listado.")
+            score: float = Field(description="Pontuação de 0.0 a 1.0.", ge=0.0, le=1.0)
+
+        class SpeechAnalysis(BaseModel):
+            index: int = Field(description="Índice da fala, como aparece em [índice].")
+            propostas: List[str] = Field(description="Propostas feitas na fala (pode ser vazia).")
+            resumo: str = Field(description="Resumo da fala em uma frase.")
+            rotulos: List[LabelScore] = Field(description="Pontuação de cada rótulo.")
+
+        class SpeechAnalysisBatch(BaseModel):
+            analyses: List[SpeechAnalysis] = Field(
+                description="Uma análise para cada fala recebida."
+            )
+
+        analysis_model = self._init_chat_model(model="gpt-4.1-mini", model_provider="openai")
+        analysis_chain = speech_analysis_template | analysis_model.with_structured_output(
+            SpeechAnalysisBatch
+        )
+        labels_str = "\n".join(f"- {label}" for label in CLASSIFICATION_LABELS)
+
+        async def analyze_pack(pack: pd.DataFrame) -> Dict[int, SpeechAnalysis]:
+            """Analisa um grupo de falas, com retentativas em caso de rate limit."""
+            speeches_str = "\n\n".join(
+                f"[{idx}] {row['Text'].strip()}" for idx, row in pack.iterrows()
+            )
+            delay = 1
+            for attempt in range(MAX_RETRY_ATTEMPTS):
+                try:
+                    response = await analysis_chain.ainvoke(
+                        {"labels": labels_str, "speeches": speeches_str}
+                    )
+                    return {a.index: a for a in response.analyses if a.index in pack.index}
+                except (RateLimitError, LangChainException) as e:
+                    if attempt == MAX_RETRY_ATTEMPTS - 1:
+                        logger.error(f"Falha definitiva na análise das falas {list(pack.index)}: {e}")
+                        for idx in pack.index:
+                            self.ledger.record("speech_analysis", idx, e, attempts=attempt + 1)
+                        return {}
+                    self.metrics.record_retry(analysis_model.model_name)
+                    await asyncio.sleep(delay + 0.5)
+                    delay *= 2
+                except Exception as e:
+                    logger.error(f"Erro na análise das falas {list(pack.index)}: {e}")
+                    for idx in pack.index:
+                        self.ledger.record("speech_analysis", idx, e, attempts=attempt + 1)
+                    return {}
+
+        speeches = self.speeches.loc[
+            self.speeches["Text"].notna() & (self.speeches["Text"].str.strip() != "")
+        ]
+        groups = self._dedup("speech_analysis", speeches["Text"])
+        if only_failed:
+            groups = self._retry_groups("speech_analysis", groups)
+        else:
+            self.ledger.clear("speech_analysis")
+        speeches = speeches.loc[list(groups)]
+        pack_size = max(self.llm_batch_size, 1)
+        packs = [speeches.iloc[i : i + pack_size] for i in range(0, len(speeches), pack_size)]
+
+        results: Dict[int, SpeechAnalysis] = {}
+        with self._track_usage("speech_analysis"):
+            for pack_result in await tqdm_asyncio.gather(
+                *[analyze_pack(pack) for pack in packs], desc="Analisando Falas"
+            ):
+                results.update(pack_result)
+
+            # Falas ausentes nas respostas em lote são refeitas uma a uma
+            missing = [idx for idx in speeches.index if idx not in results]
+            if missing and pack_size > 1:
+                logger.info(f"{len(missing)} falas refeitas individualmente.")
+                for pack_result in await asyncio.gather(
+                    *[analyze_pack(speeches.loc[[idx]]) for idx in missing]
+                ):
+                    results.update(pack_result)
+
+        for idx in speeches.index:
+            if idx in results:
+                self.ledger.resolve("speech_analysis", idx)
+            elif str(idx) not in self.ledger.failed("speech_analysis"):
+                self.ledger.record(
+                    "speech_analysis", idx, ValueError("Fala ausente na resposta estruturada")
+                )
+
+        if not only_failed or "Proposta" not in self.speeches.columns:
+            self.speeches["Proposta"] = None
+        if "summary" not in self.speeches.columns:
+            self.speeches["summary"] = None
+        for label in CLASSIFICATION_LABELS:
+            if label not in self.speeches.columns:
+                self.speeches[label] = np.nan
+
+        for idx, analysis in results.items():
+            propostas = [p for p in analysis.propostas if p and p.strip()]
+
+            scores = {item.label.strip(): item.score for item in analysis.rotulos}
+            scores = [scores.get(label, 0.0) for label in CLASSIFICATION_LABELS]
+            # Mesma normalização de `classify_phrases`
+            if max(scores) > min(scores):
+                scores = normalize_scores(scores)
+
+            for member in groups[idx]:
+                self.speeches.at[member, "Proposta"] = propostas or None
+                self.speeches.at[member, "summary"] = analysis.resumo
+                self.speeches.loc[member, CLASSIFICATION_LABELS] = scores
+
+        self._save_progress()
     
+    @stage_method()
     def ingest_into_database(self) -> None:
         """Ingere os dados obtidos no banco de dados."""
         debate_id = self.video_id
@@ -694,7 +1801,7 @@ class DebateProcesser:
             "ano", debate_date[:4] if debate_date else ""
         )
 
-        with self.database.driver.session() as session:
+        with self._session("ingest_into_database") as session:
             logger.info("Ingesting debate node...")
 
             # Ingest debate node
@@ -829,8 +1936,26 @@ class DebateProcesser:
 
             logger.info("Speech ingestion completed")
     
-    async def calculate_discussions(self) -> None:
-        """Processa o contexto de discussões."""
+    @stage_method()
+    async def calculate_discussions(
+        self, discussion_mode: Optional[str] = None, only_failed: bool = False
+    ) -> None:
+        """
+        Processa o contexto de discussões.
+
+        Args:
+            discussion_mode: Sobrescreve `self.discussion_mode` nesta execução.
+            only_failed: Refaz apenas os itens registrados no ledger de falhas.
+                         Se alguma janela de coerência refeita tiver sucesso,
+                         as discussões são reagrupadas e as etapas que dependem
+                         delas (Q&A, resumo das perguntas e relevância) rodam
+                         de novo por inteiro.
+        """
+        discussion_mode = discussion_mode or self.discussion_mode
+        if discussion_mode not in DISCUSSION_MODES:
+            raise ValueError(
+                f"discussion_mode inválido: {discussion_mode!r} (use um de {DISCUSSION_MODES})"
+            )
 
         # ================================
         # Análise de Coerência das Discussões
@@ -855,12 +1980,16 @@ class DebateProcesser:
             )
 
         # Configuração do LLM (usando um placeholder para o seu setup)
-        coherence_finder = init_chat_model(model="gpt-4.1-mini", model_provider="openai")
-        structured_coherence_finder = coherence_finder.with_structured_output(RelatedSpeechesResponse)
-        coherence_chain = coherence_template | structured_coherence_finder
+        if discussion_mode != "local":
+            coherence_finder = self._init_chat_model(model="gpt-4.1-mini", model_provider="openai")
+            structured_coherence_finder = coherence_finder.with_structured_output(RelatedSpeechesResponse)
+            coherence_chain = coherence_template | structured_coherence_finder
 
         async def process_anchor_speech(
-            df: pd.DataFrame, anchor_index: int, window_size: int = 6
+            df: pd.DataFrame,
+            anchor_index: int,
+            window_size: int = 6,
+            start_index: Optional[int] = None,
         ) -> Optional[RelatedSpeeches]:
             """
             Relaciona frases baseado no contexto entre elas.
@@ -869,16 +1998,35 @@ class DebateProcesser:
                 df: O DataFrame speeches.
                 anchor_index: O índice da fala que contém a pergunta.
                 window_size: Quantidade de falas a considerar antes e depois da âncora.
+                start_index: Início da janela, se diferente da âncora. Âncoras
+                             com o mesmo início compartilham o prefixo do prompt.
 
             Returns:
                 RelatedSpeeches ou None em caso de erro.
             """
             # Definindo a janela de contexto
-            start_index = anchor_index
+            start_index = anchor_index if start_index is None else start_index
             end_index = min(len(df) - 1, anchor_index + window_size)
 
+            return await process_window(df, anchor_index, start_index, end_index + 1)
+
+        async def process_window(
+            df: pd.DataFrame, anchor_index: int, start_index: int, end_index: int
+        ) -> Optional[RelatedSpeeches]:
+            """
+            Consulta a LLM de coerência sobre as falas `df.iloc[start_index:end_index]`.
+
+            Args:
+                df: O DataFrame speeches.
+                anchor_index: O índice da fala âncora.
+                start_index: Posição da primeira fala do contexto.
+                end_index: Posição seguinte à última fala do contexto.
+
+            Returns:
+                RelatedSpeeches ou None em caso de erro.
+            """
             # Falas do contexto (incluindo a âncora)
-            context_df = df.iloc[start_index : end_index + 1].copy()
+            context_df = df.iloc[start_index:end_index].copy()
 
             # 1. Formatando o contexto para o Prompt do LLM
             context_speeches = []
@@ -891,6 +2039,7 @@ class DebateProcesser:
             context_speeches_str = "\n".join(context_speeches)
 
             # 2. Invocando o LLM
+            window_key = f"{anchor_index}:{start_index}:{end_index}"
             try:
                 response = await coherence_chain.ainvoke(
                     {
@@ -901,6 +2050,7 @@ class DebateProcesser:
                 )
 
                 # O Pydantic já garante a estrutura da resposta
+                self.ledger.resolve("coherence", window_key)
                 return RelatedSpeeches(
                     related_indices=response.related_indices, anchor_index=anchor_index
                 )
@@ -909,9 +2059,11 @@ class DebateProcesser:
                 logger.error(
                     f"Erro de validação Pydantic no índice {anchor_index}: {e}"
                 )
+                self.ledger.record("coherence", window_key, e)
                 return None
             except Exception as e:
                 logger.error(f"Erro ao processar LLM no índice {anchor_index}: {e}")
+                self.ledger.record("coherence", window_key, e)
                 return None
 
 
@@ -942,29 +2094,143 @@ class DebateProcesser:
                 f"Detectadas {len(anchor_indices)} perguntas âncora para análise de coerência."
             )
 
-            # 2. Cria e executa as tarefas assíncronas em batches
-            tasks = [
-                process_anchor_speech(df, index, window_size)
-                for index in anchor_indices
+            # 2. Por padrão cada âncora tem a própria janela e todas as chamadas
+            # rodam juntas; só as instruções do sistema são prefixo comum.
+            if self.coherence_prefix_group <= 1:
+                results = await tqdm_asyncio.gather(
+                    *[process_anchor_speech(df, index, window_size) for index in anchor_indices],
+                    desc="Analisando Coerência das Discussões",
+                )
+                return [r for r in results if r is not None]
+
+            # Opcional: agrupa âncoras consecutivas com o mesmo início de janela.
+            # As chamadas de um grupo compartilham o prefixo (sistema + falas
+            # iniciais), e a primeira de cada grupo aquece o cache de prompt do
+            # provedor antes das demais.
+            async def process_group(group: List[int]) -> List[Optional[RelatedSpeeches]]:
+                first = await process_anchor_speech(df, group[0], window_size)
+                rest = await asyncio.gather(
+                    *[
+                        process_anchor_speech(df, index, window_size, start_index=group[0])
+                        for index in group[1:]
+                    ]
+                )
+                return [first, *rest]
+
+            groups = [
+                anchor_indices[i : i + self.coherence_prefix_group]
+                for i in range(0, len(anchor_indices), self.coherence_prefix_group)
             ]
 
             # Executa todas as tarefas de forma assíncrona
-            results = await tqdm_asyncio.gather(
-                *tasks, desc="Analisando Coerência das Discussões"
+            group_results = await tqdm_asyncio.gather(
+                *[process_group(group) for group in groups],
+                desc="Analisando Coerência das Discussões",
             )
 
             # Filtra resultados nulos (erros ou falhas na validação)
+            return [r for results in group_results for r in results if r is not None]
+
+        async def process_discussion_coherence_embeddings(
+            df: pd.DataFrame, use_llm: bool = True
+        ) -> List[RelatedSpeeches]:
+            """
+            Agrupa as falas por mudanças de assunto detectadas com embeddings.
+
+            Cada fala é codificada uma única vez. Fronteiras com vale raso de
+            similaridade ligam as falas vizinhas sem chamar a LLM; fronteiras
+            profundas separam discussões. Só as fronteiras ambíguas viram
+            chamadas de coerência, com a janela limitada aos segmentos vizinhos.
+
+            Args:
+                df: DataFrame com os speeches.
+                use_llm: Se False, fronteiras ambíguas são tratadas como
+                         continuação e nenhuma chamada é feita.
+
+            Returns:
+                Lista de RelatedSpeeches (locais e da LLM).
+            """
+            if len(df) < 2:
+                return []
+
+            embeddings = self._get_sentence_model().encode(
+                df["Text"].str.strip().tolist(), convert_to_numpy=True
+            )
+            classes = classify_gaps(depth_scores(gap_similarities(embeddings)))
+            split = classes != CONTINUATION if use_llm else classes == BOUNDARY
+            segments = segments_from_gaps(len(df), split)
+
+            local_results = [
+                RelatedSpeeches(
+                    related_indices=[df.index[start:end].tolist()],
+                    anchor_index=int(df.index[start]),
+                )
+                for start, end in segments
+                if end - start > 1
+            ]
+            if not use_llm:
+                logger.info(f"{len(segments)} segmentos locais (sem chamadas de LLM).")
+                return local_results
+
+            regions = ambiguous_regions(segments, classes)
+            logger.info(
+                f"{len(segments)} segmentos locais; {len(regions)} fronteiras ambíguas "
+                f"enviadas à LLM (modo llm: {len(range(0, len(df), 3))} chamadas)."
+            )
+
+            tasks = [
+                process_window(df, int(df.index[anchor]), start, end)
+                for start, end, anchor in regions
+            ]
+            results = await tqdm_asyncio.gather(
+                *tasks, desc="Analisando Fronteiras Ambíguas"
+            )
+
+            return local_results + [r for r in results if r is not None]
+
+        async def retry_failed_windows(df: pd.DataFrame) -> List[RelatedSpeeches]:
+            """
+            Refaz as janelas de coerência do ledger, no formato
+            "âncora:início:fim", e as junta aos resultados salvos.
+            """
+            windows = [
+                tuple(int(value) for value in key.split(":"))
+                for key in self.ledger.failed("coherence")
+            ]
+            results = await tqdm_asyncio.gather(
+                *[process_window(df, anchor, start, end) for anchor, start, end in windows],
+                desc="Refazendo Janelas de Coerência",
+            )
             return [r for r in results if r is not None]
 
-        all_coherence_results = await process_discussion_coherence(self.speeches)
+        regrouped = True
+        with self._track_usage("coherence"):
+            if only_failed:
+                retried = await retry_failed_windows(self.speeches)
+                regrouped = bool(retried)
+                all_coherence_results = [
+                    RelatedSpeeches(**result) for result in self.coherence_results
+                ] + retried
+            else:
+                self.ledger.clear("coherence")
+                if discussion_mode in ("hybrid", "local"):
+                    all_coherence_results = await process_discussion_coherence_embeddings(
+                        self.speeches, use_llm=discussion_mode == "hybrid"
+                    )
+                else:
+                    all_coherence_results = await process_discussion_coherence(self.speeches)
+        self.coherence_results = [result.model_dump() for result in all_coherence_results]
+
+        # Sem reagrupamento, as etapas seguintes refazem só os itens com falha
+        retry_subset = only_failed and not regrouped
 
         # A lista de resultados é o input desta função
         def assign_discussion_ids(
             df: pd.DataFrame, results: List[RelatedSpeeches]
         ) -> pd.DataFrame:
             """
-            Cria um grafo de relações entre as falas, usa componentes conexas
-            para agrupar as falas em IDs de Discussão únicas.
+            Agrupa as falas relacionadas em IDs de Discussão únicas usando as
+            componentes conexas das relações (ver `discussion_labels`).
 
             Args:
                 df: DataFrame com os speeches.
@@ -973,75 +2239,74 @@ class DebateProcesser:
             Returns:
                 DataFrame com IDs de discussão atribuídos.
             """
-            # Inicializar o Grafo de Relações e Colunas
-            G = nx.Graph()
-            G.add_nodes_from(df.index.tolist())
-
-            # Nova coluna para o ID do agrupamento
-            df["ID_Discussao"] = None
-
-            # Popular o Grafo com as Relações Identificadas pelo LLM
+            # Converte os índices da LLM em posições, descartando os que não
+            # existem no DataFrame (alucinados)
+            groups = []
+            dropped = 0
             for result in results:
-                if not result.related_indices:
-                    continue
-
-                # Conecta todas as falas relacionadas entre si para formar o componente
                 for indices_to_connect in result.related_indices:
-                    for i in range(len(indices_to_connect)):
-                        for j in range(i + 1, len(indices_to_connect)):
-                            G.add_edge(indices_to_connect[i], indices_to_connect[j])
-
-            # Atribuir IDs de Discussão usando Componentes Conexas
-            discussion_id_counter = 0
+                    positions = df.index.get_indexer(indices_to_connect)
+                    dropped += int((positions < 0).sum())
+                    groups.append(positions[positions >= 0].tolist())
 
-            # Itera sobre os grupos de nós (falas) que estão conectados
-            for component in nx.connected_components(G):
-                # Só consideramos uma Discussão se houver mais de uma fala conectada
-                if len(component) > 1:
-                    discussion_id_counter += 1
-                    current_id = discussion_id_counter
+            if dropped:
+                logger.warning(f"{dropped} índices fora do DataFrame ignorados.")
 
-                    # Converte o conjunto de nós para uma lista de índices
-                    component_indices = list(component)
-
-                    # Atribuição no DataFrame
-                    for idx in component_indices:
-                        df.loc[idx, "ID_Discussao"] = current_id
+            # Atribuir IDs de Discussão usando Componentes Conexas.
+            # Só consideramos uma Discussão se houver mais de uma fala conectada
+            labels = discussion_labels(len(df), groups)
+            ids = np.full(len(df), None, dtype=object)
+            ids[labels > 0] = labels[labels > 0].tolist()
+            df["ID_Discussao"] = ids
 
             logger.info(
-                f"Processamento concluído. {discussion_id_counter} Discussões agrupadas."
+                f"Processamento concluído. {labels.max(initial=0)} Discussões agrupadas."
             )
 
-            # Remove o ID_Discussao de falas que não foram agrupadas (componente de 1 nó)
-            df.loc[df["ID_Discussao"].isna(), "ID_Discussao"] = None
-
             # Renomeia a coluna para refletir a nova lógica
             df = df.rename(columns={"Alvo_Da_Fala": "Alvo"})
 
             return df
 
-        self.speeches = assign_discussion_ids(self.speeches, all_coherence_results)
+        if regrouped:
+            self.speeches = assign_discussion_ids(self.speeches, all_coherence_results)
+
+        if discussion_mode == "local":
+            # Mesmas colunas das etapas de LLM, vazias, para `ingest_discussion_data`
+            self.speeches["is_question"] = False
+            self.speeches["question_idx"] = None
+            self.speeches["topic"] = None
+            self.speeches["question"] = None
+            if "summary" not in self.speeches.columns:
+                self.speeches["summary"] = None
+            self.speeches["relevance_score"] = np.nan
+            self.speeches["relevance_justification"] = None
+            self._save_progress()
+            return
 
         async def classify_response_relationship(
-            df: pd.DataFrame,
+            df: pd.DataFrame, only_failed: bool = False
         ) -> pd.DataFrame:
             """
             Identifica quais frases são respostas a perguntas dentro de cada discussão.
 
             Args:
                 df: DataFrame com os speeches.
+                only_failed: Processa só as discussões registradas no ledger.
 
             Returns:
                 DataFrame com relações Q&A identificadas.
             """
-            qa_chain = qa_template | init_chat_model(
+            qa_chain = qa_template | self._init_chat_model(
                 model="gpt-5-mini",
                 reasoning={"effort": "low"},
                 model_provider="openai",
             )
 
-            df["is_question"] = False
-            df["question_idx"] = None
+            if not only_failed:
+                df["is_question"] = False
+                df["question_idx"] = None
+                self.ledger.clear("qa")
 
             async def process_discussion_qa(group: tuple) -> None:
                 """Processa Q&A para um grupo de discussão."""
@@ -1054,9 +2319,15 @@ class DebateProcesser:
                     )
 
                 context_speeches_str = "\n".join(context_speeches)
-                qa_response = await qa_chain.ainvoke(
-                    {"context_speeches": context_speeches_str}
-                )
+                try:
+                    qa_response = await qa_chain.ainvoke(
+                        {"context_speeches": context_speeches_str}
+                    )
+                except Exception as e:
+                    logger.error(f"Erro no Q&A da discussão {group[0]}: {e}")
+                    self.ledger.record("qa", group[0], e)
+                    return
+                self.ledger.resolve("qa", group[0])
 
                 results = qa_response.content[0]["text"]
                 topico = re.findall(r"Tópico: (.+)", qa_response.content[0]["text"])
@@ -1070,67 +2341,87 @@ class DebateProcesser:
                     df.loc[int(result[1]), "is_question"] = True
 
             # Rodar o processamento assíncrono por grupos de Discussão em batches
+            failed = set(self.ledger.failed("qa"))
             tasks = [
-                process_discussion_qa(group) for group in df.groupby("ID_Discussao")
+                process_discussion_qa(group)
+                for group in df.groupby("ID_Discussao")
+                if not only_failed or str(group[0]) in failed
             ]
             await tqdm_asyncio.gather(*tasks, desc="Analisando Q&A das Discussões")
 
             return df
 
-        self.speeches = await classify_response_relationship(self.speeches)
+        with self._track_usage("qa"):
+            self.speeches = await classify_response_relationship(
+                self.speeches, only_failed=retry_subset
+            )
 
         # ================================
         # Resumo das Perguntas
         # ================================
 
-        def summary_questions(df: pd.DataFrame) -> pd.DataFrame:
+        def summary_questions(df: pd.DataFrame, only_missing: bool = False) -> pd.DataFrame:
             """
             Gera resumos das perguntas.
 
             Args:
                 df: DataFrame com os speeches.
+                only_missing: Resume só as perguntas ainda sem resumo (que
+                              falharam ou surgiram num Q&A refeito).
 
             Returns:
                 DataFrame com resumos das perguntas.
             """
-            q_summary_chain = q_summary_template | init_chat_model(
+            q_summary_chain = q_summary_template | self._init_chat_model(
                 model="gpt-4.1-mini", model_provider="openai"
             )
 
-            df["question"] = None
-            questions_df = df.loc[df["is_question"] == True]
+            if not only_missing or "question" not in df.columns:
+                df["question"] = None
+                self.ledger.clear("question_summary")
+            # Perguntas da mesma discussão em sequência: o contexto da discussão
+            # é o prefixo comum dessas chamadas (cache de prompt do provedor)
+            questions_df = df.loc[
+                (df["is_question"] == True) & df["question"].isna()
+            ].sort_values("ID_Discussao", kind="stable")
             total = len(questions_df)
+            discussion_contexts: Dict[Any, str] = {}
 
             for idx, q_row in questions_df.iterrows():
                 progress = idx / total * 100
                 if idx % 5 == 0:
                     logger.debug(f"Question summary progress: {progress:.2f}%")
 
-                context_speeches = []
-
                 discussion_id = q_row["ID_Discussao"]
-                discussion_df = df[df["ID_Discussao"] == discussion_id]
-
-                for s_idx, s_row in discussion_df.iterrows():
-                    context_speeches.append(
+                if discussion_id not in discussion_contexts:
+                    discussion_df = df[df["ID_Discussao"] == discussion_id]
+                    discussion_contexts[discussion_id] = "\n".join(
                         f"Candidato {s_row['Candidato']}: \"{s_row['Text'].strip()}\""
+                        for _, s_row in discussion_df.iterrows()
                     )
 
-                context_speeches_str = "\n".join(context_speeches)
+                context_speeches_str = discussion_contexts[discussion_id]
 
-                q_summary_response = q_summary_chain.invoke(
-                    {
-                        "context_speeches": context_speeches_str,
-                        "question_text": q_row["Text"],
-                    }
-                )
+                try:
+                    q_summary_response = q_summary_chain.invoke(
+                        {
+                            "context_speeches": context_speeches_str,
+                            "question_text": q_row["Text"],
+                        }
+                    )
+                except Exception as e:
+                    logger.error(f"Erro ao resumir a pergunta {idx}: {e}")
+                    self.ledger.record("question_summary", idx, e)
+                    continue
+                self.ledger.resolve("question_summary", idx)
 
                 summary = q_summary_response.content
                 df.loc[idx, "question"] = summary
 
             return df
 
-        self.speeches = summary_questions(self.speeches)
+        with self._track_usage("question_summary"):
+            self.speeches = summary_questions(self.speeches, only_missing=retry_subset)
 
         # ================================
         # Resumo das Falas
@@ -1145,48 +2436,146 @@ class DebateProcesser:
             Returns:
                 DataFrame com resumos das falas.
             """
-            s_summary_chain = s_summary_template | init_chat_model(
-                model="gpt-4.1-mini", model_provider="openai"
+            class SpeechSummary(BaseModel):
+                index: int = Field(description="Índice da fala, como aparece em [índice].")
+                summary: str = Field(description="Resumo da fala em uma frase.")
+
+            class SpeechSummaryBatch(BaseModel):
+                summaries: List[SpeechSummary] = Field(
+                    description="Um resumo para cada fala recebida."
+                )
+
+            summary_model = self._init_chat_model(model="gpt-4.1-mini", model_provider="openai")
+            s_summary_chain = s_summary_template | summary_model
+            s_summary_batch_chain = (
+                s_summary_batch_template
+                | summary_model.with_structured_output(SpeechSummaryBatch)
             )
 
-            async def process_row(
-                idx: int, row: pd.Series, max_retries: int = 5
-            ) -> tuple[int, Optional[str]]:
-                """Processa uma linha com retry logic."""
+            async def summarize_text(
+                idx: int, text: str, max_retries: int = 5
+            ) -> Optional[str]:
+                """Resume um texto com retry logic."""
                 delay = 1
 
                 for attempt in range(max_retries):
                     try:
                         resp = await s_summary_chain.ainvoke(
-                            {"speach_text": row["Text"]}
+                            {"speach_text": text}
                         )
-                        return idx, resp.content
+                        return resp.content
 
                     except (RateLimitError, LangChainException) as e:
                         if attempt == max_retries - 1:
                             logger.error(
                                 f"[RATE LIMIT] Falha definitiva na linha {idx}"
                             )
-                            return idx, None
+                            self.ledger.record("speech_summary", idx, e, attempts=attempt + 1)
+                            return None
 
                         # backoff exponencial com jitter
+                        self.metrics.record_retry(summary_model.model_name)
                         await asyncio.sleep(delay + 0.5)
                         delay *= 2
 
                     except Exception as e:
                         logger.error(f"[ERRO] Linha {idx}: {e}")
-                        return idx, None
+                        self.ledger.record("speech_summary", idx, e, attempts=attempt + 1)
+                        return None
+
+            async def process_row(
+                idx: int, row: pd.Series, max_retries: int = 5
+            ) -> tuple[int, Optional[str]]:
+                """
+                Processa uma linha com retry logic.
+
+                Falas acima de `max_speech_tokens` são resumidas por partes, em
+                paralelo (map), e os resumos parciais são resumidos de novo (reduce).
+                """
+                chunks = split_by_tokens(row["Text"], self.max_speech_tokens)
+                if len(chunks) == 1:
+                    return idx, await summarize_text(idx, row["Text"], max_retries)
+
+                partials = await asyncio.gather(
+                    *[summarize_text(idx, chunk, max_retries) for chunk in chunks]
+                )
+                partials = [p for p in partials if p]
+                if not partials:
+                    return idx, None
+                return idx, await summarize_text(idx, " ".join(partials), max_retries)
+
+            batch_stats = self._reset_batch_stats("speech_summary")
+
+            async def process_pack(pack: pd.DataFrame) -> List[tuple[int, Optional[str]]]:
+                """
+                Resume várias falas numa única chamada estruturada.
+
+                Falas ausentes ou com resumo vazio na resposta são refeitas com
+                `process_row`, assim como as falas longas, que não entram no lote.
+                """
+                long_speeches = [
+                    idx for idx, row in pack.iterrows()
+                    if count_tokens(row["Text"]) > self.max_speech_tokens
+                ]
+                long_results = await asyncio.gather(
+                    *[process_row(idx, pack.loc[idx]) for idx in long_speeches]
+                )
+                pack = pack.drop(index=long_speeches)
+                if pack.empty:
+                    return list(long_results)
+
+                speeches_str = "\n\n".join(
+                    f"[{idx}] {row['Text'].strip()}" for idx, row in pack.iterrows()
+                )
+
+                summaries: Dict[int, str] = {}
+                batch_stats["batch_calls"] += 1
+                try:
+                    resp = await s_summary_batch_chain.ainvoke({"speeches": speeches_str})
+                    summaries = {
+                        item.index: item.summary.strip()
+                        for item in resp.summaries
+                        if item.index in pack.index and item.summary.strip()
+                    }
+                except Exception as e:
+                    logger.warning(f"Falha no resumo em lote, refazendo individualmente: {e}")
+
+                missing = [idx for idx in pack.index if idx not in summaries]
+                if missing:
+                    batch_stats["fallbacks"] += len(missing)
+                    fallback = await asyncio.gather(
+                        *[process_row(idx, pack.loc[idx]) for idx in missing]
+                    )
+                    summaries.update(dict(fallback))
+
+                return list(summaries.items()) + list(long_results)
 
             async def process_in_batches(
                 df: pd.DataFrame, batch_size: int = 5
             ) -> pd.DataFrame:
                 """Processa em batches para melhor performance."""
+                pack_size = max(self.llm_batch_size, 1)
+                step = batch_size * pack_size
+
                 for start in tqdm_asyncio(
-                    range(0, len(df), batch_size), desc="Processando batches"
+                    range(0, len(df), step), desc="Processando batches"
                 ):
-                    end = start + batch_size
+                    end = start + step
                     batch = df.iloc[start:end]
 
+                    if pack_size > 1:
+                        packs = [
+                            batch.iloc[i : i + pack_size]
+                            for i in range(0, len(batch), pack_size)
+                        ]
+                        pack_results = await asyncio.gather(
+                            *[process_pack(pack) for pack in packs]
+                        )
+                        for results in pack_results:
+                            for idx, summary in results:
+                                df.loc[idx, "summary"] = summary
+                        continue
+
                     tasks = [process_row(idx, row) for idx, row in batch.iterrows()]
 
                     # Executa batch em paralelo
@@ -1198,9 +2587,31 @@ class DebateProcesser:
 
                 return df
 
-            return await process_in_batches(df, batch_size=10)
+            # Falas já resumidas (ver `analyze_speeches`) não são refeitas
+            if "summary" not in df.columns:
+                df["summary"] = None
+            pending = df.loc[df["summary"].isna()]
+            if len(pending) < len(df):
+                logger.info(f"{len(df) - len(pending)} falas já resumidas.")
+
+            # Falas repetidas são resumidas uma única vez
+            groups = self._dedup("speech_summary", pending["Text"])
+            if only_failed:
+                groups = self._retry_groups("speech_summary", groups)
+            else:
+                self.ledger.clear("speech_summary")
+            unique = await process_in_batches(pending.loc[list(groups)].copy(), batch_size=10)
+            for rep_idx, members in groups.items():
+                df.loc[members, "summary"] = unique.loc[rep_idx, "summary"]
+                if pd.notna(unique.loc[rep_idx, "summary"]):
+                    self.ledger.resolve("speech_summary", rep_idx)
+
+            if self.llm_batch_size > 1:
+                self._log_batch_stats("speech_summary")
+            return df
 
-        self.speeches = await summary_speeches(self.speeches)
+        with self._track_usage("speech_summary"):
+            self.speeches = await summary_speeches(self.speeches)
 
         # ===============================
         # Cálculo da Relevância das Respostas
@@ -1224,9 +2635,17 @@ class DebateProcesser:
             # Justificativa da pontuação
             justification: str = Field(description="Uma breve justificativa do porquê a pontuação foi dada (Ex: 'O candidato desviou o tema completamente.' ou 'A resposta foi direta e apresentou dados claros.')")
 
-        relevance_finder = init_chat_model(model="gpt-4o-mini", model_provider="openai")
+        class RelevanceAssessmentBatch(BaseModel):
+            assessments: List[RelevanceAssessment] = Field(
+                description="Uma avaliação para cada par recebido."
+            )
+
+        relevance_finder = self._init_chat_model(model="gpt-4o-mini", model_provider="openai")
         structured_relevance_finder = relevance_finder.with_structured_output(RelevanceAssessment)
         relevance_chain = relevance_template | structured_relevance_finder
+        relevance_batch_chain = relevance_batch_template | relevance_finder.with_structured_output(
+            RelevanceAssessmentBatch
+        )
 
 
         async def process_relevance_one(
@@ -1271,22 +2690,87 @@ class DebateProcesser:
                 logger.error(
                     f"Erro ao avaliar relevância no índice {response_index}: {e}"
                 )
+                self.ledger.record("relevance", response_index, e)
                 return None
 
+        async def process_relevance_batch(
+            df: pd.DataFrame, response_indices: List[int]
+        ) -> List[Optional[RelevanceAssessment]]:
+            """
+            Avalia vários pares pergunta/resposta numa única chamada estruturada.
+
+            Pares ausentes na resposta (ou a chamada inteira, em caso de erro)
+            são refeitos com `process_relevance_one`.
+
+            Args:
+                df: DataFrame com os speeches.
+                response_indices: Índices das respostas a avaliar.
+
+            Returns:
+                Lista de RelevanceAssessment (None para as que falharam).
+            """
+            # Pares cuja pergunta não está no DataFrame ficam para o fallback,
+            # que trata o erro
+            valid = [
+                idx for idx in response_indices
+                if int(df.loc[idx, "question_idx"]) in df.index
+            ]
+            pairs_str = "\n\n".join(
+                f"[{idx}]\n"
+                f"Pergunta: \"{df.loc[int(df.loc[idx, 'question_idx']), 'Text']}\"\n"
+                f"Resposta: \"{df.loc[idx, 'Text']}\""
+                for idx in valid
+            )
+
+            assessments: Dict[int, RelevanceAssessment] = {}
+            if valid:
+                batch_stats["batch_calls"] += 1
+                try:
+                    response = await relevance_batch_chain.ainvoke({"pairs": pairs_str})
+                    assessments = {
+                        a.response_index: a
+                        for a in response.assessments
+                        if a.response_index in valid
+                    }
+                except Exception as e:
+                    logger.warning(f"Falha na relevância em lote, refazendo individualmente: {e}")
+
+            missing = [idx for idx in response_indices if idx not in assessments]
+            batch_stats["fallbacks"] += len(missing)
+            fallback = await asyncio.gather(
+                *[process_relevance_one(df, idx) for idx in missing]
+            )
+            return list(assessments.values()) + list(fallback)
+
+        batch_stats = self._reset_batch_stats("relevance")
+
         async def process_relevance_assessment(
-            df: pd.DataFrame,
+            df: pd.DataFrame, only_missing: bool = False
         ) -> pd.DataFrame:
             """
             Função principal que processa a avaliação de relevância para todas as respostas.
 
             Args:
                 df: DataFrame com os speeches.
+                only_missing: Avalia só as respostas ainda sem pontuação (que
+                              falharam ou surgiram num Q&A refeito).
 
             Returns:
                 DataFrame com scores de relevância atribuídos.
             """
             # 1. Identifica todos os índices das falas classificadas como respostas
-            response_indices = df[df["question_idx"].notna()].index.tolist()
+            # Respostas à mesma pergunta em sequência: a pergunta é o prefixo
+            # comum dessas chamadas (cache de prompt do provedor)
+            responses = df["question_idx"].notna()
+            if only_missing and "relevance_score" in df.columns:
+                responses &= df["relevance_score"].isna()
+            else:
+                self.ledger.clear("relevance")
+            response_indices = (
+                df[responses]
+                .sort_values("question_idx", kind="stable")
+                .index.tolist()
+            )
 
             if not response_indices:
                 logger.warning("Nenhuma resposta válida encontrada para avaliação.")
@@ -1296,23 +2780,54 @@ class DebateProcesser:
                 f"Detectadas {len(response_indices)} respostas para avaliação de relevância."
             )
 
+            # Pares pergunta/resposta repetidos são avaliados uma única vez
+            pair_texts = pd.Series(
+                {
+                    idx: f"{df['Text'].get(int(df.loc[idx, 'question_idx']))}\n{df.loc[idx, 'Text']}"
+                    for idx in response_indices
+                }
+            )
+            groups = self._dedup("relevance", pair_texts)
+            response_indices = list(groups)
+
             # 2. Cria e executa as tarefas assíncronas
-            tasks = [process_relevance_one(df, index) for index in response_indices]
+            if self.llm_batch_size > 1:
+                packs = [
+                    response_indices[i : i + self.llm_batch_size]
+                    for i in range(0, len(response_indices), self.llm_batch_size)
+                ]
+                pack_results = await tqdm_asyncio.gather(
+                    *[process_relevance_batch(df, pack) for pack in packs],
+                    desc="Avaliando Relevância das Respostas",
+                )
+                results: List[Optional[RelevanceAssessment]] = [
+                    r for pack_result in pack_results for r in pack_result
+                ]
+                self._log_batch_stats("relevance")
+            else:
+                tasks = [process_relevance_one(df, index) for index in response_indices]
 
-            # Executa todas as tarefas de forma assíncrona
-            results: List[Optional[RelevanceAssessment]] = await tqdm_asyncio.gather(
-                *tasks, desc="Avaliando Relevância das Respostas"
-            )
+                # Executa todas as tarefas de forma assíncrona
+                results = await tqdm_asyncio.gather(
+                    *tasks, desc="Avaliando Relevância das Respostas"
+                )
 
             # 3. Mescla os resultados de volta ao DataFrame
             for r in results:
                 if r is not None:
-                    df.loc[r.response_index, "relevance_score"] = r.relevance_score
-                    df.loc[r.response_index, "relevance_justification"] = r.justification
+                    self.ledger.resolve("relevance", r.response_index)
+                    members = groups.get(r.response_index, [r.response_index])
+                    df.loc[members, "relevance_score"] = r.relevance_score
+                    df.loc[members, "relevance_justification"] = r.justification
 
             return df
 
-        self.speeches = await process_relevance_assessment(self.speeches)
+        with self._track_usage("relevance"):
+            self.speeches = await process_relevance_assessment(
+                self.speeches, only_missing=retry_subset
+            )
+
+        self._save_progress()
 
 
     def _get_titulo_eleitoral(self, candidato_nome: str) -> Optional[int]:
@@ -1335,10 +2850,17 @@ class DebateProcesser:
             return int(titulo_eleitoral.iloc[0])
         return None
 
+    @stage_method()
     def ingest_discussion_data(self) -> None:
         """
         Ingere os nós de DISCUSSAO e TEMA e os relacionamentos de coerência,
         alvo, e relevância no banco de dados.
+
+        A camada de discussões do debate é reescrita a partir de
+        `self.speeches`: as DISCUSSAO do debate e os relacionamentos
+        FAZ_PARTE_DE, ABORDOU_TEMA e RESPONDEU_A das suas falas são apagados
+        antes, já que um reagrupamento (ver `retry_failed`) renumera as
+        discussões e refaz Q&A e relevância.
         """
         debate_id = self.video_id
 
@@ -1348,9 +2870,30 @@ class DebateProcesser:
         speeches_df['ID_Discussao'] = speeches_df['ID_Discussao'].replace({np.nan: None})
         speeches_df['question_idx'] = speeches_df['question_idx'].replace({pd.NA: None, np.nan: None})
         
-        with self.database.driver.session() as session:
+        with self._session("ingest_discussion_data") as session:
             logger.info("--- Ingestão de Dados de Discussão ---")
 
+            # 0. LIMPEZA DA INGESTÃO ANTERIOR DESTE DEBATE
+            session.run(
+                """
+                MATCH (d:Debate {debate_id: $debate_id})-[:TEM_DISCURSO]->(s:Speech)
+                MATCH (s)-[r:FAZ_PARTE_DE|ABORDOU_TEMA|RESPONDEU_A]->()
+                DELETE r
+                """,
+                {"debate_id": debate_id},
+            )
+            session.run(
+                """
+                MATCH (d:Debate {debate_id: $debate_id})
+                OPTIONAL MATCH (d)-[r:ABORDOU_TEMA_DEBATE]->()
+                DELETE r
+                WITH DISTINCT d
+                MATCH (d)-[:CONTEM_DISCUSSAO]->(disc:DISCUSSAO)
+                DETACH DELETE disc
+                """,
+                {"debate_id": debate_id},
+            )
+
             # 1. INGESTÃO DE NÓS DE AGRUPAMENTO (DISCUSSAO e TEMA)
 
             # Ingestão de Discussão
@@ -1462,8 +3005,10 @@ class DebateProcesser:
                     {f'''
                     WITH s
                     MATCH (pergunta_speech:Speech {{speech_id: $question_speech_id}})
-                    // Cria o relacionamento de Resposta com propriedades de relevância
-                    MERGE (s)-[:RESPONDEU_A {{score: $relevance_score, justification: $relevance_justification}}]->(pergunta_speech)
+                    // Cria o relacionamento de Resposta e atualiza a relevância
+                    MERGE (s)-[resp:RESPONDEU_A]->(pergunta_speech)
+                    SET resp.score = $relevance_score,
+                        resp.justification = $relevance_justification
                     ''' if question_idx is not None and question_speech_id else ''}
                 """
 
@@ -1534,7 +3079,80 @@ class DebateProcesser:
                 else:
                     print("❌ Nome inválido. Tente novamente.")
 
-        # Aplicar mapeamento
+        return self._apply_speaker_map(df_dia, speaker_map)
+
+    def _write_pending_assignment(self, mapping_path: str) -> None:
+        """
+        Grava os dados necessários para a identificação manual e estaciona o debate.
+
+        O arquivo lista os candidatos válidos e, para cada Speaker_ID, os trechos
+        mais longos com timestamps e o texto transcrito correspondente. A resposta
+        esperada em `mapping_path` é um JSON {"SPEAKER_00": "NOME URNA" | null, ...}.
+
+        Raises:
+            PendingSpeakerAssignment: Sempre.
+        """
+        speakers = {}
+        durations = self.df_dia["Diarizacao_End"] - self.df_dia["Diarizacao_Start"]
+        for speaker_id, df_spk in self.df_dia.assign(Duration=durations).groupby("Speaker_ID"):
+            samples = []
+            for _, row in df_spk.nlargest(5, "Duration").sort_values("Diarizacao_Start").iterrows():
+                overlapping = self.transcript.loc[
+                    (self.transcript["start"] <= row["Diarizacao_End"])
+                    & (self.transcript["end"] >= row["Diarizacao_Start"]),
+                    "text",
+                ]
+                samples.append(
+                    {
+                        "start": float(row["Diarizacao_Start"]),
+                        "end": float(row["Diarizacao_End"]),
+                        "text": "".join(overlapping).strip(),
+                    }
+                )
+            speakers[speaker_id] = {
+                "total_seconds": float(df_spk["Duration"].sum()),
+                "segments": len(df_spk),
+                "samples": samples,
+            }
+
+        pending_path = os.path.join(self.folder_path, PENDING_ASSIGNMENT_FILENAME)
+        with open(pending_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "video_id": self.video_id,
+                    "candidatos": self.result_candidatos,
+                    "mapping_file": mapping_path,
+                    "speakers": speakers,
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+        raise PendingSpeakerAssignment(self.video_id, pending_path, mapping_path)
+
+    def _load_speaker_mapping(self, mapping_path: str) -> Dict[str, Optional[str]]:
+        """Lê e valida o mapeamento Speaker_ID → Candidato escrito por um humano."""
+        with open(mapping_path, "r", encoding="utf-8") as f:
+            speaker_map = json.load(f)
+
+        invalid = [
+            nome for nome in speaker_map.values()
+            if nome is not None and nome not in self.result_candidatos
+        ]
+        if invalid:
+            raise ValueError(
+                f"Nomes inválidos em {mapping_path}: {invalid}. "
+                f"Candidatos disponíveis: {self.result_candidatos}"
+            )
+
+        logger.info(f"Loaded speaker mapping from {mapping_path}")
+        return speaker_map
+
+    def _apply_speaker_map(
+        self, df_dia: pd.DataFrame, speaker_map: Dict[str, Optional[str]]
+    ) -> pd.DataFrame:
+        """Aplica um mapeamento Speaker_ID → Candidato (None para não candidatos)."""
         df_dia["Candidato"] = df_dia["Speaker_ID"].map(speaker_map)
         df_dia["Titulo_Eleitoral"] = df_dia["Candidato"].map(self.result_documentos)
 
@@ -0,0 +1,42 @@
+# Utils
+import hashlib
+import re
+
+# Processamento de dados
+from typing import Any, Dict, List
+import pandas as pd
+
+from src.sample_selection import normalize_text
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_for_dedup(text: Any) -> str:
+    """Minúsculas, sem acentos, sem pontuação e com espaços colapsados."""
+    if not isinstance(text, str):
+        return ""
+    text = _NON_WORD.sub(" ", normalize_text(text))
+    return _SPACES.sub(" ", text).strip()
+
+
+def text_key(text: Any) -> str:
+    """Hash da forma normalizada de um texto (ver `normalize_for_dedup`)."""
+    return hashlib.sha1(normalize_for_dedup(text).encode("utf-8")).hexdigest()
+
+
+def duplicate_groups(texts: pd.Series) -> Dict[Any, List[Any]]:
+    """
+    Agrupa as linhas com o mesmo texto normalizado.
+
+    Args:
+        texts: Série de textos (ou de chaves já combinadas) indexada pelas linhas.
+
+    Returns:
+        Dicionário índice representante (primeira ocorrência) -> índices de
+        todas as linhas com o mesmo texto, incluindo o representante.
+    """
+    groups: Dict[str, List[Any]] = {}
+    for idx, text in texts.items():
+        groups.setdefault(text_key(text), []).append(idx)
+    return {members[0]: members for members in groups.values()}
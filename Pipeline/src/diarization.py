@@ -0,0 +1,289 @@
+# Utils
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# AI
+from pyannote.audio import Pipeline as pya_Pipeline
+from pyannote.core import Segment
+import torch
+
+# Processamento de dados
+from scipy.cluster.hierarchy import linkage, fcluster
+from scipy.spatial.distance import pdist
+from typing import List, Optional, Dict, Any, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+from src.my_utils import pcm_to_float
+
+# Distância de cosseno máxima para dois falantes locais serem o mesmo falante global
+DEFAULT_RECLUSTER_THRESHOLD = 0.6
+# Distância imposta entre falantes locais da mesma janela: o pyannote já os
+# separou, então o average linkage não deve fundi-los num falante global
+CANNOT_LINK_DISTANCE = 1e6
+
+
+def diarization_windows(
+    duration: float, window_length: float, overlap: float
+) -> List[Tuple[float, float, float, float]]:
+    """
+    Divide o áudio em janelas de tamanho fixo com sobreposição.
+
+    Cada janela "possui" apenas o trecho entre os pontos médios das
+    sobreposições com as vizinhas, para que um segmento na sobreposição seja
+    mantido por uma única janela.
+
+    Args:
+        duration: Duração do áudio em segundos.
+        window_length: Tamanho de cada janela em segundos.
+        overlap: Sobreposição entre janelas consecutivas em segundos.
+
+    Returns:
+        Lista de (início, fim, início_posse, fim_posse) em segundos; vazia
+        se o áudio não tiver duração.
+    """
+    if overlap >= window_length:
+        raise ValueError("A sobreposição deve ser menor que a janela.")
+    if duration <= 0:
+        return []
+
+    step = window_length - overlap
+    windows = []
+    start = 0.0
+    while True:
+        end = min(start + window_length, duration)
+        is_last = end >= duration
+        own_start = start + overlap / 2 if windows else 0.0
+        own_end = duration if is_last else end - overlap / 2
+        windows.append((start, end, own_start, own_end))
+        if is_last:
+            break
+        start += step
+
+    return windows
+
+
+def recluster_speakers(
+    embeddings: np.ndarray,
+    threshold: float = DEFAULT_RECLUSTER_THRESHOLD,
+    max_speakers: Optional[int] = None,
+    windows: Optional[Sequence[int]] = None,
+) -> np.ndarray:
+    """
+    Agrupa os falantes locais de todas as janelas em falantes globais.
+
+    Clustering aglomerativo (average linkage, distância de cosseno) sobre os
+    centroides de cada falante local. Centroides inválidos (NaN, falantes com
+    fala curta demais) viram clusters próprios. Falantes locais da mesma
+    janela recebem a distância `CANNOT_LINK_DISTANCE` entre si, para que
+    vozes parecidas já separadas pelo pyannote não virem um só falante.
+
+    Args:
+        embeddings: Matriz (n_falantes_locais, dim) com os centroides.
+        threshold: Distância de cosseno máxima dentro de um cluster.
+        max_speakers: Se informado, limita o número de clusters. Só força a
+                      fusão de falantes da mesma janela se for menor que o
+                      número de falantes de alguma janela.
+        windows: Janela de origem de cada falante local.
+
+    Returns:
+        Array com o rótulo global (0..k-1) de cada falante local, numerado
+        pela ordem de primeira aparição.
+    """
+    n = len(embeddings)
+    labels = np.full(n, -1, dtype=int)
+    valid = ~np.isnan(embeddings).any(axis=1)
+
+    if valid.sum() == 1:
+        labels[valid] = 0
+    elif valid.sum() > 1:
+        distances = pdist(embeddings[valid], metric="cosine")
+        if windows is not None:
+            window_of = np.asarray(windows, dtype=float)[valid]
+            same_window = pdist(window_of[:, None], metric="cityblock") == 0
+            distances[same_window] = CANNOT_LINK_DISTANCE
+        tree = linkage(distances, method="average")
+        clusters = fcluster(tree, t=threshold, criterion="distance")
+        if max_speakers is not None and clusters.max() > max_speakers:
+            clusters = fcluster(tree, t=max_speakers, criterion="maxclust")
+        labels[valid] = clusters
+
+    # Falantes sem embedding ganham um rótulo próprio
+    next_label = labels.max() + 1
+    for i in np.flatnonzero(labels < 0):
+        labels[i] = next_label
+        next_label += 1
+
+    # Renumera pela ordem de primeira aparição
+    _, first_seen = np.unique(labels, return_index=True)
+    order = labels[np.sort(first_seen)]
+    remap = {label: i for i, label in enumerate(order)}
+    return np.array([remap[label] for label in labels])
+
+
+def _diarize_samples(
+    diarization_pipeline,
+    samples: np.ndarray,
+    sample_rate: int,
+    max_speakers: Optional[int],
+) -> Tuple[List[Tuple[float, float, str]], List[str], np.ndarray]:
+    """Roda o pyannote em uma janela e devolve segmentos, rótulos e centroides locais."""
+    waveform = torch.from_numpy(pcm_to_float(samples)).unsqueeze(0)
+    kwargs = {"max_speakers": max_speakers} if max_speakers else {}
+    annotation, centroids = diarization_pipeline(
+        {"waveform": waveform, "sample_rate": sample_rate},
+        return_embeddings=True,
+        **kwargs,
+    )
+
+    segments = [
+        (segment.start, segment.end, label)
+        for segment, _, label in annotation.itertracks(yield_label=True)
+    ]
+    # Os centroides seguem a ordem de `annotation.labels()`
+    labels = annotation.labels()
+    centroids = np.asarray(centroids[: len(labels)], dtype=np.float32)
+    return segments, labels, centroids
+
+
+# Estado dos processos de diarização paralela (um pipeline por processo)
+_worker_pipeline = None
+
+
+def _init_diarization_worker(device: str, pipeline_params: Dict[str, Any]) -> None:
+    global _worker_pipeline
+    _worker_pipeline = pya_Pipeline.from_pretrained(
+        "pyannote/speaker-diarization-3.1",
+        use_auth_token=os.getenv("HF_API_KEY"),
+    )
+    _worker_pipeline.to(torch.device(device))
+    for name, value in pipeline_params.items():
+        setattr(_worker_pipeline, name, value)
+
+
+def _diarize_window_worker(
+    npy_path: str, first_sample: int, last_sample: int, sample_rate: int, max_speakers: Optional[int]
+):
+    audio = np.load(npy_path, mmap_mode="r")
+    return _diarize_samples(
+        _worker_pipeline, audio[first_sample:last_sample], sample_rate, max_speakers
+    )
+
+
+def diarize_in_windows(
+    diarization_pipeline,
+    audio: np.ndarray,
+    sample_rate: int,
+    window_length: float = 900,
+    overlap: float = 30,
+    max_speakers: Optional[int] = None,
+    threshold: float = DEFAULT_RECLUSTER_THRESHOLD,
+    workers: int = 1,
+    npy_path: Optional[str] = None,
+    device: str = "cpu",
+    pipeline_params: Optional[Dict[str, Any]] = None,
+) -> Tuple[pd.DataFrame, Dict[str, np.ndarray]]:
+    """
+    Diarização de transmissões longas em janelas sobrepostas.
+
+    Cada janela é diarizada de forma independente (memória limitada pelo
+    tamanho da janela) e os falantes locais são reconciliados em
+    `Speaker_ID`s globais por um único clustering sobre os centroides.
+
+    Args:
+        diarization_pipeline: Pipeline pyannote já carregado (modo sequencial).
+        audio: Amostras int16 (ver `load_pcm`).
+        sample_rate: Taxa de amostragem do áudio.
+        window_length: Tamanho das janelas em segundos.
+        overlap: Sobreposição entre janelas em segundos.
+        max_speakers: Limite de falantes por janela e no total.
+        threshold: Distância de cosseno usada no clustering global.
+        workers: Processos paralelos. Com mais de um, cada processo carrega
+                 o próprio pipeline e lê sua janela do memmap `npy_path`.
+        npy_path: Caminho do .npy do áudio (obrigatório se workers > 1).
+        device: Dispositivo dos pipelines dos workers.
+        pipeline_params: Atributos a definir no pipeline dos workers
+                         (ex: batch sizes).
+
+    Returns:
+        Tupla (df_dia, centroides): o DataFrame tem as colunas 'Segment',
+        'Track' e 'Speaker_ID' (tempos relativos ao início de `audio`) e os
+        centroides são a média dos embeddings locais de cada `Speaker_ID`.
+    """
+    duration = len(audio) / sample_rate
+    windows = diarization_windows(duration, window_length, overlap)
+    if not windows:
+        return pd.DataFrame(columns=["Segment", "Track", "Speaker_ID"]), {}
+    bounds = [
+        (int(start * sample_rate), int(end * sample_rate)) for start, end, _, _ in windows
+    ]
+
+    if workers > 1:
+        if npy_path is None:
+            raise ValueError("npy_path é obrigatório para diarização paralela.")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_diarization_worker,
+            initargs=(device, pipeline_params or {}),
+        ) as executor:
+            results = list(
+                executor.map(
+                    _diarize_window_worker,
+                    [npy_path] * len(bounds),
+                    [first for first, _ in bounds],
+                    [last for _, last in bounds],
+                    [sample_rate] * len(bounds),
+                    [max_speakers] * len(bounds),
+                )
+            )
+    else:
+        results = [
+            _diarize_samples(diarization_pipeline, audio[first:last], sample_rate, max_speakers)
+            for first, last in bounds
+        ]
+
+    # Falantes locais de todas as janelas: (janela, rótulo local) -> linha da matriz
+    local_keys: List[Tuple[int, str]] = []
+    local_embeddings: List[np.ndarray] = []
+    for w, (_, labels, centroids) in enumerate(results):
+        for label, centroid in zip(labels, centroids):
+            local_keys.append((w, label))
+            local_embeddings.append(centroid)
+
+    if not local_keys:
+        return pd.DataFrame(columns=["Segment", "Track", "Speaker_ID"]), {}
+
+    embeddings = np.vstack(local_embeddings)
+    global_labels = recluster_speakers(
+        embeddings, threshold, max_speakers, windows=[w for w, _ in local_keys]
+    )
+    speaker_of = {
+        key: f"SPEAKER_{label:02d}" for key, label in zip(local_keys, global_labels)
+    }
+
+    rows = []
+    for w, ((window_start, _, own_start, own_end), (segments, _, _)) in enumerate(
+        zip(windows, results)
+    ):
+        for start, end, label in segments:
+            start, end = start + window_start, end + window_start
+            # Mantém o segmento só na janela que possui o seu ponto médio
+            if own_start <= (start + end) / 2 < own_end:
+                rows.append((Segment(start, end), len(rows), speaker_of[(w, label)]))
+
+    df_dia = pd.DataFrame(rows, columns=["Segment", "Track", "Speaker_ID"])
+    df_dia = df_dia.sort_values(
+        "Segment", key=lambda col: col.apply(lambda s: s.start)
+    ).reset_index(drop=True)
+
+    centroids = {}
+    for speaker in sorted(set(speaker_of.values())):
+        members = [i for i, key in enumerate(local_keys) if speaker_of[key] == speaker]
+        member_embeddings = embeddings[members]
+        member_embeddings = member_embeddings[~np.isnan(member_embeddings).any(axis=1)]
+        if len(member_embeddings):
+            centroids[speaker] = member_embeddings.mean(axis=0)
+
+    return df_dia, centroids
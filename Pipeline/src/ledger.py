@@ -0,0 +1,71 @@
+# Utils
+import json
+import os
+from datetime import datetime, timezone
+
+# Processamento de dados
+from typing import Any, Dict, List
+
+# ================================
+# Constants
+# ================================
+FAILURES_FILENAME = "failures.json"
+
+
+class FailureLedger:
+    """
+    Registro persistente dos itens que falharam em cada etapa de LLM.
+
+    Guarda, por etapa, a chave do item (índice da fala, ID da discussão,
+    janela de coerência...), a classe e a mensagem do erro e o número de
+    tentativas, para que uma execução de `retry_failed` refaça apenas esses
+    itens.
+
+    Formato do arquivo:
+        {"etapa": {"chave": {"error": ..., "message": ..., "attempts": ..., "timestamp": ...}}}
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.entries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self.entries.values())
+
+    def record(self, stage: str, key: Any, error: BaseException, attempts: int = 1) -> None:
+        """Registra (ou atualiza) a falha de um item."""
+        previous = self.entries.get(stage, {}).get(str(key), {})
+        self.entries.setdefault(stage, {})[str(key)] = {
+            "error": type(error).__name__,
+            "message": str(error)[:500],
+            "attempts": previous.get("attempts", 0) + attempts,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+
+    def resolve(self, stage: str, key: Any) -> None:
+        """Remove um item que passou a ter sucesso."""
+        items = self.entries.get(stage)
+        if items is not None:
+            items.pop(str(key), None)
+            if not items:
+                del self.entries[stage]
+
+    def failed(self, stage: str) -> List[str]:
+        """Chaves dos itens com falha numa etapa."""
+        return list(self.entries.get(stage, {}))
+
+    def clear(self, stage: str) -> None:
+        self.entries.pop(stage, None)
+
+    def summary(self) -> Dict[str, int]:
+        """Quantidade de falhas por etapa."""
+        return {stage: len(items) for stage, items in self.entries.items()}
+
+    def save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,441 @@
+# Utils
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Processamento de dados
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+import numpy as np
+
+# AI
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+# Ambiente
+import logging
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# ================================
+# Constants
+# ================================
+METRICS_FILENAME = "metrics.json"
+LATENCY_PERCENTILES = (50, 90, 99)
+STAGE_SEPARATOR = "/"
+
+# Callback de LLM ativo no contexto atual (ver `PipelineMetrics.track_llm`)
+_llm_callback_var: ContextVar[Optional["LLMMetricsCallback"]] = ContextVar(
+    "llm_metrics_callback", default=None
+)
+register_configure_hook(_llm_callback_var, inheritable=True)
+
+# Pilha de etapas abertas no contexto atual; cada task do asyncio herda uma cópia
+_stage_stack_var: ContextVar[Tuple["_StageFrame", ...]] = ContextVar(
+    "metrics_stage_stack", default=()
+)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Pico de memória residente do processo até agora (MB)."""
+    if resource is None:
+        return None
+    # ru_maxrss é em kB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {f"p{p}": None for p in LATENCY_PERCENTILES}
+    return {
+        f"p{p}": round(float(v), 4)
+        for p, v in zip(LATENCY_PERCENTILES, np.percentile(values, LATENCY_PERCENTILES))
+    }
+
+
+class _StageFrame:
+    """Medições de uma etapa aberta."""
+
+    def __init__(self, path: str, trace_memory: bool) -> None:
+        self.path = path
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.rss_start = _peak_rss_mb()
+        self.trace_memory = trace_memory
+        self.child_peak = 0
+        if trace_memory:
+            # O pico até aqui pertence à etapa pai
+            self.parent_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """
+    Callback do LangChain que mede as chamadas de chat por modelo:
+    requisições, erros, tokens (incluindo os em cache) e latência.
+    """
+
+    run_inline = True
+
+    def __init__(self, metrics: "PipelineMetrics") -> None:
+        super().__init__()
+        self.metrics = metrics
+        self._runs: Dict[UUID, Tuple[float, str]] = {}
+
+    @staticmethod
+    def _model_name(serialized: Optional[Dict[str, Any]], metadata: Optional[Dict[str, Any]]) -> str:
+        metadata = metadata or {}
+        if metadata.get("ls_model_name"):
+            return metadata["ls_model_name"]
+        kwargs = (serialized or {}).get("kwargs", {})
+        return kwargs.get("model_name") or kwargs.get("model") or "unknown"
+
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs: Any
+    ) -> None:
+        self._runs[run_id] = (time.perf_counter(), self._model_name(serialized, metadata))
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, metadata=None, **kwargs: Any) -> None:
+        self._runs[run_id] = (time.perf_counter(), self._model_name(serialized, metadata))
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        start, model = self._runs.pop(run_id, (None, "unknown"))
+        usage: Dict[str, Any] = {}
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                if message is not None and getattr(message, "usage_metadata", None):
+                    usage = message.usage_metadata
+        latency = time.perf_counter() - start if start is not None else None
+        self.metrics.record_llm_call(
+            model,
+            latency=latency,
+            input_tokens=usage.get("input_tokens", 0),
+            output_tokens=usage.get("output_tokens", 0),
+            cached_tokens=usage.get("input_token_details", {}).get("cache_read", 0),
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        start, model = self._runs.pop(run_id, (None, "unknown"))
+        latency = time.perf_counter() - start if start is not None else None
+        self.metrics.record_llm_call(model, latency=latency, error=error)
+
+    def on_retry(self, retry_state, *, run_id: UUID, **kwargs: Any) -> None:
+        _, model = self._runs.get(run_id, (None, "unknown"))
+        self.metrics.record_retry(model)
+
+
+class _CountingSession:
+    """
+    Sessão do Neo4j que conta as idas ao banco e os nós, relações e
+    propriedades escritos por cada `run`.
+
+    Com `count_writes=True` o resultado é consumido logo após o `run`, então
+    só deve ser usada em consultas cujo retorno não é lido (ingestão).
+    """
+
+    def __init__(self, session, metrics: "PipelineMetrics", method: str, count_writes: bool) -> None:
+        self._session = session
+        self._metrics = metrics
+        self._method = method
+        self._count_writes = count_writes
+
+    def __enter__(self) -> "_CountingSession":
+        self._session.__enter__()
+        return self
+
+    def __exit__(self, *exc_info) -> Any:
+        return self._session.__exit__(*exc_info)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+    def run(self, query, parameters=None, **kwargs: Any):
+        start = time.perf_counter()
+        result = self._session.run(query, parameters, **kwargs)
+        counters = result.consume().counters if self._count_writes else None
+        self._metrics.record_neo4j(self._method, time.perf_counter() - start, counters)
+        return result
+
+
+class PipelineMetrics:
+    """
+    Métricas de execução de um debate.
+
+    - Etapas: tempo de relógio e de CPU, pico de RSS do processo ao fim da
+      etapa e quanto a etapa o elevou e, com `trace_memory=True`, o pico do
+      `tracemalloc` (alocações Python). Etapas aninhadas são registradas
+      como "pai/filha".
+    - LLM, por modelo: requisições, erros, rate limits, retentativas,
+      tokens de entrada/saída/cache e percentis de latência.
+    - Neo4j, por método: idas ao banco, tempo e nós/relações/propriedades
+      escritos.
+
+    Etapas concorrentes (tasks do asyncio ou threads) dividem o mesmo
+    processo, então CPU, RSS e `tracemalloc` são aproximados nesses casos.
+    """
+
+    def __init__(self, video_id: Optional[str] = None, trace_memory: bool = False) -> None:
+        self.video_id = video_id
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.llm: Dict[str, Dict[str, Any]] = {}
+        self.neo4j: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    # ================================
+    # Etapas
+    # ================================
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Mede o bloco como a etapa `name`, aninhada na etapa aberta.
+
+        Reabrir a etapa que já é a mais interna não cria um novo nível (um
+        método de etapa que mede o próprio corpo, por exemplo).
+        """
+        stack = _stage_stack_var.get()
+        if stack and stack[-1].path.rsplit(STAGE_SEPARATOR, 1)[-1] == name:
+            yield
+            return
+
+        path = f"{stack[-1].path}{STAGE_SEPARATOR}{name}" if stack else name
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+
+        frame = _StageFrame(path, self.trace_memory)
+        token = _stage_stack_var.set(stack + (frame,))
+        try:
+            yield
+        finally:
+            _stage_stack_var.reset(token)
+            wall = time.perf_counter() - frame.wall_start
+            cpu = time.process_time() - frame.cpu_start
+            rss = _peak_rss_mb()
+
+            traced_peak = None
+            if frame.trace_memory and tracemalloc.is_tracing():
+                traced_peak = max(tracemalloc.get_traced_memory()[1], frame.child_peak)
+                tracemalloc.reset_peak()
+                if stack and stack[-1].trace_memory:
+                    parent = stack[-1]
+                    parent.child_peak = max(parent.child_peak, frame.parent_peak, traced_peak)
+            if started_tracing:
+                tracemalloc.stop()
+
+            with self._lock:
+                entry = self.stages.setdefault(
+                    path,
+                    {
+                        "calls": 0,
+                        "wall_s": 0.0,
+                        "cpu_s": 0.0,
+                        "peak_rss_mb": None,
+                        "rss_growth_mb": 0.0,
+                        "tracemalloc_peak_mb": None,
+                    },
+                )
+                entry["calls"] += 1
+                entry["wall_s"] += wall
+                entry["cpu_s"] += cpu
+                if rss is not None:
+                    entry["peak_rss_mb"] = max(entry["peak_rss_mb"] or 0.0, rss)
+                    entry["rss_growth_mb"] += rss - frame.rss_start
+                if traced_peak is not None:
+                    entry["tracemalloc_peak_mb"] = max(
+                        entry["tracemalloc_peak_mb"] or 0.0, traced_peak / 2**20
+                    )
+
+    # ================================
+    # LLM
+    # ================================
+    @contextmanager
+    def track_llm(self) -> Iterator["LLMMetricsCallback"]:
+        """Mede as chamadas de chat feitas dentro do bloco (inclusive em tasks filhas)."""
+        callback = LLMMetricsCallback(self)
+        token = _llm_callback_var.set(callback)
+        try:
+            yield callback
+        finally:
+            _llm_callback_var.reset(token)
+
+    def _llm_entry(self, model: str) -> Dict[str, Any]:
+        return self.llm.setdefault(
+            model,
+            {
+                "requests": 0,
+                "errors": 0,
+                "rate_limited": 0,
+                "retries": 0,
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "cached_tokens": 0,
+                "latencies_s": [],
+            },
+        )
+
+    def record_llm_call(
+        self,
+        model: str,
+        latency: Optional[float] = None,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cached_tokens: int = 0,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        with self._lock:
+            entry = self._llm_entry(model)
+            entry["requests"] += 1
+            entry["input_tokens"] += input_tokens or 0
+            entry["output_tokens"] += output_tokens or 0
+            entry["cached_tokens"] += cached_tokens or 0
+            if latency is not None:
+                entry["latencies_s"].append(round(latency, 4))
+            if error is not None:
+                entry["errors"] += 1
+                if "RateLimit" in type(error).__name__:
+                    entry["rate_limited"] += 1
+
+    def record_retry(self, model: str) -> None:
+        """Conta uma retentativa (backoff do pipeline ou do LangChain)."""
+        with self._lock:
+            self._llm_entry(model)["retries"] += 1
+
+    # ================================
+    # Neo4j
+    # ================================
+    def neo4j_session(self, session, method: str, count_writes: bool = True) -> _CountingSession:
+        """Envolve uma sessão do Neo4j para medir as consultas de `method`."""
+        return _CountingSession(session, self, method, count_writes)
+
+    def record_neo4j(self, method: str, elapsed: float, counters: Any = None) -> None:
+        with self._lock:
+            entry = self.neo4j.setdefault(
+                method,
+                {
+                    "round_trips": 0,
+                    "time_s": 0.0,
+                    "nodes_created": 0,
+                    "relationships_created": 0,
+                    "properties_set": 0,
+                },
+            )
+            entry["round_trips"] += 1
+            entry["time_s"] += elapsed
+            if counters is not None:
+                entry["nodes_created"] += counters.nodes_created
+                entry["relationships_created"] += counters.relationships_created
+                entry["properties_set"] += counters.properties_set
+
+    # ================================
+    # Relatório
+    # ================================
+    def report(self) -> Dict[str, Any]:
+        """Relatório serializável em JSON."""
+        with self._lock:
+            llm = {
+                model: {
+                    **entry,
+                    "latencies_s": list(entry["latencies_s"]),
+                    "latency_s": _percentiles(entry["latencies_s"]),
+                }
+                for model, entry in self.llm.items()
+            }
+            return {
+                "video_id": self.video_id,
+                "stages": {path: dict(entry) for path, entry in self.stages.items()},
+                "llm": llm,
+                "neo4j": {method: dict(entry) for method, entry in self.neo4j.items()},
+            }
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+
+def stage_method(name: Optional[str] = None) -> Callable:
+    """
+    Decorador para métodos de etapa de classes com atributo `metrics`
+    (`PipelineMetrics`). Funciona com métodos síncronos e assíncronos.
+    """
+
+    def decorator(method: Callable) -> Callable:
+        stage_name = name or method.__name__
+
+        if inspect.iscoroutinefunction(method):
+
+            @functools.wraps(method)
+            async def async_wrapper(self, *args: Any, **kwargs: Any) -> Any:
+                with self.metrics.stage(stage_name):
+                    return await method(self, *args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            with self.metrics.stage(stage_name):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def aggregate_reports(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Agrega os relatórios de vários debates (ver `PipelineMetrics.report`).
+
+    Tempos, contagens e tokens são somados; picos de memória ficam com o
+    máximo; os percentis de latência são recalculados sobre todas as chamadas.
+    """
+    stages: Dict[str, Dict[str, Any]] = {}
+    llm: Dict[str, Dict[str, Any]] = {}
+    neo4j: Dict[str, Dict[str, Any]] = {}
+
+    for report in reports:
+        for path, entry in report.get("stages", {}).items():
+            total = stages.setdefault(path, {"debates": 0})
+            total["debates"] += 1
+            for key, value in entry.items():
+                if value is None:
+                    total.setdefault(key, None)
+                elif key in ("peak_rss_mb", "tracemalloc_peak_mb"):
+                    total[key] = max(total.get(key) or 0.0, value)
+                else:
+                    total[key] = total.get(key, 0) + value
+
+        for model, entry in report.get("llm", {}).items():
+            total = llm.setdefault(model, {"latencies_s": []})
+            for key, value in entry.items():
+                if key == "latencies_s":
+                    total[key].extend(value)
+                elif key != "latency_s":
+                    total[key] = total.get(key, 0) + value
+
+        for method, entry in report.get("neo4j", {}).items():
+            total = neo4j.setdefault(method, {})
+            for key, value in entry.items():
+                total[key] = total.get(key, 0) + value
+
+    for entry in llm.values():
+        entry["latency_s"] = _percentiles(entry["latencies_s"])
+
+    return {
+        "debates": [report.get("video_id") for report in reports],
+        "stages": stages,
+        "llm": llm,
+        "neo4j": neo4j,
+    }
@@ -2,6 +2,11 @@
 import subprocess
 import datetime
 import time
+import json
+import wave
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from thefuzz import process
 import random
 
@@ -10,6 +15,7 @@ import whisper
 
 # Data
 from sentence_transformers import util
+import numpy as np
 import torch
 
 import yt_dlp
@@ -220,6 +226,143 @@ def download_audio(
     raise Exception("Failed to download audio after all retry attempts.")
 
 
+def download_audio_range(
+    video_url,
+    output_path,
+    start=0,
+    end=None,
+    sample_rate=16000,
+    max_retries=3,
+    cookies_file=None,
+    cookies_from_browser=None,
+):
+    """
+    Baixa apenas a janela [start, end] do áudio de um vídeo do YouTube,
+    gravando direto em WAV PCM 16-bit mono em uma única passada do ffmpeg.
+
+    O yt-dlp é usado só para resolver a URL do stream; o ffmpeg lê a URL
+    com seek via HTTP range e decodifica direto para PCM. O progresso fica em
+    '<output_path>.part' (PCM cru): se o download cair, a próxima tentativa
+    (ou a próxima execução) continua do último sample gravado.
+
+    Args:
+        video_url (str): URL do vídeo do YouTube.
+        output_path (str): Caminho do WAV de saída.
+        start (float): Início da janela em segundos.
+        end (float, optional): Fim da janela em segundos. None vai até o fim do vídeo.
+        sample_rate (int): Taxa de amostragem de saída.
+        max_retries (int): Número de tentativas.
+        cookies_file (str, optional): Caminho para um arquivo cookies.txt.
+        cookies_from_browser (str, optional): Navegador de onde extrair cookies.
+
+    Returns:
+        str: Caminho do WAV gerado. Os timestamps do arquivo começam em `start`.
+    """
+    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        print(f"✅ Audio already downloaded: {output_path}")
+        return output_path
+
+    # Verifica variáveis de ambiente para cookies se não fornecidos explicitamente
+    if cookies_file is None:
+        cookies_file = os.getenv('YOUTUBE_COOKIES_FILE')
+    if cookies_from_browser is None:
+        cookies_from_browser = os.getenv('YOUTUBE_COOKIES_FROM_BROWSER')
+
+    ydl_opts = {
+        "format": "bestaudio/best",
+        "noplaylist": True,
+        "quiet": True,
+        "cookiefile": cookies_file,
+    }
+    if cookies_from_browser and not cookies_file:
+        browser_parts = cookies_from_browser.split(':')
+        browser_name = browser_parts[0]
+        profile = browser_parts[1] if len(browser_parts) > 1 else None
+        ydl_opts['cookiesfrombrowser'] = (browser_name, profile) if profile else (browser_name,)
+
+    part_path = output_path + ".part"
+    bytes_per_sample = 2  # s16le mono
+
+    for attempt in range(1, max_retries + 1):
+        print(f"\nAttempt {attempt}/{max_retries}")
+
+        # Retomar de onde o .part parou (alinhado ao sample)
+        done_samples = 0
+        if os.path.exists(part_path):
+            done_samples = os.path.getsize(part_path) // bytes_per_sample
+            with open(part_path, "r+b") as f:
+                f.truncate(done_samples * bytes_per_sample)
+        seek = start + done_samples / sample_rate
+
+        if end is not None and seek >= end:
+            break
+
+        try:
+            # A URL do stream expira, então é resolvida a cada tentativa
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(video_url, download=False)
+
+            headers = "".join(
+                f"{key}: {value}\r\n" for key, value in (info.get("http_headers") or {}).items()
+            )
+
+            cmd = [
+                "ffmpeg", "-hide_banner", "-loglevel", "error",
+                "-reconnect", "1", "-reconnect_streamed", "1", "-reconnect_delay_max", "5",
+                "-headers", headers,
+                "-ss", str(seek),
+                "-i", info["url"],
+            ]
+            if end is not None:
+                cmd += ["-t", str(end - seek)]
+            cmd += [
+                "-vn",
+                "-ac", "1",
+                "-ar", str(sample_rate),
+                "-f", "s16le",
+                "-acodec", "pcm_s16le",
+                "pipe:1",
+            ]
+
+            if done_samples:
+                print(f"⏩ Resuming from {seek:.1f}s")
+            with open(part_path, "ab") as f:
+                subprocess.run(cmd, check=True, stdout=f)
+            break
+
+        except yt_dlp.utils.DownloadError as e:
+            print(f"❌ yt-dlp error: {e}")
+
+        except Exception as e:
+            print(f"❌ Unexpected error: {e}")
+
+        # Wait before next retry
+        if attempt < max_retries:
+            wait = min(attempt * 5, 20)
+            print(f"⏳ Retrying in {wait} seconds...")
+            time.sleep(wait)
+    else:
+        raise Exception("Failed to download audio after all retry attempts.")
+
+    if not os.path.exists(part_path) or os.path.getsize(part_path) == 0:
+        raise Exception(f"Downloaded audio is empty: {part_path}")
+
+    # Envolver o PCM cru em um cabeçalho WAV
+    with open(part_path, "rb") as src, wave.open(output_path, "wb") as dst:
+        dst.setnchannels(1)
+        dst.setsampwidth(bytes_per_sample)
+        dst.setframerate(sample_rate)
+        while True:
+            data = src.read(1 << 20)
+            if not data:
+                break
+            dst.writeframes(data)
+    os.remove(part_path)
+
+    print(f"✅ Audio downloaded: {output_path} ({os.path.getsize(output_path)} bytes)")
+    return output_path
+
+
 def create_path(path):
     """Cria um diretório se ele não existir."""
 
@@ -229,41 +372,74 @@ def create_path(path):
     except FileExistsError:
         print(f"Directory '{path}' already exists.")
 
-def convert_folder_video_to_wav(folder_path):
+def _file_sha256(path, chunk_size=1 << 20):
+    """Calcula o SHA-256 de um arquivo lendo em blocos."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def prepare_audio(folder_path):
     """
-    Converte o arquivo de vídeo dentro de uma pasta para WAV.
-    
-    Procura por 'video.mp4' ou 'video.webm' dentro da pasta e cria 'audio.wav'.
-    
+    Prepara o áudio canônico do debate: 'audio.wav', PCM 16-bit, mono, 16 kHz.
+
+    Todos os consumidores (Whisper, pyannote, recortes de janela) usam este
+    arquivo. Ao lado dele fica 'audio.wav.json' com a impressão digital do
+    arquivo de origem (tamanho, mtime e SHA-256): a conversão só é refeita se
+    a origem mudar. Se tamanho e mtime batem, o hash nem é recalculado.
+
     Args:
         folder_path (str): Caminho da pasta que contém o vídeo.
-    
+
     Returns:
-        str: Caminho do arquivo WAV gerado.
+        str: Caminho do WAV canônico.
     """
     if not os.path.isdir(folder_path):
         raise NotADirectoryError(f"Pasta não encontrada: {folder_path}")
-    
-    # Checar se a pasta já contém o video em .wav
-    wav_path = folder_path+f'/{"video.wav"}'
-    if os.path.exists(wav_path):
-        return folder_path+f'/{"video.wav"}'
+
+    wav_file = os.path.join(folder_path, "audio.wav")
+    fingerprint_file = wav_file + ".json"
 
     # Procurar pelo arquivo de vídeo
     video_file = None
     for ext in ['.m4a', '.webm', '', '.mp4']:
-        candidate = folder_path+f'/{"video"+ext}'
-        if os.path.exists(candidate):
+        candidate = os.path.join(folder_path, "video" + ext)
+        if os.path.isfile(candidate):
             video_file = candidate
             break
-    
+
     if video_file is None:
+        # Áudio baixado direto em WAV (ver `download_audio_range`)
+        if os.path.exists(wav_file):
+            return wav_file
         raise FileNotFoundError("Não foi encontrado um arquivo 'video.mp4' ou 'video.webm' na pasta.")
-    
-    # Caminho de saída do WAV
-    wav_file = os.path.join(folder_path, "audio.wav")
-    
-    # Converter usando FFmpeg
+
+    stat = os.stat(video_file)
+    fingerprint = {
+        "source": os.path.basename(video_file),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+    }
+
+    # Checar se o WAV existente foi gerado a partir desta mesma origem
+    if os.path.exists(wav_file) and os.path.exists(fingerprint_file):
+        with open(fingerprint_file, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+
+        same_stat = all(cached.get(key) == value for key, value in fingerprint.items())
+        if same_stat:
+            return wav_file
+
+        fingerprint["sha256"] = _file_sha256(video_file)
+        if cached.get("sha256") == fingerprint["sha256"]:
+            # Apenas o mtime mudou (ex: arquivo copiado); o conteúdo é o mesmo
+            with open(fingerprint_file, "w", encoding="utf-8") as f:
+                json.dump(fingerprint, f)
+            return wav_file
+
+    # Converter usando FFmpeg (em arquivo temporário para não deixar WAV truncado)
+    tmp_file = os.path.join(folder_path, "audio.tmp.wav")
     cmd = [
         "ffmpeg",
         "-y",
@@ -271,19 +447,185 @@ def convert_folder_video_to_wav(folder_path):
         "-ac", "1",        # mono
         "-ar", "16000",    # 16kHz
         "-sample_fmt", "s16",  # 16-bit PCM
-        wav_file
+        tmp_file
     ]
     subprocess.run(cmd, check=True)
-    
+    os.replace(tmp_file, wav_file)
+
+    if "sha256" not in fingerprint:
+        fingerprint["sha256"] = _file_sha256(video_file)
+    with open(fingerprint_file, "w", encoding="utf-8") as f:
+        json.dump(fingerprint, f)
+
     return wav_file
 
-def transcribe_with_whisper(folder_path, model_size="small"):
+def convert_folder_video_to_wav(folder_path):
+    """
+    Converte o arquivo de vídeo dentro de uma pasta para WAV.
+
+    Mantida por compatibilidade; ver `prepare_audio`.
+
+    Args:
+        folder_path (str): Caminho da pasta que contém o vídeo.
+
+    Returns:
+        str: Caminho do arquivo WAV gerado.
+    """
+    return prepare_audio(folder_path)
+
+def window_audio_path(audio_path, start=0, end=None):
+    """Nome do arquivo que guarda a janela [start, end] de `audio_path`."""
+    if not start and end is None:
+        return audio_path
+
+    base, ext = os.path.splitext(audio_path)
+    end_label = int(end) if end is not None else "fim"
+    return f"{base}_{int(start)}_{end_label}{ext}"
+
+def crop_audio(audio_path, start=0, end=None):
+    """
+    Recorta um arquivo WAV para a janela [start, end].
+
+    O recorte é salvo ao lado do original (ex: 'audio_1200_9000.wav') e
+    reaproveitado enquanto for mais recente que o arquivo de origem, de modo
+    que transcrição e diarização usem o mesmo recorte.
+
+    Args:
+        audio_path (str): Caminho do WAV de origem.
+        start (float): Início da janela em segundos.
+        end (float, optional): Fim da janela em segundos. None vai até o fim do áudio.
+
+    Returns:
+        str: Caminho do WAV recortado (ou o original, se a janela for o áudio inteiro).
+    """
+    cropped_path = window_audio_path(audio_path, start, end)
+    if cropped_path == audio_path:
+        return audio_path
+
+    if os.path.exists(cropped_path) and os.path.getmtime(cropped_path) >= os.path.getmtime(audio_path):
+        return cropped_path
+
+    cmd = ["ffmpeg", "-y", "-i", audio_path, "-ss", str(start)]
+    if end is not None:
+        cmd += ["-to", str(end)]
+    cmd += ["-c", "copy", cropped_path]
+    subprocess.run(cmd, check=True)
+
+    return cropped_path
+
+def prepare_window_audio(folder_path, start=0, end=None):
+    """
+    Retorna o WAV da janela [start, end] da pasta do debate.
+
+    Usa o recorte já existente quando o áudio foi baixado direto na janela
+    (`download_audio_range`); caso contrário converte o vídeo e recorta.
+    """
+    wav_path = os.path.join(folder_path, "audio.wav")
+    window_path = window_audio_path(wav_path, start, end)
+    if os.path.exists(window_path) and not os.path.exists(wav_path):
+        return window_path
+
+    return crop_audio(prepare_audio(folder_path), start, end)
+
+def load_pcm(wav_path):
+    """
+    Decodifica um WAV PCM 16-bit mono para um array int16 em disco (.npy)
+    e o abre como memmap somente leitura.
+
+    O .npy fica ao lado do WAV e só é refeito se o WAV for mais recente.
+    Whisper, pyannote e os workers de transcrição leem as amostras daqui,
+    sem decodificar o arquivo de novo; fatias do memmap não copiam dados.
+
+    Args:
+        wav_path (str): Caminho do WAV (ver `prepare_audio`).
+
+    Returns:
+        np.memmap: Amostras int16 a `whisper.audio.SAMPLE_RATE` Hz.
+    """
+    npy_path = os.path.splitext(wav_path)[0] + ".npy"
+
+    if not os.path.exists(npy_path) or os.path.getmtime(npy_path) < os.path.getmtime(wav_path):
+        tmp_path = npy_path + ".tmp"
+        with wave.open(wav_path, "rb") as wav:
+            if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                raise ValueError(f"Esperado PCM 16-bit mono: {wav_path}")
+            if wav.getframerate() != whisper.audio.SAMPLE_RATE:
+                raise ValueError(f"Esperado {whisper.audio.SAMPLE_RATE} Hz: {wav_path}")
+
+            n_frames = wav.getnframes()
+            buffer = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.int16, shape=(n_frames,))
+            position = 0
+            while position < n_frames:
+                frames = np.frombuffer(wav.readframes(1 << 20), dtype="<i2")
+                if len(frames) == 0:
+                    break
+                buffer[position:position + len(frames)] = frames
+                position += len(frames)
+            buffer.flush()
+            del buffer
+        os.replace(tmp_path, npy_path)
+
+    return np.load(npy_path, mmap_mode="r")
+
+# Amostras convertidas por vez em `pcm_to_float` (~10 min a 16 kHz)
+PCM_CONVERT_BLOCK = 1 << 23
+
+def pcm_to_float(samples):
+    """
+    Converte amostras int16 para float32 em [-1, 1], formato esperado por
+    Whisper e pyannote.
+
+    A conversão é feita em blocos direto no array de saída, então o pico de
+    memória é uma única cópia float32 (sem o intermediário de
+    `astype` + divisão) e as páginas do memmap são lidas sob demanda.
+    """
+    out = np.empty(len(samples), dtype=np.float32)
+    for first in range(0, len(samples), PCM_CONVERT_BLOCK):
+        block = out[first:first + PCM_CONVERT_BLOCK]
+        block[:] = samples[first:first + PCM_CONVERT_BLOCK]
+        block *= 1 / 32768.0
+    return out
+
+def pyannote_input(wav_path):
+    """
+    Monta a entrada em memória do pipeline pyannote a partir do memmap do WAV.
+
+    O pyannote recebe o debate inteiro numa única chamada, então aqui a forma
+    de onda float32 completa é inevitável; para limitar a memória pelo tamanho
+    da janela, use a diarização em janelas (`diarize_in_windows`).
+    """
+    samples = pcm_to_float(load_pcm(wav_path))
+    return {
+        "waveform": torch.from_numpy(samples).unsqueeze(0),
+        "sample_rate": whisper.audio.SAMPLE_RATE,
+    }
+
+def _segments_from_result(result, offset):
+    """Extrai os segmentos de um resultado do Whisper deslocando os timestamps."""
+    return [
+        {
+            "start": seg["start"] + offset,
+            "end": seg["end"] + offset,
+            "text": seg["text"],
+        }
+        for seg in result.get("segments", [])
+    ]
+
+def transcribe_with_whisper(folder_path, model_size="small", start=0, end=None):
     """
     Converte vídeo da pasta para WAV e faz a transcrição usando Whisper small.
     Retorna uma lista de segmentos com start, end e texto.
+
+    Se `start`/`end` forem informados, apenas a janela [start, end] é
+    transcrita e os timestamps retornados continuam absolutos.
+
+    A transcrição é feita numa única passada, com o contexto do Whisper
+    contínuo por todo o áudio; a conversão para float32 é feita em blocos
+    (ver `pcm_to_float`), sem cópia intermediária do áudio inteiro.
     """
     # Converter vídeo para WAV
-    audio_path = convert_folder_video_to_wav(folder_path)
+    audio_path = prepare_window_audio(folder_path, start, end)
+    audio = pcm_to_float(load_pcm(audio_path))
     
     # Carregar modelo Whisper
     print(f"Carregando modelo Whisper ({model_size})...")
@@ -291,21 +633,153 @@ def transcribe_with_whisper(folder_path, model_size="small"):
     
     # Fazer a transcrição
     print("Iniciando transcrição...")
-    result = model.transcribe(audio_path, language="pt", word_timestamps=False, verbose=True)
+    result = model.transcribe(audio, language="pt", word_timestamps=False, verbose=True)
     
     # result["segments"] contém a lista de segmentos com timestamps
-    segments = []
-    if "segments" in result:
-        for seg in result["segments"]:
-            segments.append({
-                "start": seg["start"],
-                "end": seg["end"],
-                "text": seg["text"]
-            })
+    segments = _segments_from_result(result, start)
     
     print("Transcrição completa!")
     return segments
 
+# Estado dos processos de transcrição paralela (um modelo por processo)
+_worker_model = None
+
+def _init_transcription_worker(model_size):
+    global _worker_model
+    _worker_model = whisper.load_model(model_size)
+
+def _transcribe_chunk(npy_path, first_sample, last_sample, offset):
+    """Transcreve uma fatia do memmap dentro de um processo worker."""
+    audio = np.load(npy_path, mmap_mode="r")
+    chunk = pcm_to_float(audio[first_sample:last_sample])
+    result = _worker_model.transcribe(chunk, language="pt", word_timestamps=False, verbose=False)
+    return _segments_from_result(result, offset)
+
+def iter_transcribe_with_whisper(
+    folder_path,
+    model_size="small",
+    chunk_length=600,
+    partial_path=None,
+    start=0,
+    end=None,
+    workers=1,
+):
+    """
+    Versão incremental de `transcribe_with_whisper`.
+
+    O áudio é transcrito em blocos de `chunk_length` segundos e cada segmento
+    é devolvido assim que o bloco termina, já com o timestamp absoluto.
+    Se `partial_path` for informado, os segmentos são gravados em JSON Lines
+    conforme são produzidos, e uma execução interrompida retoma a partir do
+    último bloco concluído.
+
+    Args:
+        folder_path (str): Caminho da pasta que contém o vídeo.
+        model_size (str): Tamanho do modelo Whisper.
+        chunk_length (int): Duração de cada bloco em segundos.
+        partial_path (str, optional): Arquivo .jsonl com o progresso parcial.
+        start (float): Início da janela a transcrever, em segundos.
+        end (float, optional): Fim da janela a transcrever, em segundos.
+        workers (int): Número de processos de transcrição. Com mais de um,
+                       cada processo lê seus blocos direto do memmap do áudio;
+                       os segmentos continuam saindo em ordem.
+
+    Yields:
+        dict: Segmento com 'start', 'end' e 'text'.
+    """
+    audio_path = prepare_window_audio(folder_path, start, end)
+    audio = load_pcm(audio_path)
+    sample_rate = whisper.audio.SAMPLE_RATE
+
+    # Retomar progresso de uma execução anterior (timestamps relativos ao recorte)
+    resume_from = 0.0
+    if partial_path and os.path.exists(partial_path):
+        # Só valem os segmentos seguidos de um marcador `chunk_end`: o que vem
+        # depois do último marcador é de um bloco interrompido, que será
+        # transcrito de novo, então é descartado (inclusive do arquivo).
+        completed = []
+        pending = []
+        valid_bytes = 0
+        with open(partial_path, "rb") as f:
+            position = 0
+            for line in f:
+                position += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # linha cortada no meio da escrita
+                if "chunk_end" in record:
+                    resume_from = record["chunk_end"] - start
+                    completed.extend(pending)
+                    pending = []
+                    valid_bytes = position
+                else:
+                    pending.append(record)
+        if os.path.getsize(partial_path) > valid_bytes:
+            with open(partial_path, "r+b") as f:
+                f.truncate(valid_bytes)
+        for record in completed:
+            yield record
+        print(f"Retomando transcrição a partir de {resume_from + start:.0f}s")
+
+    duration = len(audio) / sample_rate
+    chunks = []
+    chunk_start = resume_from
+    while chunk_start < duration:
+        chunk_end = min(chunk_start + chunk_length, duration)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end
+
+    print(f"Carregando modelo Whisper ({model_size})...")
+    if workers > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_transcription_worker,
+            initargs=(model_size,),
+        )
+        npy_path = os.path.splitext(audio_path)[0] + ".npy"
+        results = executor.map(
+            _transcribe_chunk,
+            [npy_path] * len(chunks),
+            [int(chunk_start * sample_rate) for chunk_start, _ in chunks],
+            [int(chunk_end * sample_rate) for _, chunk_end in chunks],
+            [chunk_start + start for chunk_start, _ in chunks],
+        )
+    else:
+        executor = None
+        model = whisper.load_model(model_size)
+        results = (
+            _segments_from_result(
+                model.transcribe(
+                    pcm_to_float(audio[int(chunk_start * sample_rate):int(chunk_end * sample_rate)]),
+                    language="pt",
+                    word_timestamps=False,
+                    verbose=False,
+                ),
+                chunk_start + start,
+            )
+            for chunk_start, chunk_end in chunks
+        )
+
+    try:
+        for (chunk_start, chunk_end), segments in zip(chunks, results):
+            if partial_path:
+                with open(partial_path, "a", encoding="utf-8") as f:
+                    for seg in segments:
+                        f.write(json.dumps(seg, ensure_ascii=False) + "\n")
+                    f.write(json.dumps({"chunk_end": chunk_end + start}) + "\n")
+
+            for seg in segments:
+                yield seg
+
+            print(f"Transcrição: {chunk_end + start:.0f}s / {duration + start:.0f}s")
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    print("Transcrição completa!")
+
 def normalize_scores(scores):
     return[
         (float(i) - min(scores))/
@@ -115,6 +115,31 @@ proposal_template = ChatPromptTemplate.from_messages([
 ])
 
 
+# Análise combinada de falas: propostas, resumo e rótulos retóricos
+speech_analysis_system = """### Contexto
+Você é um analista de debates eleitorais. Para cada fala recebida, faça três tarefas de uma só vez.
+
+### Instruções
+1. Você receberá uma ou mais falas, cada uma precedida do seu índice no formato [índice]
+2. Para cada fala, retorne usando o mesmo índice:
+    - **propostas**: lista com as propostas feitas na fala. Se não houver propostas, lista vazia
+    - **resumo**: uma frase expressando apenas a intenção principal da fala
+    - **rotulos**: uma pontuação de 0.0 a 1.0 para cada um dos rótulos abaixo, indicando o quanto a fala se encaixa nele (mais de um rótulo pode se aplicar)
+3. Analise cada fala de forma independente
+
+### Rótulos
+{labels}
+
+### Exemplo de Propostas
+["Inclusão de crianças na educação", "Entrega de moradias"]"""
+
+speech_analysis_user = "{speeches}"
+
+speech_analysis_template = ChatPromptTemplate.from_messages([
+    SystemMessagePromptTemplate.from_template(speech_analysis_system),
+    HumanMessagePromptTemplate.from_template(speech_analysis_user)
+])
+
 # Configuração do LLM (System Prompt)
 coherence_system = """
 ### Contexto
@@ -131,9 +156,14 @@ Você é um analista de debates eleitorais. Seu objetivo é identificar falas qu
 A resposta abaixo indica que as falas de índices 1, 2, 3 e 4 fazem parte do mesmo contexto, enquanto as falas de índices 10, 11 e 13 fazem parte de outro contexto.
 [(1, 2, 3, 4), (10, 11, 13)]"""
 
-# Template do Usuário para injeção de dados
+# Template do Usuário para injeção de dados.
+# As falas vêm antes da âncora: chamadas com o mesmo início de janela
+# compartilham o prefixo e aproveitam o cache de prompt do provedor.
 coherence_user = """### Falas
-{context_speeches}"""
+{context_speeches}
+
+### Fala Âncora
+[{anchor_index}]"""
 
 coherence_template = ChatPromptTemplate.from_messages([
     SystemMessagePromptTemplate.from_template(coherence_system),
@@ -174,6 +204,22 @@ relevance_template = ChatPromptTemplate.from_messages([
 ])
 
 
+# Avaliação de relevância de vários pares por chamada
+relevance_batch_system = relevance_system + """
+### Vários Pares
+Você receberá vários pares, cada um identificado pelo índice da Resposta no formato [índice].
+Avalie cada par de forma independente e retorne uma avaliação para cada índice, usando o mesmo índice em `response_index`.
+"""
+
+relevance_batch_user = """### PARES DE ANÁLISE
+{pairs}"""
+
+relevance_batch_template = ChatPromptTemplate.from_messages([
+    SystemMessagePromptTemplate.from_template(relevance_batch_system),
+    HumanMessagePromptTemplate.from_template(relevance_batch_user)
+])
+
+
 qa_system = """### Contexto
 Você é um analista de debates eleitorais. Seu objetivo é identificar o tópico da discussão e relacionar **apenas** as respostas de candidatos às perguntas às quais **eles foram explicitamente direcionados**.
 
@@ -274,6 +320,21 @@ s_summary_template = ChatPromptTemplate.from_messages([
 ])
 
 
+# Resumo de várias falas por chamada
+s_summary_batch_system = s_summary_system + """
+
+### Várias Falas
+Você receberá várias falas, cada uma precedida do seu índice no formato [índice].
+Resuma cada fala de forma independente e retorne um resumo para cada índice, usando o mesmo índice."""
+
+s_summary_batch_user = "{speeches}"
+
+s_summary_batch_template = ChatPromptTemplate.from_messages([
+    SystemMessagePromptTemplate.from_template(s_summary_batch_system),
+    HumanMessagePromptTemplate.from_template(s_summary_batch_user)
+])
+
+
 q_summary_system = """### Contexto
 Você é um analista de debates eleitorais. Seu objetivo é resumir qual foi a pergunta feita em uma fala.
 
@@ -289,7 +350,9 @@ Use as falas da discussão como contexto para entender melhor a pergunta. Mas su
 Como você pretende melhorar a segurança pública na cidade?
 """
 
-# Template do Usuário para injeção de dados
+# Template do Usuário para injeção de dados.
+# A discussão (compartilhada por todas as perguntas dela) vem antes da pergunta
+# para formar um prefixo estável, aproveitado pelo cache de prompt do provedor.
 q_summary_user = """### Discussão
 {context_speeches}
 
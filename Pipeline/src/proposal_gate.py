@@ -0,0 +1,73 @@
+# Utils
+import re
+
+# Processamento de dados
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+from src.sample_selection import normalize_text
+
+# ================================
+# Constants
+# ================================
+MIN_PROPOSAL_WORDS = 25  # falas mais curtas raramente contêm propostas
+PROPOSITIVA_THRESHOLD = 0.5  # score "Propositiva" de `classify_phrases`, se disponível
+
+# Verbos e expressões típicos de propostas (texto normalizado, sem acentos).
+# Palavras comuns em qualquer fala ("vou", "vamos", "fazer", "plano",
+# "programa", "garantir"...) ficam de fora: com elas, quase toda fala longa
+# passaria e o filtro seria só o limite de palavras.
+PROPOSAL_PATTERN = re.compile(
+    r"\b(?:"
+    r"pretendo|pretendemos|proponho|propomos|propost[ao]s?|compromisso|"
+    r"vou (?:criar|construir|implantar|implementar|ampliar|investir|contratar|reformar)|"
+    r"vamos (?:criar|construir|implantar|implementar|ampliar|investir|contratar|reformar)|"
+    r"criaremos|construiremos|implantaremos|implementaremos|ampliaremos|investiremos|"
+    r"contrataremos|reformaremos|iremos|irei|"
+    r"meu governo|minha gestao|nossa gestao|nosso governo"
+    r")\b"
+)
+
+def could_contain_proposal(text: Optional[str], min_words: int = MIN_PROPOSAL_WORDS) -> bool:
+    """
+    Heurística barata: a fala pode conter uma proposta?
+
+    Falas curtas (transições do mediador, cumprimentos, réplicas rápidas)
+    e falas sem nenhum verbo ou expressão de proposta são descartadas.
+    """
+    if not isinstance(text, str) or not text.strip():
+        return False
+    text = normalize_text(text)
+    return len(text.split()) >= min_words and PROPOSAL_PATTERN.search(text) is not None
+
+
+def proposal_gate(
+    speeches: pd.DataFrame, min_words: int = MIN_PROPOSAL_WORDS
+) -> pd.Series:
+    """
+    Decide quais falas devem ser enviadas à LLM de propostas.
+
+    Combina `could_contain_proposal` com o score "Propositiva" do
+    classificador zero-shot, quando `classify_phrases` já rodou: uma fala
+    passa se qualquer um dos dois a considerar plausível.
+
+    Args:
+        speeches: DataFrame com a coluna 'Text' (e opcionalmente 'Propositiva').
+        min_words: Tamanho mínimo, em palavras, de uma fala plausível.
+
+    Returns:
+        Série booleana alinhada a `speeches`.
+    """
+    passes = speeches["Text"].apply(could_contain_proposal, min_words=min_words)
+    if "Propositiva" in speeches.columns:
+        passes |= speeches["Propositiva"].fillna(0) >= PROPOSITIVA_THRESHOLD
+    return passes.astype(bool)
+
+
+def audit_sample(skipped: pd.Index, rate: float, seed: int = 0) -> pd.Index:
+    """Sorteia (de forma reprodutível) a fração `rate` das falas puladas para auditoria."""
+    if rate <= 0 or len(skipped) == 0:
+        return skipped[:0]
+    rng = np.random.default_rng(seed)
+    return skipped[rng.random(len(skipped)) < rate]
@@ -0,0 +1,152 @@
+# Utils
+import re
+import unicodedata
+
+# Processamento de dados
+from typing import List, Optional, Dict, Iterable, Tuple
+import numpy as np
+import pandas as pd
+
+# Ambiente
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ================================
+# Constants
+# ================================
+DEFAULT_SAMPLE_CHUNK_LENGTH = 120  # seconds
+CHUNK_SEPARATOR = "\n[...]\n"
+
+# Expressões que costumam aparecer quando alguém se apresenta ou é chamado
+# pelo nome. Os pesos favorecem apresentações explícitas.
+KEYWORD_WEIGHTS: List[Tuple[str, float]] = [
+    (r"\beu sou\b", 3.0),
+    (r"\bmeu nome e\b", 3.0),
+    (r"\bme chamo\b", 3.0),
+    (r"\bcandidat[oa]s?\b", 2.0),
+    (r"\bcom a palavra\b", 2.0),
+    (r"\bpergunta (?:para|ao|a)\b", 2.0),
+    (r"\b(?:tem|voce tem) (?:um|dois|tres|\d+) minutos?\b", 1.5),
+    (r"\bpartido\b", 1.0),
+    (r"\bnumero\b", 1.0),
+    (r"\bprefeit[oa]\b", 1.0),
+    (r"\bgovernador[a]?\b", 1.0),
+    (r"\bsenador[a]?\b", 1.0),
+    (r"\bdeputad[oa]\b", 1.0),
+    (r"\bvereador[a]?\b", 1.0),
+    (r"\bboa noite\b", 0.5),
+    (r"\bobrigad[oa]\b", 0.5),
+]
+NAME_WEIGHT = 4.0
+MIN_NAME_TOKEN_LENGTH = 4
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas e sem acentos, para comparação por palavras-chave."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def split_sample_chunks(
+    transcript: pd.DataFrame, chunk_length: float = DEFAULT_SAMPLE_CHUNK_LENGTH
+) -> List[str]:
+    """
+    Agrupa os segmentos do transcript em trechos de duração fixa.
+
+    Args:
+        transcript: Segmentos com 'start' e 'text', em ordem.
+        chunk_length: Duração de cada trecho em segundos.
+
+    Returns:
+        Lista com o texto de cada trecho, em ordem cronológica.
+    """
+    if transcript.empty:
+        return []
+
+    chunk_ids = ((transcript["start"] - transcript["start"].iloc[0]) // chunk_length).astype(int)
+    return [
+        " ".join(group["text"].str.strip())
+        for _, group in transcript.groupby(chunk_ids, sort=True)
+    ]
+
+
+def _name_tokens(names: Iterable[str]) -> List[str]:
+    tokens = set()
+    for name in names:
+        for token in normalize_text(str(name)).split():
+            if len(token) >= MIN_NAME_TOKEN_LENGTH:
+                tokens.add(token)
+    return sorted(tokens)
+
+
+def score_chunks(chunks: List[str], names: Optional[Iterable[str]] = None) -> np.ndarray:
+    """
+    Pontua os trechos pela chance de permitirem identificar os participantes.
+
+    Soma ponderada de ocorrências de expressões de apresentação ("eu sou",
+    "candidato", "com a palavra"...) e de partes dos nomes dos candidatos.
+
+    Args:
+        chunks: Textos dos trechos.
+        names: Nomes dos candidatos válidos, se já conhecidos.
+
+    Returns:
+        Array com a pontuação de cada trecho.
+    """
+    patterns = [(re.compile(pattern), weight) for pattern, weight in KEYWORD_WEIGHTS]
+    name_patterns = [
+        re.compile(rf"\b{re.escape(token)}\b") for token in _name_tokens(names or [])
+    ]
+
+    scores = np.zeros(len(chunks))
+    for i, chunk in enumerate(chunks):
+        text = normalize_text(chunk)
+        scores[i] = sum(weight * len(pattern.findall(text)) for pattern, weight in patterns)
+        scores[i] += NAME_WEIGHT * sum(len(pattern.findall(text)) for pattern in name_patterns)
+    return scores
+
+
+def select_sample_chunks(
+    chunks: List[str],
+    top_k: int,
+    names: Optional[Iterable[str]] = None,
+    checker_votes: Optional[Dict[int, bool]] = None,
+) -> List[int]:
+    """
+    Escolhe os trechos enviados à LLM de identificação.
+
+    O primeiro trecho (abertura, onde o mediador costuma apresentar o debate
+    e os candidatos) é sempre mantido. Os demais são os `top_k - 1` de maior
+    pontuação; trechos aprovados pelo verificador (`checker_votes`) têm
+    prioridade sobre os reprovados.
+
+    Args:
+        chunks: Textos dos trechos.
+        top_k: Quantidade máxima de trechos.
+        names: Nomes dos candidatos válidos, se já conhecidos.
+        checker_votes: Índice do trecho -> resposta do verificador.
+
+    Returns:
+        Índices dos trechos escolhidos, em ordem cronológica.
+    """
+    if len(chunks) <= top_k:
+        return list(range(len(chunks)))
+
+    scores = score_chunks(chunks, names)
+    if checker_votes:
+        # Uma aprovação vale mais que qualquer pontuação heurística
+        approved = [i for i, vote in checker_votes.items() if vote]
+        scores[approved] += scores.max() + 1
+
+    ranked = [int(i) for i in np.argsort(-scores, kind="stable") if i != 0]
+    return sorted([0] + ranked[: top_k - 1])
+
+
+def join_chunks(chunks: List[str], indices: List[int]) -> str:
+    """Concatena os trechos escolhidos, marcando os cortes entre trechos não contíguos."""
+    text = chunks[indices[0]] if indices else ""
+    for previous, current in zip(indices, indices[1:]):
+        separator = " " if current == previous + 1 else CHUNK_SEPARATOR
+        text += separator + chunks[current]
+    return text
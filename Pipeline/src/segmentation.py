@@ -0,0 +1,199 @@
+# Processamento de dados
+from typing import List, Tuple
+import numpy as np
+
+# Ambiente
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ================================
+# Constants
+# ================================
+DEFAULT_BLOCK_SIZE = 2  # falas de cada lado de uma fronteira
+DEFAULT_BOUNDARY_CUTOFF = 1.0  # desvios-padrão acima da média da profundidade
+DEFAULT_AMBIGUOUS_CUTOFF = 0.0
+DEFAULT_MAX_REGION_SIZE = 12  # falas por chamada de coerência
+
+# Classes das fronteiras entre falas consecutivas
+CONTINUATION = 0
+AMBIGUOUS = 1
+BOUNDARY = 2
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def gap_similarities(embeddings: np.ndarray, block_size: int = DEFAULT_BLOCK_SIZE) -> np.ndarray:
+    """
+    Similaridade entre os blocos de falas antes e depois de cada fronteira.
+
+    Para a fronteira i (entre as falas i e i + 1) compara a média das
+    `block_size` falas que terminam em i com a média das `block_size` falas
+    que começam em i + 1, como no TextTiling.
+
+    Args:
+        embeddings: Matriz (n_falas, dim), em ordem cronológica.
+        block_size: Quantidade de falas de cada lado da fronteira.
+
+    Returns:
+        Array com n_falas - 1 similaridades de cosseno.
+    """
+    n = len(embeddings)
+    if n < 2:
+        return np.zeros(0)
+
+    embeddings = _normalize(np.asarray(embeddings, dtype=np.float32))
+    # Somas acumuladas permitem a média de qualquer bloco em O(1)
+    cumsum = np.vstack([np.zeros((1, embeddings.shape[1])), np.cumsum(embeddings, axis=0)])
+
+    gaps = np.arange(n - 1)
+    left_start = np.maximum(gaps + 1 - block_size, 0)
+    right_end = np.minimum(gaps + 1 + block_size, n)
+    left = cumsum[gaps + 1] - cumsum[left_start]
+    right = cumsum[right_end] - cumsum[gaps + 1]
+
+    return np.sum(_normalize(left) * _normalize(right), axis=1)
+
+
+def depth_scores(similarities: np.ndarray) -> np.ndarray:
+    """
+    Profundidade de cada vale na curva de similaridades (TextTiling).
+
+    A profundidade de uma fronteira é a soma das subidas até o pico mais
+    alto à esquerda e à direita, subindo enquanto a similaridade cresce.
+    """
+    n = len(similarities)
+    depths = np.zeros(n)
+    for i in range(n):
+        left = i
+        while left > 0 and similarities[left - 1] >= similarities[left]:
+            left -= 1
+        right = i
+        while right < n - 1 and similarities[right + 1] >= similarities[right]:
+            right += 1
+        depths[i] = (similarities[left] - similarities[i]) + (similarities[right] - similarities[i])
+    return depths
+
+
+def classify_gaps(
+    depths: np.ndarray,
+    boundary_cutoff: float = DEFAULT_BOUNDARY_CUTOFF,
+    ambiguous_cutoff: float = DEFAULT_AMBIGUOUS_CUTOFF,
+) -> np.ndarray:
+    """
+    Classifica as fronteiras em continuação, ambígua ou mudança de assunto.
+
+    Os limiares são relativos à distribuição das profundidades do próprio
+    debate: `média + cutoff * desvio-padrão`.
+
+    Returns:
+        Array com `CONTINUATION`, `AMBIGUOUS` ou `BOUNDARY` para cada fronteira.
+    """
+    classes = np.full(len(depths), CONTINUATION, dtype=int)
+    # Sem variação não há vale a considerar
+    if len(depths) == 0 or depths.std() == 0:
+        return classes
+
+    mean, std = depths.mean(), depths.std()
+    classes[depths > mean + ambiguous_cutoff * std] = AMBIGUOUS
+    classes[depths > mean + boundary_cutoff * std] = BOUNDARY
+    return classes
+
+
+def segments_from_gaps(n: int, split: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Converte as fronteiras marcadas em `split` em segmentos de falas.
+
+    Args:
+        n: Quantidade de falas.
+        split: Array booleano com n - 1 posições (True = corta após a fala i).
+
+    Returns:
+        Lista de (início, fim) posicionais, com `fim` exclusivo.
+    """
+    cuts = np.flatnonzero(split) + 1
+    starts = np.concatenate([[0], cuts])
+    ends = np.concatenate([cuts, [n]])
+    return [(int(s), int(e)) for s, e in zip(starts, ends) if e > s]
+
+
+def ambiguous_regions(
+    segments: List[Tuple[int, int]],
+    classes: np.ndarray,
+    max_region_size: int = DEFAULT_MAX_REGION_SIZE,
+) -> List[Tuple[int, int, int]]:
+    """
+    Janelas a enviar à LLM: uma por fronteira ambígua.
+
+    Cada janela cobre os segmentos vizinhos à fronteira, limitada a
+    `max_region_size // 2` falas de cada lado, e tem como âncora a primeira
+    fala depois da fronteira.
+
+    Args:
+        segments: Segmentos separados pelas fronteiras ambíguas e de mudança.
+        classes: Classe de cada fronteira (ver `classify_gaps`).
+        max_region_size: Tamanho máximo de uma janela.
+
+    Returns:
+        Lista de (início, fim, âncora) posicionais, com `fim` exclusivo.
+    """
+    half = max(max_region_size // 2, 1)
+    segment_of_start = {start: i for i, (start, _) in enumerate(segments)}
+
+    regions = []
+    for gap in np.flatnonzero(classes == AMBIGUOUS):
+        anchor = int(gap) + 1
+        right_segment = segment_of_start[anchor]
+        left_start = segments[right_segment - 1][0]
+        right_end = segments[right_segment][1]
+        regions.append((max(left_start, anchor - half), min(right_end, anchor + half), anchor))
+    return regions
+
+
+def _find(parent: np.ndarray, i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]  # compressão por halving
+        i = parent[i]
+    return i
+
+
+def discussion_labels(n: int, groups: List[List[int]]) -> np.ndarray:
+    """
+    Componentes conexas das falas ligadas pelos grupos (union-find).
+
+    Cada grupo é ligado em cadeia (k - 1 uniões em vez de k² arestas).
+
+    Args:
+        n: Quantidade de falas.
+        groups: Grupos de posições (0..n-1) que pertencem ao mesmo contexto.
+
+    Returns:
+        Array com o ID (1..k) da discussão de cada fala, numerado pela ordem
+        de primeira aparição, ou 0 para falas que ficaram sozinhas.
+    """
+    parent = np.arange(n)
+    for group in groups:
+        for a, b in zip(group, group[1:]):
+            root_a, root_b = _find(parent, a), _find(parent, b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    # Achata a floresta: cada posição aponta direto para a raiz
+    while True:
+        grandparent = parent[parent]
+        if np.array_equal(grandparent, parent):
+            break
+        parent = grandparent
+
+    sizes = np.bincount(parent, minlength=n)
+    grouped = sizes[parent] > 1
+
+    # A raiz é sempre a menor posição do componente, então a ordem das raízes
+    # é a ordem de primeira aparição
+    roots = np.unique(parent[grouped])
+    ids = np.zeros(n, dtype=int)
+    ids[grouped] = np.searchsorted(roots, parent[grouped]) + 1
+    return ids
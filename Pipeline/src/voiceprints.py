@@ -0,0 +1,305 @@
+# Utils
+import os
+import pickle
+
+# AI
+from pyannote.audio import Model, Inference
+import torch
+
+# Processamento de dados
+from typing import List, Optional, Dict, Iterable
+import numpy as np
+import pandas as pd
+
+from src.my_utils import load_pcm, pcm_to_float, prepare_audio
+
+# Ambiente
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ================================
+# Constants
+# ================================
+VOICEPRINTS_PATH = "./data/voiceprints.pkl"
+LABELED_DIARIZATION_FILENAME = "df_dia_labeled.pkl"
+EMBEDDING_MODEL = "pyannote/wespeaker-voxceleb-resnet34-LM"  # mesmo modelo do speaker-diarization-3.1
+DEFAULT_MATCH_THRESHOLD = 0.7  # similaridade de cosseno mínima
+DEFAULT_MATCH_MARGIN = 0.1  # diferença mínima para o segundo colocado
+MIN_SEGMENT_DURATION = 2.0  # seconds
+MAX_SEGMENTS_PER_SPEAKER = 10
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def load_embedding_inference(device: Optional[str] = None) -> Inference:
+    """Carrega o modelo de embeddings de voz do pyannote para trechos inteiros."""
+    model = Model.from_pretrained(EMBEDDING_MODEL, use_auth_token=os.getenv("HF_API_KEY"))
+    inference = Inference(model, window="whole")
+    inference.to(torch.device(device or ("cuda" if torch.cuda.is_available() else "cpu")))
+    return inference
+
+
+def speaker_embeddings(
+    df_dia: pd.DataFrame,
+    audio: np.ndarray,
+    sample_rate: int,
+    inference: Inference,
+    offset: float = 0,
+    max_segments: int = MAX_SEGMENTS_PER_SPEAKER,
+) -> Dict[str, np.ndarray]:
+    """
+    Calcula um embedding de voz por `Speaker_ID`.
+
+    Usa os `max_segments` segmentos mais longos de cada falante (com pelo
+    menos `MIN_SEGMENT_DURATION` segundos) e tira a média dos embeddings.
+
+    Args:
+        df_dia: Diarização com 'Speaker_ID', 'Diarizacao_Start' e 'Diarizacao_End'.
+        audio: Amostras int16 (ver `load_pcm`).
+        sample_rate: Taxa de amostragem do áudio.
+        inference: Modelo de embeddings (ver `load_embedding_inference`).
+        offset: Tempo do vídeo, em segundos, correspondente à primeira amostra de `audio`.
+        max_segments: Máximo de segmentos usados por falante.
+
+    Returns:
+        Dicionário Speaker_ID -> embedding normalizado.
+    """
+    durations = df_dia["Diarizacao_End"] - df_dia["Diarizacao_Start"]
+    candidates = df_dia.loc[durations >= MIN_SEGMENT_DURATION].assign(Duration=durations)
+
+    embeddings = {}
+    for speaker_id, group in candidates.groupby("Speaker_ID"):
+        vectors = []
+        for _, row in group.nlargest(max_segments, "Duration").iterrows():
+            first = max(int((row["Diarizacao_Start"] - offset) * sample_rate), 0)
+            last = min(int((row["Diarizacao_End"] - offset) * sample_rate), len(audio))
+            if last <= first:
+                continue
+            waveform = torch.from_numpy(pcm_to_float(audio[first:last])).unsqueeze(0)
+            vectors.append(inference({"waveform": waveform, "sample_rate": sample_rate}))
+
+        if vectors:
+            embeddings[speaker_id] = _normalize(np.mean(_normalize(np.vstack(vectors)), axis=0))
+
+    return embeddings
+
+
+class VoiceprintIndex:
+    """
+    Índice persistente de impressões de voz dos candidatos.
+
+    Guarda um embedding centroide por `titulo_eleitoral`, atualizado a cada
+    debate já rotulado, e permite identificar os `Speaker_ID`s de um debate
+    novo por busca de cosseno, sem chamar a LLM. Os `video_id`s já somados
+    ficam registrados, para que o mesmo debate não entre duas vezes na média.
+    """
+
+    def __init__(self, path: str = VOICEPRINTS_PATH) -> None:
+        self.path = path
+        self.titulos: List[str] = []
+        self.nomes: List[str] = []
+        self.counts: List[int] = []
+        self.centroids: Optional[np.ndarray] = None
+        self.video_ids: List[str] = []
+
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+            self.titulos = data["titulos"]
+            self.nomes = data["nomes"]
+            self.counts = data["counts"]
+            self.centroids = data["centroids"]
+            self.video_ids = data.get("video_ids", [])
+
+    def __len__(self) -> int:
+        return len(self.titulos)
+
+    def save(self) -> None:
+        with open(self.path, "wb") as f:
+            pickle.dump(
+                {
+                    "titulos": self.titulos,
+                    "nomes": self.nomes,
+                    "counts": self.counts,
+                    "centroids": self.centroids,
+                    "video_ids": self.video_ids,
+                },
+                f,
+            )
+
+    def add(self, titulo: str, nome: str, embedding: np.ndarray) -> None:
+        """Atualiza (média acumulada) ou cria a impressão de voz de um candidato."""
+        titulo = str(titulo)
+        embedding = _normalize(np.asarray(embedding, dtype=np.float32))
+
+        if titulo in self.titulos:
+            i = self.titulos.index(titulo)
+            n = self.counts[i]
+            self.centroids[i] = _normalize((self.centroids[i] * n + embedding) / (n + 1))
+            self.counts[i] = n + 1
+            self.nomes[i] = nome
+        else:
+            self.titulos.append(titulo)
+            self.nomes.append(nome)
+            self.counts.append(1)
+            self.centroids = (
+                embedding[None, :]
+                if self.centroids is None
+                else np.vstack([self.centroids, embedding[None, :]])
+            )
+
+    def match(
+        self,
+        embeddings: Dict[str, np.ndarray],
+        titulos: Optional[Iterable[str]] = None,
+        threshold: float = DEFAULT_MATCH_THRESHOLD,
+        margin: float = DEFAULT_MATCH_MARGIN,
+    ) -> pd.DataFrame:
+        """
+        Associa cada `Speaker_ID` à impressão de voz mais parecida.
+
+        Args:
+            embeddings: Speaker_ID -> embedding do falante no debate.
+            titulos: Restringe a busca a estes títulos (candidatos do debate).
+            threshold: Similaridade mínima para considerar a associação confiável.
+            margin: Diferença mínima entre o melhor e o segundo melhor título.
+
+        Returns:
+            DataFrame com 'Speaker_ID', 'Titulo_Eleitoral', 'Candidato', 'Score',
+            'Margin' e 'Confident'. Cada título é atribuído a no máximo um
+            Speaker_ID (o de maior similaridade).
+        """
+        columns = ["Speaker_ID", "Titulo_Eleitoral", "Candidato", "Score", "Margin", "Confident"]
+        if not embeddings or self.centroids is None:
+            return pd.DataFrame(columns=columns)
+
+        rows = np.arange(len(self.titulos))
+        if titulos is not None:
+            allowed = {str(t) for t in titulos}
+            rows = np.array([i for i, t in enumerate(self.titulos) if t in allowed], dtype=int)
+            if len(rows) == 0:
+                return pd.DataFrame(columns=columns)
+
+        speaker_ids = list(embeddings)
+        queries = _normalize(np.vstack([embeddings[s] for s in speaker_ids]))
+        scores = queries @ self.centroids[rows].T  # (n_speakers, n_titulos)
+
+        order = np.argsort(-scores, axis=1)
+        best = order[:, 0]
+        best_scores = scores[np.arange(len(speaker_ids)), best]
+        if scores.shape[1] > 1:
+            second_scores = scores[np.arange(len(speaker_ids)), order[:, 1]]
+        else:
+            second_scores = np.full(len(speaker_ids), -1.0)
+
+        result = pd.DataFrame(
+            {
+                "Speaker_ID": speaker_ids,
+                "Titulo_Eleitoral": [self.titulos[rows[j]] for j in best],
+                "Candidato": [self.nomes[rows[j]] for j in best],
+                "Score": best_scores,
+                "Margin": best_scores - second_scores,
+            }
+        )
+        result["Confident"] = (result["Score"] >= threshold) & (result["Margin"] >= margin)
+
+        # Um título por falante: em caso de conflito fica o de maior similaridade
+        duplicated = result.sort_values("Score", ascending=False).duplicated("Titulo_Eleitoral")
+        result.loc[duplicated[duplicated].index, "Confident"] = False
+
+        return result[columns]
+
+    def add_debate(
+        self,
+        df_dia: pd.DataFrame,
+        embeddings: Dict[str, np.ndarray],
+        video_id: Optional[str] = None,
+    ) -> int:
+        """
+        Adiciona ao índice os falantes rotulados de um debate.
+
+        Args:
+            df_dia: Diarização com 'Speaker_ID', 'Candidato' e 'Titulo_Eleitoral'.
+            embeddings: Speaker_ID -> embedding do falante no debate.
+            video_id: Identificador do debate. Se já estiver no índice, nada
+                      é adicionado.
+
+        Returns:
+            Quantidade de candidatos adicionados/atualizados.
+        """
+        if video_id is not None and video_id in self.video_ids:
+            return 0
+
+        labeled = (
+            df_dia.loc[df_dia["Titulo_Eleitoral"].notna(), ["Speaker_ID", "Candidato", "Titulo_Eleitoral"]]
+            .drop_duplicates("Speaker_ID")
+        )
+        added = 0
+        for _, row in labeled.iterrows():
+            if row["Speaker_ID"] in embeddings and str(row["Titulo_Eleitoral"]) != "0":
+                self.add(row["Titulo_Eleitoral"], row["Candidato"], embeddings[row["Speaker_ID"]])
+                added += 1
+        if video_id is not None:
+            self.video_ids.append(video_id)
+        return added
+
+
+def build_voiceprints(
+    downloads_path: str = "./data/downloads",
+    path: str = VOICEPRINTS_PATH,
+    inference: Optional[Inference] = None,
+) -> VoiceprintIndex:
+    """
+    Constrói o índice de impressões de voz a partir dos debates já rotulados.
+
+    Percorre as pastas de `downloads_path` que tenham um `df_dia` rotulado
+    (com 'Titulo_Eleitoral') e o `audio.wav` completo. Debates que já estão
+    no índice salvo em `path` são pulados, então rodar de novo só adiciona
+    os novos.
+
+    Args:
+        downloads_path: Pasta com um subdiretório por vídeo.
+        path: Onde salvar o índice.
+        inference: Modelo de embeddings (carregado se não informado).
+
+    Returns:
+        O índice construído (já salvo em `path`).
+    """
+    index = VoiceprintIndex(path)
+    inference = inference or load_embedding_inference()
+
+    for video_id in sorted(os.listdir(downloads_path)):
+        if video_id in index.video_ids:
+            logger.info(f"{video_id}: já está no índice, ignorando")
+            continue
+
+        folder = os.path.join(downloads_path, video_id)
+        df_dia = None
+        for filename in [LABELED_DIARIZATION_FILENAME, "df_dia.pkl"]:
+            candidate = os.path.join(folder, filename)
+            if os.path.exists(candidate):
+                df_dia = pd.read_pickle(candidate)
+                if "Titulo_Eleitoral" in df_dia.columns:
+                    break
+                df_dia = None
+
+        if df_dia is None:
+            logger.info(f"{video_id}: sem diarização rotulada, ignorando")
+            continue
+
+        try:
+            audio = load_pcm(prepare_audio(folder))
+        except FileNotFoundError:
+            logger.info(f"{video_id}: sem áudio completo, ignorando")
+            continue
+
+        embeddings = speaker_embeddings(df_dia, audio, 16000, inference)
+        added = index.add_debate(df_dia, embeddings, video_id=video_id)
+        logger.info(f"{video_id}: {added} candidatos adicionados ao índice")
+
+    index.save()
+    return index